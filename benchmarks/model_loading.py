@@ -0,0 +1,103 @@
+"""Measure the load time and memory of the models of many regions.
+
+Compare loading the pysd model file for each region with loading it
+once and forking it for the other regions ::
+
+    python benchmarks/model_loading.py --regions 1 10 100 1000
+
+Each measurement runs in a new python process, so that the resident
+memory reported only contains the models loaded.
+"""
+import argparse
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+TEACUP_MDL = Path(
+    Path(__file__).parent.parent, "examples", "teacup", "Teacup.mdl"
+)
+
+
+def resident_memory() -> float:
+    """Return the resident memory of the process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 1024**2
+    except FileNotFoundError:
+        # Only the peak is available, ru_maxrss is in kB on linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_models(model_file: str, n_regions: int, method: str):
+    import pysd
+
+    from pysimgame.utils.pysd_fork import fork_model
+
+    # Import before measuring
+    pysd.load(model_file)
+    start_memory = resident_memory()
+    start = time.perf_counter()
+    if method == "load":
+        models = [pysd.load(model_file) for _ in range(n_regions)]
+    else:
+        model = pysd.load(model_file)
+        models = [model] + [fork_model(model) for _ in range(n_regions - 1)]
+    duration = time.perf_counter() - start
+    print(duration, resident_memory() - start_memory)
+    return models
+
+
+def measure(model_file: str, n_regions: int, method: str):
+    """Return the load time [s] and memory [MB] in a new process."""
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", model_file, str(n_regions)]
+        + [method],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    duration, memory = output.split()[-2:]
+    return float(duration), float(memory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--regions", nargs="+", type=int, default=[1, 10, 100, 1000]
+    )
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        model_file, n_regions, method = args.child
+        load_models(model_file, int(n_regions), method)
+        return
+
+    import pysd
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        mdl_file = Path(tmp_dir, TEACUP_MDL.name)
+        shutil.copyfile(TEACUP_MDL, mdl_file)
+        pysd.read_vensim(str(mdl_file), initialize=False)
+        model_file = str(mdl_file.with_suffix(".py"))
+
+        print(
+            f"{'regions':>8} {'load [s]':>9} {'load [MB]':>10}"
+            f" {'fork [s]':>9} {'fork [MB]':>10}"
+        )
+        for n_regions in args.regions:
+            load_time, load_memory = measure(model_file, n_regions, "load")
+            fork_time, fork_memory = measure(model_file, n_regions, "fork")
+            print(
+                f"{n_regions:>8} {load_time:>9.3f} {load_memory:>10.1f}"
+                f" {fork_time:>9.3f} {fork_memory:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
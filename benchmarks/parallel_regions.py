@@ -0,0 +1,118 @@
+"""Measure the speed-up of the parallel model manager.
+
+Run the teacup example headless with an increasing number of regions,
+using the default and the parallel model managers ::
+
+    python benchmarks/parallel_regions.py --regions 8 32 128 --workers 4
+
+With 2 workers on a single cpu, for 50 steps ::
+
+     regions   pysd [s]  parallel [s] speed-up
+           8      0.007         0.024     0.29
+          32      0.015         0.050     0.30
+         128      0.052         0.177     0.29
+         512      0.240         0.667     0.36
+
+A teacup region steps faster than its state is sent to a worker, so
+the parallel manager only pays off for models with many components.
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from pysimgame.game import Game
+from pysimgame.headless import HeadlessGameManager
+from pysimgame.utils.directories import (
+    EXAMPLES_DIR,
+    GAME_SETTINGS_FILENAME,
+    INITIAL_CONDITIONS_FILENAME,
+    REGIONS_FILE_NAME,
+)
+
+TEACUP_MDL = Path(EXAMPLES_DIR, "teacup", "Teacup.mdl")
+
+
+def create_game(games_dir: Path, n_regions: int, settings: dict) -> Game:
+    """Create a teacup game with n_regions regions."""
+    import pysd
+
+    name = f"teacup_{n_regions}_{settings['ModelManager']}"
+    game_dir = Path(games_dir, name)
+    game_dir.mkdir(parents=True)
+    model_file = Path(game_dir, "model.mdl")
+    shutil.copyfile(TEACUP_MDL, model_file)
+    pysd.read_vensim(str(model_file), initialize=False)
+    regions = [f"region_{i}" for i in range(n_regions)]
+    with open(Path(game_dir, REGIONS_FILE_NAME), "w") as f:
+        json.dump(
+            {
+                region: {"name": region, "color": [0, 0, 0], "polygons": []}
+                for region in regions
+            },
+            f,
+        )
+    with open(Path(game_dir, GAME_SETTINGS_FILENAME), "w") as f:
+        json.dump(settings, f)
+    with open(Path(game_dir, INITIAL_CONDITIONS_FILENAME), "w") as f:
+        json.dump(
+            {
+                "_time": 0,
+                **{
+                    region: {"teacup_temperature": 50.0 + i}
+                    for i, region in enumerate(regions)
+                },
+            },
+            f,
+        )
+    return Game(name, game_dir=games_dir)
+
+
+def time_run(game: Game, n_steps: int) -> float:
+    """Return the number of seconds needed to run n_steps."""
+    manager = HeadlessGameManager(game)
+    manager.prepare()
+    manager.connect()
+    try:
+        start = time.perf_counter()
+        manager.run(n_steps)
+        return time.perf_counter() - start
+    finally:
+        manager.MODEL_MANAGER.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--regions", nargs="+", type=int, default=[8, 32])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--steps", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'regions':>8} {'pysd [s]':>10} {'parallel [s]':>13} speed-up")
+    with tempfile.TemporaryDirectory() as games_dir:
+        for n_regions in args.regions:
+            sequential = time_run(
+                create_game(games_dir, n_regions, {"ModelManager": "pysd"}),
+                args.steps,
+            )
+            parallel = time_run(
+                create_game(
+                    games_dir,
+                    n_regions,
+                    {"ModelManager": "parallel", "Workers": args.workers},
+                ),
+                args.steps,
+            )
+            print(
+                f"{n_regions:>8} {sequential:>10.3f} {parallel:>13.3f} "
+                f"{sequential / parallel:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
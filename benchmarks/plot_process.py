@@ -0,0 +1,150 @@
+"""Measure the frame times of the game loop while plots are rendered.
+
+A loop standing for the game adds steps to a history and spends some
+time in python code at each frame, while plots with many lines are
+rendered:
+
+    * thread: :py:class:`LinePlotFigure` rendered on a thread, as
+        when the ``"PlotsProcess"`` setting is false.
+    * process: rendered by a :py:class:`PlotsRenderer` worker, the
+        loop only sends the new steps and shows the frames completed.
+
+The median, 95th percentile and maximum of the frame times are given,
+with the number of plot frames completed per second ::
+
+    python benchmarks/plot_process.py --frames 300 --plots 4
+"""
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from pysimgame.history import HistoryStore
+from pysimgame.plotting.plot import PlotLine
+from pysimgame.plotting.process import PlotsRenderer
+from pysimgame.plotting.utils.figure import LinePlotFigure
+
+REGIONS = [f"region_{i}" for i in range(10)]
+ATTRIBUTES = [f"attribute_{i}" for i in range(5)]
+SIZE = (640, 480)
+
+
+def game_work(duration: float):
+    """Python code holding the GIL, as the game loop does."""
+    stop = time.perf_counter() + duration
+    while time.perf_counter() < stop:
+        sum(range(100))
+
+
+def plot_lines() -> list:
+    return [PlotLine(region, list(ATTRIBUTES)) for region in REGIONS]
+
+
+def append_steps(history: HistoryStore, rng, n_steps: int):
+    for _ in range(n_steps):
+        previous = (
+            history.values[-1]
+            if len(history)
+            else np.zeros((len(REGIONS), len(ATTRIBUTES)))
+        )
+        history.append(
+            float(len(history)), previous + rng.normal(size=previous.shape)
+        )
+
+
+def run(mode: str, args) -> dict:
+    rng = np.random.default_rng(0)
+    history = HistoryStore(REGIONS, ATTRIBUTES)
+    append_steps(history, rng, args.history)
+    rendered = 0
+    durations = []
+
+    if mode == "thread":
+        figures = [LinePlotFigure(plot_lines()) for _ in range(args.plots)]
+        for figure in figures:
+            figure.set_bounding_rect(pygame.Rect((0, 0), SIZE))
+        snapshot = history.snapshot()
+        running = True
+
+        def render():
+            nonlocal rendered
+            while running:
+                for figure in figures:
+                    figure.render(snapshot)
+                    rendered += 1
+
+        thread = threading.Thread(target=render)
+        thread.start()
+    else:
+        renderer = PlotsRenderer()
+        for i in range(args.plots):
+            renderer.open(f"plot_{i}", plot_lines(), SIZE)
+
+    for _ in range(args.frames):
+        start = time.perf_counter()
+        append_steps(history, rng, args.steps_per_frame)
+        if mode == "thread":
+            snapshot = history.snapshot()
+        else:
+            renderer.update(history.snapshot())
+            rendered += len(renderer.poll())
+        game_work(args.work / 1000)
+        durations.append(time.perf_counter() - start)
+        # Wait for the next frame, as the clock of the game does
+        time.sleep(max(0.0, 1 / args.fps - durations[-1]))
+    elapsed = sum(max(d, 1 / args.fps) for d in durations)
+
+    if mode == "thread":
+        running = False
+        thread.join()
+    else:
+        renderer.stop()
+    durations_ms = sorted(1000 * d for d in durations)
+    return {
+        "mode": mode,
+        "plots": args.plots,
+        "frames": args.frames,
+        "frame_ms_median": statistics.median(durations_ms),
+        "frame_ms_p95": durations_ms[int(0.95 * (len(durations_ms) - 1))],
+        "frame_ms_max": durations_ms[-1],
+        "plot_frames_per_sec": rendered / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--plots", type=int, default=4)
+    parser.add_argument("--history", type=int, default=20000)
+    parser.add_argument("--steps-per-frame", type=int, default=10)
+    parser.add_argument("--work", type=float, default=5.0, help="ms")
+    parser.add_argument("--fps", type=float, default=60.0)
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    pygame.init()
+    results = []
+    for mode in ("thread", "process"):
+        result = run(mode, args)
+        results.append(result)
+        print(
+            "{mode}: frame median {frame_ms_median:.2f} ms, "
+            "p95 {frame_ms_p95:.2f} ms, max {frame_ms_max:.2f} ms, "
+            "{plot_frames_per_sec:.1f} plot frames/s".format(**result)
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
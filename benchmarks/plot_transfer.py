@@ -0,0 +1,103 @@
+"""Measure the transfer of the figures drawn by Agg to pygame.
+
+For several window sizes, compare the time per frame of:
+
+    * copy: a new pygame surface with the pixels of the renderer, as
+        done when the image of the window is set.
+    * shared: the surface of :py:class:`AggFigureSurface`, sharing the
+        memory of the renderer.
+
+The time of blitting the lines on the figure, common to both, is also
+given ::
+
+    python benchmarks/plot_transfer.py --frames 200
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+from matplotlib.figure import Figure
+
+from pysimgame.plotting.utils.agg import AggFigureSurface
+
+SIZES = [(320, 240), (640, 480), (1280, 960), (1920, 1080)]
+
+
+def median_ms(function, n_frames: int) -> float:
+    durations = []
+    for _ in range(n_frames):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return 1000 * statistics.median(durations)
+
+
+def measure(size: tuple[int, int], n_frames: int) -> dict:
+    figure = Figure()
+    ax = figure.subplots()
+    figure_surface = AggFigureSurface(figure)
+    figure_surface.set_bounding_rect(pygame.Rect((0, 0), size))
+    canvas = figure_surface.canvas
+    x = np.linspace(0, 10, 1000)
+    (line,) = ax.plot(x, np.sin(x), animated=True)
+    canvas.draw()
+    background = canvas.copy_from_bbox(figure.bbox)
+
+    def blit_lines():
+        canvas.restore_region(background)
+        line.set_ydata(np.sin(x + time.perf_counter()))
+        ax.draw_artist(line)
+
+    def copy():
+        renderer = canvas.get_renderer()
+        return pygame.image.frombuffer(
+            renderer.buffer_rgba(), size, "RGBA"
+        ).copy()
+
+    def shared():
+        return figure_surface.surface
+
+    assert shared() is shared()
+    return {
+        "size": list(size),
+        "frames": n_frames,
+        "blit_lines_ms": median_ms(blit_lines, n_frames),
+        "copy_ms": median_ms(copy, n_frames),
+        "shared_ms": median_ms(shared, n_frames),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    pygame.init()
+    results = []
+    for size in SIZES:
+        result = measure(size, args.frames)
+        results.append(result)
+        print(
+            "{}x{}: lines {:.3f} ms, copy {:.3f} ms, shared {:.4f} ms".format(
+                *size,
+                result["blit_lines_ms"],
+                result["copy_ms"],
+                result["shared_ms"],
+            )
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
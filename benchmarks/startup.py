@@ -0,0 +1,113 @@
+"""Measure the startup time of the pysimgame command line.
+
+Each command runs several times in a new python process with
+``-X importtime``, and the median wall time is compared to a budget ::
+
+    python benchmarks/startup.py --budget 0.5 --repeat 5
+
+The exit status is 1 if a command is over the budget or imports one
+of the heavy modules only required for playing, so that it can be
+used in CI.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Only required by the game, not by the command line
+HEAVY_MODULES = [
+    "matplotlib",
+    "pandas",
+    "pygame_gui",
+    "pygame_matplotlib",
+    "PySide6",
+    "skimage",
+    "git",
+    "pysd",
+]
+
+
+def run_importtime(args: list[str]) -> tuple[float, dict[str, int]]:
+    """Run pysimgame with the args in a new process.
+
+    Return the wall time [s] and the cumulative import time [us] of
+    each module imported.
+    """
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy")
+    start = time.perf_counter()
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "pysimgame", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    ).stderr
+    duration = time.perf_counter() - start
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, module = line.split("|")
+        if not cumulative.strip().isdigit():
+            # Header line
+            continue
+        imports[module.strip()] = int(cumulative)
+    return duration, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=0.5,
+        help="Maximum median startup time [s] of each command.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--top", type=int, default=5, help="Number of slowest imports shown."
+    )
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as games_dir:
+        commands = [["--version"], ["--list", "--dir", games_dir]]
+        for command in commands:
+            durations = []
+            for _ in range(args.repeat):
+                duration, imports = run_importtime(command)
+                durations.append(duration)
+            median = statistics.median(durations)
+            heavy = sorted(
+                {module.split(".")[0] for module in imports}
+                & set(HEAVY_MODULES)
+            )
+            over_budget = median > args.budget
+            failed |= over_budget or bool(heavy)
+
+            name = command[0]
+            print(
+                f"{name:<10} median {median:.3f} s"
+                f" (budget {args.budget:.3f} s)"
+                f"{'  OVER BUDGET' if over_budget else ''}"
+            )
+            if heavy:
+                print(f"{'':<10} heavy modules imported: {', '.join(heavy)}")
+            packages = {
+                module: cumulative
+                for module, cumulative in imports.items()
+                if "." not in module
+            }
+            for module in sorted(packages, key=packages.get)[::-1][
+                : args.top
+            ]:
+                print(f"{'':<10} {packages[module] / 1e6:.3f} s {module}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""Benchmark suite of pysimgame, storing the results as json.
+
+The games are created from the example models (teacup, preypredator
+and differentcups), with an increasing number of regions ::
+
+    python benchmarks/suite.py --output results.json
+
+It measures:
+
+    * throughput: Steps per second of a headless run, against the
+        number of regions and of captured attributes.
+    * memory: Resident memory of the models per region.
+    * frame: Time of :py:meth:`GameManager.draw` with the dummy SDL
+        video driver.
+    * startup: Time of ``python -m pysimgame --version`` .
+
+Each measurement runs in a new python process. Two results files can
+then be compared, the exit status is 1 if a metric regressed more than
+the threshold ::
+
+    python benchmarks/suite.py --compare old.json new.json --threshold 0.2
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from model_loading import resident_memory
+from startup import run_importtime
+
+BENCHMARKS_DIR = Path(__file__).parent
+EXAMPLES_DIR = Path(BENCHMARKS_DIR.parent, "examples")
+MODELS = {
+    "teacup": Path(EXAMPLES_DIR, "teacup", "Teacup.mdl"),
+    "preypredator": Path(EXAMPLES_DIR, "preypredator", "population.mdl"),
+    "differentcups": Path(EXAMPLES_DIR, "differentcups", "DifferentCups.mdl"),
+}
+# Whether a higher value of the metric is better
+METRICS = {
+    "steps_per_sec": True,
+    "memory_per_region_mb": False,
+    "frame_ms_median": False,
+    "frame_ms_p95": False,
+    "startup_sec": False,
+}
+# Parameters not identifying a benchmark, only its duration
+RUN_LENGTH_KEYS = ("steps", "n_steps", "frames", "n_frames", "repeat")
+
+
+# region Measurements
+def create_game(games_dir: Path, model: str, n_regions: int, settings: dict):
+    """Create a game of the model with n_regions regions."""
+    from pysimgame.game import Game
+    from pysimgame.new_game import parse_model_file
+    from pysimgame.utils.directories import (
+        GAME_SETTINGS_FILENAME,
+        REGIONS_FILE_NAME,
+    )
+
+    name = f"{model}_{n_regions}"
+    game_dir = Path(games_dir, name)
+    game_dir.mkdir(parents=True)
+    # Translations are cached, so only the first game translates
+    parse_model_file(MODELS[model], game_dir)
+    with open(Path(game_dir, REGIONS_FILE_NAME), "w") as f:
+        json.dump(
+            {
+                f"region_{i}": {
+                    "name": f"region_{i}",
+                    "color": [i % 256, 0, 0, 255],
+                    "polygons": [],
+                }
+                for i in range(n_regions)
+            },
+            f,
+        )
+    with open(Path(game_dir, GAME_SETTINGS_FILENAME), "w") as f:
+        json.dump(settings, f)
+    return Game(name, game_dir=games_dir)
+
+
+def measure_throughput(
+    model: str, n_regions: int, n_attributes: int | None, n_steps: int
+) -> dict:
+    """Steps per second of a headless run."""
+    from pysimgame.headless import HeadlessGameManager
+
+    with tempfile.TemporaryDirectory() as games_dir:
+        game = create_game(games_dir, model, n_regions, {})
+        manager = HeadlessGameManager(game)
+        manager.prepare()
+        attributes = manager.MODEL_MANAGER.capture_attributes
+        if n_attributes is not None:
+            attributes = attributes[:n_attributes]
+        manager.MODEL_MANAGER.unsubscribe(manager)
+        manager.MODEL_MANAGER.subscribe(manager, attributes)
+        manager.connect()
+        n_steps = min(n_steps, manager.remaining_steps())
+        start = time.perf_counter()
+        manager.run(n_steps)
+        duration = time.perf_counter() - start
+        manager.MODEL_MANAGER.quit()
+    return {
+        "attributes": len(attributes),
+        "steps": n_steps,
+        "steps_per_sec": n_steps / duration,
+    }
+
+
+def measure_memory(model: str, n_regions: int) -> dict:
+    """Resident memory of the models per region."""
+    import pysd
+
+    from pysimgame.headless import HeadlessGameManager
+
+    with tempfile.TemporaryDirectory() as games_dir:
+        game = create_game(games_dir, model, n_regions, {})
+        # Import before measuring
+        pysd.load(game.PYSD_MODEL_FILE)
+        start_memory = resident_memory()
+        manager = HeadlessGameManager(game)
+        manager.prepare()
+        manager.connect()
+        memory = resident_memory() - start_memory
+        manager.MODEL_MANAGER.quit()
+    return {"memory_per_region_mb": memory / n_regions}
+
+
+def measure_frame(model: str, n_regions: int, n_frames: int) -> dict:
+    """Time of drawing the game, with a model step at each frame."""
+    import pygame
+
+    from pysimgame.game_manager import GameManager
+
+    with tempfile.TemporaryDirectory() as games_dir:
+        game = create_game(games_dir, model, n_regions, {})
+        pygame.init()
+        manager = GameManager()
+        manager.game = game
+        manager.prepare()
+        manager.connect()
+        durations = []
+        for _ in range(n_frames):
+            manager.MODEL_MANAGER.advance()
+            for event in pygame.event.get():
+                manager.process_event(event)
+            start = time.perf_counter()
+            manager.draw(1000 / 60)
+            durations.append(time.perf_counter() - start)
+        manager.MODEL_MANAGER.quit()
+        pygame.quit()
+    durations_ms = sorted(1000 * duration for duration in durations)
+    return {
+        "frames": n_frames,
+        "frame_ms_median": statistics.median(durations_ms),
+        "frame_ms_p95": durations_ms[int(0.95 * (len(durations_ms) - 1))],
+    }
+
+
+def measure_startup(repeat: int) -> dict:
+    """Median time of the command line printing the version."""
+    durations = [run_importtime(["--version"])[0] for _ in range(repeat)]
+    return {"startup_sec": statistics.median(durations)}
+
+
+MEASUREMENTS = {
+    "throughput": measure_throughput,
+    "memory": measure_memory,
+    "frame": measure_frame,
+    "startup": measure_startup,
+}
+
+
+def measure(benchmark: str, **params) -> dict:
+    """Run a measurement in a new process and return its result."""
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", benchmark, json.dumps(params)],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    result = json.loads(output.splitlines()[-1])
+    print(benchmark, params, result, flush=True)
+    return {"benchmark": benchmark, **params, **result}
+
+
+# endregion Measurements
+# region Comparison
+def result_key(result: dict) -> tuple:
+    """Identify a result by its parameters."""
+    return tuple(
+        sorted(
+            (key, value)
+            for key, value in result.items()
+            if key not in METRICS and key not in RUN_LENGTH_KEYS
+        )
+    )
+
+
+def compare(old_file: Path, new_file: Path, threshold: float) -> bool:
+    """Print the changes of the metrics and return False on regression."""
+    with open(old_file) as f:
+        old_results = {result_key(r): r for r in json.load(f)["results"]}
+    with open(new_file) as f:
+        new_results = json.load(f)["results"]
+
+    ok = True
+    for new in new_results:
+        old = old_results.get(result_key(new))
+        if old is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            if metric not in new or metric not in old or not old[metric]:
+                continue
+            change = new[metric] / old[metric] - 1
+            regression = -change if higher_is_better else change
+            flag = ""
+            if regression > threshold:
+                flag = "  REGRESSION"
+                ok = False
+            params = ", ".join(
+                f"{key}={value}" for key, value in result_key(new)
+            )
+            print(
+                f"{params}: {metric} {old[metric]:.4g} -> {new[metric]:.4g}"
+                f" ({change:+.1%}){flag}"
+            )
+    return ok
+
+
+# endregion Comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--output", type=str, default="benchmarks.json")
+    parser.add_argument(
+        "--models", nargs="+", default=list(MODELS), choices=list(MODELS)
+    )
+    parser.add_argument(
+        "--regions", nargs="+", type=int, default=[1, 10, 100]
+    )
+    parser.add_argument(
+        "--frame-regions", nargs="+", type=int, default=[1, 10]
+    )
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("OLD", "NEW"), type=Path
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative change of a metric considered as a regression.",
+    )
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        benchmark, params = args.child
+        result = MEASUREMENTS[benchmark](**json.loads(params))
+        print(json.dumps(result))
+        return
+
+    if args.compare:
+        sys.exit(0 if compare(*args.compare, args.threshold) else 1)
+
+    results = [measure("startup", repeat=args.repeat)]
+    for model in args.models:
+        for n_regions in args.regions:
+            for n_attributes in (1, None):
+                results.append(
+                    measure(
+                        "throughput",
+                        model=model,
+                        n_regions=n_regions,
+                        n_attributes=n_attributes,
+                        n_steps=args.steps,
+                    )
+                )
+            results.append(measure("memory", model=model, n_regions=n_regions))
+        for n_regions in args.frame_regions:
+            results.append(
+                measure(
+                    "frame",
+                    model=model,
+                    n_regions=n_regions,
+                    n_frames=args.frames,
+                )
+            )
+
+    commit = subprocess.run(
+        ["git", "rev-parse", "HEAD"],
+        capture_output=True,
+        text=True,
+        cwd=BENCHMARKS_DIR,
+    ).stdout.strip()
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "commit": commit,
+                "date": datetime.datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"Saved the results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ import importlib
 import inspect
 import logging
 import pathlib
+import pickle
 from abc import abstractmethod
 from dataclasses import dataclass, field
 from functools import wraps
@@ -39,6 +40,7 @@ if TYPE_CHECKING:
     from pysimgame.types import AttributeName, ModelType
 
 _ACTION_MANAGER: ActionsManager
+ACTIONS_SAVE_FILENAME = "actions.pickle"
 
 
 logger = logging.getLogger(__name__)
@@ -79,9 +81,19 @@ class BaseAction:
             dic = dic[mod]
         # Finally we put the policy at the correct place
         dic[self.name] = self
+        # Keys to find the action in the actions dict
+        self.path = (*path.split("."), self.name)
         logger.info(f"Registerd {self}")
         logger.debug(_ACTION_MANAGER.actions)
 
+    def get_state(self) -> Any:
+        """Return what the user changed in the action, for saving it."""
+        return None
+
+    def set_state(self, state: Any):
+        """Set the state returned by :py:meth:`get_state` ."""
+        pass
+
     def deactivate(self):
         """Actual deactivation of the policy."""
         self.activated = False
@@ -141,6 +153,12 @@ class Policy(BaseAction):
         default_factory=dict
     )
 
+    def get_state(self) -> bool:
+        return self.activated
+
+    def set_state(self, state: bool):
+        self.activated = state
+
 
 @dataclass(kw_only=True)
 class Edict(BaseAction):
@@ -170,6 +188,12 @@ class Budget(BaseAction):
     max: Union[float, Callable[[ModelType], float]]
     value: float = 0
 
+    def get_state(self) -> float:
+        return self.value
+
+    def set_state(self, state: float):
+        self.value = state
+
     def get_min(self) -> float:
         """Return the min."""
         if callable(self.min):
@@ -257,6 +281,49 @@ class ActionsManager(GameComponentManager):
         self.MODEL_MANAGER = self.GAME_MANAGER.MODEL_MANAGER
         self.REGIONS_MANAGER = self.GAME_MANAGER.REGIONS_MANAGER
 
+    def get_action(self, path: Tuple[str, ...]) -> BaseAction:
+        """Return the action registered at the path."""
+        action = self.actions
+        for key in path:
+            action = action[key]
+        return action
+
+    def _iter_actions(self, actions: ActionsDict = None):
+        """Iterate over all the actions registered."""
+        if actions is None:
+            actions = self.actions
+        for value in actions.values():
+            if isinstance(value, dict):
+                yield from self._iter_actions(value)
+            else:
+                yield value
+
+    def save(self, save_dir: pathlib.Path):
+        """Save the states of the actions."""
+        self.save_content(self.copy_save_content(), save_dir)
+
+    def copy_save_content(self) -> Dict[Tuple[str, ...], Any]:
+        """Return the states of the actions."""
+        return {
+            action.path: action.get_state() for action in self._iter_actions()
+        }
+
+    def save_content(
+        self, content: Dict[Tuple[str, ...], Any], save_dir: pathlib.Path
+    ):
+        with open(pathlib.Path(save_dir, ACTIONS_SAVE_FILENAME), "wb") as f:
+            pickle.dump(content, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self, save_dir: pathlib.Path):
+        """Load the states of the actions."""
+        with open(pathlib.Path(save_dir, ACTIONS_SAVE_FILENAME), "rb") as f:
+            states = pickle.load(f)
+        for path, state in states.items():
+            try:
+                self.get_action(path).set_state(state)
+            except KeyError:
+                self.logger.warning(f"Saved action {path} does not exist.")
+
     def post_event(self, action: BaseAction):
         """Post an event with the current action.
 
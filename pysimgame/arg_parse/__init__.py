@@ -4,12 +4,12 @@ Capabilities:
     * start an existing game
     * initialize a new game
     * manage existant games
+    * run a game without display
 """
 import argparse
 from pathlib import Path
 import sys
 
-import git
 import pysimgame
 
 from pysimgame.game import (
@@ -20,7 +20,6 @@ from pysimgame.game import (
     list_available_games,
 )
 from pysimgame.utils.directories import REPOSITORY_URL
-from pysimgame.game_manager import GameManager
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -87,6 +86,30 @@ def create_parser() -> argparse.ArgumentParser:
         help="Return the version of the selected game.",
     )
 
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help=(
+            "Run the model of the game without display, "
+            "as fast as possible."
+        ),
+    )
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=None,
+        help=(
+            "Number of steps to run in headless mode. "
+            "Run until the final time of the model by default."
+        ),
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="",
+        help="The csv file where the headless outputs are saved.",
+    )
+
     parser.add_argument(
         "--log",
         "--verbose",
@@ -187,7 +210,21 @@ def read_parsed_args(args):
             print("Abort.")
             sys.exit(1)
 
+    if args.headless:
+        from pysimgame.headless import run_headless
+
+        history = run_headless(game, args.steps)
+        if args.output:
+            history.to_dataframe().to_csv(args.output)
+            print(f"Saved outputs to {args.output}")
+        else:
+            print(history.to_dataframe())
+        sys.exit(0)
+
     # Still not existed yet, we start the game
+    # Imported only here as loading the whole game is slow
+    from pysimgame.game_manager import GameManager
+
     # TODO: think about how we want to start the game,
     # New design ? refactor ?
     GAME_MANAGER = GameManager()
@@ -0,0 +1,220 @@
+"""Run ensembles of simulations of a game.
+
+Each member of an ensemble is a run of the game where some constants
+or initial conditions are replaced.
+The values of a member are given for each region, as in the
+initial conditions file ::
+
+    {"region_a": {"room_temperature": 20}, "region_b": {...}}
+
+Members can be created from a grid of values or by sampling
+distributions, and are run headless in a pool of processes ::
+
+    from pysimgame.ensemble import grid_members, run_ensemble
+
+    members = grid_members({"region_a": {"room_temperature": [20, 70]}})
+    ensemble = run_ensemble("my_game", members, n_steps=100)
+    ensemble["region_a", "teacup_temperature"]  # (member, time) array
+"""
+from __future__ import annotations
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Sequence
+
+import numpy as np
+
+from pysimgame.game import Game
+
+if TYPE_CHECKING:
+    from .types import AttributeName, RegionName
+
+    Member = Dict[RegionName, Dict[str, float]]
+
+
+def grid_members(
+    grid: Dict[RegionName, Dict[str, Sequence[float]]]
+) -> List[Member]:
+    """Return a member for each combination of the values of the grid.
+
+    :param grid: The values to try for the variables of each region.
+    """
+    keys = [
+        (region, variable)
+        for region, variables in grid.items()
+        for variable in variables
+    ]
+    members = []
+    for values in itertools.product(
+        *(grid[region][variable] for region, variable in keys)
+    ):
+        member = {}
+        for (region, variable), value in zip(keys, values):
+            member.setdefault(region, {})[variable] = value
+        members.append(member)
+    return members
+
+
+def sample_members(
+    distributions: Dict[
+        RegionName, Dict[str, Callable[[np.random.Generator], float]]
+    ],
+    n_members: int,
+    seed: int = None,
+) -> List[Member]:
+    """Return members with values sampled from the distributions.
+
+    :param distributions: For the variables of each region, a function
+        returning a sample from a numpy random generator.
+        Ex. ``lambda rng: rng.normal(70, 5)`` .
+    :param n_members: The number of members to create.
+    :param seed: The seed of the random generator.
+    """
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            region: {
+                variable: float(distribution(rng))
+                for variable, distribution in variables.items()
+            }
+            for region, variables in distributions.items()
+        }
+        for _ in range(n_members)
+    ]
+
+
+@dataclass
+class Ensemble:
+    """The results of the members of an ensemble.
+
+    The values of a region and an attribute for all the members can be
+    accessed as an array of shape (member, time) using ::
+
+        ensemble[region, attribute]
+    """
+
+    members: List[Member]
+    regions: List[RegionName]
+    attributes: List[AttributeName]
+    time_axis: np.ndarray
+    #: Array of shape (member, time, region, attribute)
+    values: np.ndarray = field(repr=False)
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def __getitem__(
+        self, key: tuple[RegionName, AttributeName]
+    ) -> np.ndarray:
+        region, attribute = key
+        return self.values[
+            :,
+            :,
+            self.regions.index(region),
+            self.attributes.index(attribute),
+        ]
+
+
+def _run_member(
+    game_name: str,
+    games_dir: Path,
+    member: Member,
+    n_steps: int,
+    attributes: List[AttributeName] | None,
+) -> tuple[List[RegionName], List[AttributeName], np.ndarray, np.ndarray]:
+    """Run a member in the current process."""
+    from pysimgame.headless import HeadlessGameManager
+
+    manager = HeadlessGameManager(
+        Game(game_name, game_dir=games_dir), member, attributes
+    )
+    manager.prepare()
+    manager.connect()
+    try:
+        history = manager.run(n_steps)
+        # Read before quitting, as steps can be on disk
+        return (
+            history.regions,
+            history.attributes,
+            history.time_axis.copy(),
+            history.values.copy(),
+        )
+    finally:
+        manager.MODEL_MANAGER.quit()
+
+
+def _prepare_game_dir(game: Game):
+    """Create the files and directories the managers add to the game dir.
+
+    Ex. the caches of the model manager or the directory of the
+    actions. Otherwise the members would all create them at the same
+    time.
+    """
+    from pysimgame.headless import HeadlessGameManager
+
+    manager = HeadlessGameManager(game)
+    manager.prepare()
+    manager.MODEL_MANAGER.quit()
+
+
+def run_ensemble(
+    game: Game | str,
+    members: List[Member],
+    n_steps: int = None,
+    n_workers: int = None,
+    attributes: List[AttributeName] = None,
+) -> Ensemble:
+    """Run all the members of an ensemble without display.
+
+    :param game: The game or its name.
+    :param members: The values replacing the initial conditions of the
+        game for each member.
+    :param n_steps: The number of steps to run. If None, run until
+        the final time of the model.
+    :param n_workers: The number of processes to use. If None, use
+        the number of cpus.
+    :param attributes: The attributes to capture. If None, all the
+        capture attributes of the model.
+    :return: The values captured during the runs of all the members.
+    """
+    if isinstance(game, str):
+        game = Game(game)
+    _prepare_game_dir(game)
+    values = None
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        results = executor.map(
+            _run_member,
+            itertools.repeat(game.NAME),
+            itertools.repeat(game.GAME_DIR.parent),
+            members,
+            itertools.repeat(n_steps),
+            itertools.repeat(attributes),
+        )
+        for i, (regions, captured, time_axis, history) in enumerate(
+            results
+        ):
+            if values is None:
+                # Allocate once the shape of a member is known
+                values = np.empty(
+                    (len(members), *history.shape), dtype=np.float64
+                )
+                ensemble_time = time_axis
+            elif history.shape != values.shape[1:]:
+                raise ValueError(
+                    f"Member {i} has values of shape {history.shape} "
+                    f"but previous members had {values.shape[1:]}."
+                )
+            values[i] = history
+
+    if values is None:
+        raise ValueError("No members were given.")
+
+    return Ensemble(
+        members=members,
+        regions=regions,
+        attributes=captured,
+        time_axis=ensemble_time,
+        values=values,
+    )
@@ -20,12 +20,12 @@ ActionUsed = pygame.event.custom_type()
 # {'event', ?}
 EventStarted = pygame.event.custom_type()
 
-# The simulation speed is changed
+# The simulation speed is changed, fps is inf for the max speed
 # {'fps'}
 SpeedChanged = pygame.event.custom_type()
 
-# A simulation step has ended
-# {}
+# Simulation steps have ended, posted once for a batch of steps
+# {'n_steps'}
 ModelStepped = pygame.event.custom_type()
 
 # Pause event
@@ -38,3 +38,7 @@ UnPaused = pygame.event.custom_type()
 # Plotting events
 OpenPlot = pygame.event.custom_type()
 ClosePlot = pygame.event.custom_type()
+
+# The model was set back to a previous step
+# {'step'}
+ModelRewound = pygame.event.custom_type()
@@ -1,10 +1,8 @@
 """Helper for Game definition from pysimgame."""
 from __future__ import annotations
 from functools import cached_property
-from numpy import True_
 
 from packaging.version import Version
-import git
 
 import json
 import logging
@@ -198,12 +196,17 @@ class Game:
         """Download the game."""
         if "/" not in remote_url:
             remote_url = REPOSITORY_URL + remote_url
+        # Slow to import, only needed for sharing games
+        import git
+
         # Download from the remote git repo
         git.Repo.clone_from(remote_url, self.GAME_DIR)
         git.Repo(self.GAME_DIR)
 
     def publish_game(self, remote_url: str):
         """Upload the game to a remote repository."""
+        import git
+
         try:
             repo = git.Repo(self.GAME_DIR)
         except:
@@ -232,6 +235,8 @@ class Game:
 
     def push_game(self):
         """Push the updates to the remote."""
+        import git
+
         repo = git.Repo(self.GAME_DIR)
         # repo.git.checkout("-b", "pysimgame")
         self.add_readme(exist_ok=True)
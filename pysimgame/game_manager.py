@@ -188,7 +188,9 @@ class GameManager(AbstractGameManager):
         ) as executor:
 
             future_to_manager = {
-                executor.submit(start_manager, manager_class): manager_class
+                executor.submit(
+                    start_manager, self._resolve_manager_class(manager_class)
+                ): manager_class
                 for manager_class in self._manager_classes
             }
             # Wait for the threads to finish
@@ -275,17 +277,6 @@ class GameManager(AbstractGameManager):
         return self.MAIN_DISPLAY
 
     # endregion Loading
-    def load(self, save_file: pathlib.Path):
-        """Load a game from the save.
-
-        TODO: Implement
-        Idea: make every manager save in a file what they need and then
-        compress into a file.
-        """
-        save_dir = save_file.parent
-        for manager in self.MANAGERS.values():
-            manager.load(save_dir)
-
     def start_new_game(
         self, game: Tuple[Game, str], from_save: pathlib.Path = None
     ):
@@ -296,14 +287,15 @@ class GameManager(AbstractGameManager):
         self.logger.info("Preparing the game components")
         self.prepare()
 
+        self.logger.info("Connecting the game components")
+        self.connect()
+
         if from_save:
+            # Loaded after the connection, as links change the models
             self.logger.info(f"Loading from save {from_save}")
             self.load(from_save)
             self.logger.info(f"Save loaded {from_save}")
 
-        self.logger.info("Connecting the game components")
-        self.connect()
-
         self.logger.info("---Game Ready---")
 
         self.logger.debug(self.MODEL_MANAGER)
@@ -0,0 +1,143 @@
+"""Run a game without display.
+
+The :py:class:`HeadlessGameManager` loads only the components
+required for the simulation (model, links and actions) and steps the
+model as fast as possible, without the clock of the game.
+It is meant for running scenarios in batch, for example on a server ::
+
+    from pysimgame.headless import run_headless
+
+    history = run_headless("my_game", n_steps=100)
+    history.to_dataframe().to_csv("outputs.csv")
+
+The same can be done from the command line ::
+
+    pysimgame my_game --headless --steps 100 --output outputs.csv
+"""
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Dict, List, Type
+
+from pysimgame.actions.actions import ActionsManager
+from pysimgame.game import Game
+from pysimgame.links.manager import LinksManager
+from pysimgame.model import ModelManager
+from pysimgame.utils.abstract_managers import (
+    AbstractGameManager,
+    GameComponentManager,
+)
+
+if TYPE_CHECKING:
+    from pysimgame.history import HistoryStore
+    from pysimgame.types import AttributeName, RegionName
+
+
+class HeadlessGameManager(AbstractGameManager):
+    """Game manager running the model of a game without display.
+
+    The managers requiring a display are not loaded, so their
+    attributes are set to None.
+
+    :param game: The game or its name.
+    :param initial_conditions_overrides: Values replacing the initial
+        conditions of the game, for each region. Constants and stocks
+        can be given, as in the initial conditions file.
+    :param attributes: The attributes to capture in the history.
+        If None, all the capture attributes of the model.
+    """
+
+    _manager_classes: List[Type[GameComponentManager]] = [
+        ModelManager,
+        ActionsManager,
+        LinksManager,
+    ]
+
+    def __init__(
+        self,
+        game: Game | str,
+        initial_conditions_overrides: (
+            Dict[RegionName, Dict[str, float]] | None
+        ) = None,
+        attributes: List[AttributeName] = None,
+    ) -> None:
+        super().__init__()
+        if isinstance(game, str):
+            game = Game(game)
+        self.GAME = self.game = game
+        self.initial_conditions_overrides = (
+            {}
+            if initial_conditions_overrides is None
+            else initial_conditions_overrides
+        )
+        self.attributes = attributes
+        self.PLOTS_MANAGER = None
+        self.STATISTICS_MANAGER = None
+        self.REGIONS_MANAGER = None
+        self.MENU_OVERLAY = None
+
+    def prepare(self):
+        for manager_class in self._manager_classes:
+            manager = self._resolve_manager_class(manager_class)(self)
+            if manager_class is ModelManager:
+                manager.initial_conditions_overrides = (
+                    self.initial_conditions_overrides
+                )
+            manager.prepare()
+            self.MANAGERS[manager_class] = manager
+        self.MODEL_MANAGER = self.MANAGERS[ModelManager]
+        self.ACTIONS_MANAGER = self.MANAGERS[ActionsManager]
+        # The history is what the headless run outputs
+        self.MODEL_MANAGER.subscribe(
+            self,
+            self.MODEL_MANAGER.capture_attributes
+            if self.attributes is None
+            else self.attributes,
+        )
+
+    def connect(self):
+        for manager in self.MANAGERS.values():
+            manager.connect()
+
+    def remaining_steps(self) -> int:
+        """Number of steps left until the final time of the model."""
+        model = self.MODEL_MANAGER
+        final_time = model.model.final_time()
+        return max(
+            0, round((final_time - model.current_time) / model.time_step)
+        )
+
+    def run(self, n_steps: int = None) -> HistoryStore:
+        """Step the model, without waiting between the steps.
+
+        :param n_steps: The number of steps to run. If None, run until
+            the final time of the model.
+        :return: The history of the model.
+        """
+        if n_steps is None:
+            n_steps = self.remaining_steps()
+        start_time = time.perf_counter()
+        advance = self.MODEL_MANAGER.advance
+        for _ in range(n_steps):
+            advance()
+        duration = time.perf_counter() - start_time
+        self.logger.info(
+            f"Ran {n_steps} steps in {duration:.3f} sec "
+            f"({n_steps / duration if duration else float('inf'):.1f} "
+            "steps/sec)."
+        )
+        return self.MODEL_MANAGER.history
+
+
+def run_headless(game: Game | str, n_steps: int = None) -> HistoryStore:
+    """Load a game and run its model without display.
+
+    :param game: The game or its name.
+    :param n_steps: The number of steps to run. If None, run until
+        the final time of the model.
+    :return: The history of the model.
+    """
+    manager = HeadlessGameManager(game)
+    manager.prepare()
+    manager.connect()
+    return manager.run(n_steps)
@@ -0,0 +1,666 @@
+"""History of the values captured in the model.
+
+The values are stored in a float64 array of shape
+(time, region, attribute) that grows in chunks, so that saving a step
+does not reallocate the whole history.
+Readers get views on that array without copying it.
+
+On long runs, the history can keep only a window of recent steps in
+memory. The older steps are streamed to files by a
+:py:class:`HistoryWriter` and read back from memory maps when they
+are requested.
+
+Other threads read a :py:class:`HistorySnapshot` , an immutable view of
+the history at a step, while the model thread continues appending.
+"""
+from __future__ import annotations
+
+import json
+import os
+import queue
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .types import AttributeName, RegionName
+
+
+@dataclass
+class _Segment:
+    """Steps written to disk with the same attributes."""
+
+    prefix: Path
+    start: int
+    attributes: List[AttributeName]
+    length: int = 0
+
+    @property
+    def stop(self) -> int:
+        return self.start + self.length
+
+    @property
+    def values_file(self) -> Path:
+        return self.prefix.with_suffix(".values")
+
+    @property
+    def time_file(self) -> Path:
+        return self.prefix.with_suffix(".time")
+
+
+class HistoryWriter:
+    """Write the steps of a history to files, in a background thread.
+
+    Each time the attributes change, a new segment of files is started.
+    A segment stores the raw float64 values of shape
+    (time, region, attribute) and the times of the steps.
+
+    :param directory: Where the files are written.
+    :param regions: The regions of the history.
+    :param remove: Whether to remove the directory when closed.
+    """
+
+    directory: Path
+    regions: List[RegionName]
+
+    _segments: List[_Segment]
+
+    def __init__(
+        self,
+        directory: Path,
+        regions: Iterable[RegionName],
+        remove: bool = False,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.regions = list(regions)
+        self._remove = remove
+        self._segments = []
+        # Protect the segments, which are read from other threads
+        self._lock = Lock()
+        self._queue = queue.Queue()
+        self._thread = Thread(
+            target=self._write_loop, name="HistoryWriter", daemon=True
+        )
+        self._thread.start()
+
+    def __len__(self) -> int:
+        """Number of steps written."""
+        self.flush()
+        with self._lock:
+            return self._segments[-1].stop if self._segments else 0
+
+    def write(
+        self,
+        start: int,
+        attributes: List[AttributeName],
+        time: np.ndarray,
+        values: np.ndarray,
+    ):
+        """Queue steps to be written.
+
+        :param start: The index of the first step, must follow the
+            steps already written.
+        :param attributes: The attributes of the values.
+        :param time: The times of the steps.
+        :param values: Array of shape (time, region, attribute).
+            It must not be modified after.
+        """
+        self._queue.put((start, list(attributes), time, values))
+
+    def flush(self):
+        """Wait until all the queued steps are written."""
+        self._queue.join()
+
+    def close(self):
+        """Stop the writer thread."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join()
+        if self._remove:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._append(*item)
+            finally:
+                self._queue.task_done()
+
+    def _append(
+        self,
+        start: int,
+        attributes: List[AttributeName],
+        time: np.ndarray,
+        values: np.ndarray,
+    ):
+        with self._lock:
+            segment = self._segments[-1] if self._segments else None
+        if (
+            segment is None
+            or segment.attributes != attributes
+            or segment.stop != start
+        ):
+            segment = _Segment(
+                Path(self.directory, f"segment_{len(self._segments)}"),
+                start,
+                attributes,
+            )
+            with open(segment.prefix.with_suffix(".json"), "w") as f:
+                json.dump(
+                    {
+                        "start": start,
+                        "regions": self.regions,
+                        "attributes": attributes,
+                    },
+                    f,
+                )
+            with self._lock:
+                self._segments.append(segment)
+        with open(segment.values_file, "ab") as f:
+            f.write(np.ascontiguousarray(values, dtype=np.float64).data)
+        with open(segment.time_file, "ab") as f:
+            f.write(np.ascontiguousarray(time, dtype=np.float64).data)
+        with self._lock:
+            segment.length += len(time)
+
+    def _overlapping(self, start: int, stop: int) -> List[_Segment]:
+        self.flush()
+        with self._lock:
+            return [
+                segment
+                for segment in self._segments
+                if segment.start < stop and segment.stop > start
+            ]
+
+    def _map_values(self, segment: _Segment) -> np.memmap:
+        return np.memmap(
+            segment.values_file,
+            dtype=np.float64,
+            mode="r",
+            shape=(segment.length, len(self.regions), len(segment.attributes)),
+        )
+
+    def read_time(self, start: int, stop: int) -> np.ndarray:
+        """Return the times of the steps from start to stop."""
+        time = np.empty(stop - start, dtype=np.float64)
+        for segment in self._overlapping(start, stop):
+            first, last = max(start, segment.start), min(stop, segment.stop)
+            mapped = np.memmap(
+                segment.time_file,
+                dtype=np.float64,
+                mode="r",
+                shape=(segment.length,),
+            )
+            time[first - start : last - start] = mapped[
+                first - segment.start : last - segment.start
+            ]
+        return time
+
+    def read_values(
+        self,
+        start: int,
+        stop: int,
+        attributes: List[AttributeName],
+        regions: slice | int = slice(None),
+    ) -> np.ndarray:
+        """Return the values of the steps from start to stop.
+
+        The attributes that were not captured have nan values.
+
+        :return: Array of shape (time, region, attribute), or
+            (time, attribute) if a single region index is given.
+        """
+        if isinstance(regions, slice):
+            shape = (stop - start, len(self.regions[regions]), len(attributes))
+        else:
+            shape = (stop - start, len(attributes))
+        values = np.full(shape, np.nan, dtype=np.float64)
+        for segment in self._overlapping(start, stop):
+            first, last = max(start, segment.start), min(stop, segment.stop)
+            mapped = self._map_values(segment)[
+                first - segment.start : last - segment.start, regions
+            ]
+            for i, attribute in enumerate(attributes):
+                if attribute in segment.attributes:
+                    values[first - start : last - start, ..., i] = mapped[
+                        ..., segment.attributes.index(attribute)
+                    ]
+        return values
+
+    def truncate(self, length: int):
+        """Remove the steps after the given length."""
+        self.flush()
+        with self._lock:
+            while self._segments and self._segments[-1].start >= length:
+                segment = self._segments.pop()
+                for suffix in (".json", ".values", ".time"):
+                    segment.prefix.with_suffix(suffix).unlink()
+            if self._segments and self._segments[-1].stop > length:
+                segment = self._segments[-1]
+                segment.length = length - segment.start
+                step_size = len(self.regions) * len(segment.attributes) * 8
+                os.truncate(segment.values_file, segment.length * step_size)
+                os.truncate(segment.time_file, segment.length * 8)
+
+
+class _HistoryReader:
+    """Read the values of a history.
+
+    Shared by :py:class:`HistoryStore` and :py:class:`HistorySnapshot` .
+    """
+
+    regions: List[RegionName]
+    attributes: List[AttributeName]
+
+    # Stores the data of the steps from _offset, only the first
+    # _length - _offset rows are valid
+    _values: np.ndarray
+    _time: np.ndarray
+    _length: int
+    # Number of steps written to disk
+    _offset: int
+    _writer: HistoryWriter | None
+    _regions_index: Dict[RegionName, int]
+    _attributes_index: Dict[AttributeName, int]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(
+        self, key: tuple[RegionName, AttributeName]
+    ) -> np.ndarray:
+        region, attribute = key
+        return self.column(region, attribute)
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        """Shape of the history: (time, region, attribute)."""
+        return (self._length, len(self.regions), len(self.attributes))
+
+    @property
+    def offset(self) -> int:
+        """Number of steps that are not in memory anymore."""
+        return self._offset
+
+    @property
+    def time_axis(self) -> np.ndarray:
+        """The times of the steps stored."""
+        return self.time_slice()
+
+    @property
+    def values(self) -> np.ndarray:
+        """All the values as an array of shape (time, region, attribute)."""
+        memory = self._values[: self._length - self._offset]
+        if not self._offset:
+            return memory
+        return np.concatenate(
+            (
+                self._writer.read_values(0, self._offset, self.attributes),
+                memory,
+            )
+        )
+
+    def region_index(self, region: RegionName) -> int:
+        return self._regions_index[region]
+
+    def attribute_index(self, attribute: AttributeName) -> int:
+        return self._attributes_index[attribute]
+
+    def _ranges(self, start: int, stop: int | None):
+        """Split the steps from start to stop between disk and memory."""
+        stop = self._length if stop is None else min(stop, self._length)
+        on_disk = (start, min(stop, self._offset))
+        in_memory = (
+            max(start, self._offset) - self._offset,
+            stop - self._offset,
+        )
+        return on_disk, in_memory
+
+    def time_slice(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """Return the times of the steps from start to stop."""
+        (disk_start, disk_stop), (mem_start, mem_stop) = self._ranges(
+            start, stop
+        )
+        memory = self._time[mem_start:mem_stop]
+        if disk_start >= disk_stop:
+            return memory
+        return np.concatenate(
+            (self._writer.read_time(disk_start, disk_stop), memory)
+        )
+
+    def column(
+        self,
+        region: RegionName,
+        attribute: AttributeName,
+        start: int = 0,
+        stop: int = None,
+    ) -> np.ndarray:
+        """Return the values of the attribute of a region through time.
+
+        :param start: The first step to return.
+        :param stop: The step after the last step to return.
+        """
+        region_index = self._regions_index[region]
+        (disk_start, disk_stop), (mem_start, mem_stop) = self._ranges(
+            start, stop
+        )
+        memory = self._values[
+            mem_start:mem_stop,
+            region_index,
+            self._attributes_index[attribute],
+        ]
+        if disk_start >= disk_stop:
+            return memory
+        on_disk = self._writer.read_values(
+            disk_start, disk_stop, [attribute], region_index
+        )[:, 0]
+        return np.concatenate((on_disk, memory))
+
+    def latest(self, region: RegionName) -> np.ndarray:
+        """Return the last values of all the attributes of a region."""
+        return self._values[
+            self._length - self._offset - 1, self._regions_index[region]
+        ]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Return the history as a DataFrame.
+
+        The index is the time and the columns are a MultiIndex over
+        the regions and attributes.
+        """
+        import pandas as pd
+
+        columns = pd.MultiIndex.from_product(
+            [self.regions, self.attributes], names=["regions", "elements"]
+        )
+        return pd.DataFrame(
+            self.values.reshape(self._length, -1),
+            index=pd.Index(self.time_axis.copy(), name="time"),
+            columns=columns,
+        )
+
+
+class HistorySnapshot(_HistoryReader):
+    """Immutable view of a :py:class:`HistoryStore` at a step.
+
+    It is read like the history, but is not changed when steps are
+    added, the history is truncated or the attributes change.
+    Creating a snapshot does not copy the values: the history copies
+    its arrays before modifying the steps a snapshot can see.
+
+    .. note:: The steps written to disk are read from the files,
+        which are truncated when the history is truncated before them.
+    """
+
+    def __init__(self, history: HistoryStore) -> None:
+        self.regions = history.regions
+        self.attributes = history.attributes
+        self._regions_index = history._regions_index
+        self._attributes_index = history._attributes_index
+        self._length = history._length
+        self._offset = history._offset
+        self._writer = history._writer
+        rows = self._length - self._offset
+        self._values = history._values[:rows]
+        self._time = history._time[:rows]
+        self._values.flags.writeable = False
+        self._time.flags.writeable = False
+
+
+class HistoryStore(_HistoryReader):
+    """Store the values captured at each step of a model.
+
+    Values of a region and an attribute can be accessed as a
+    :py:class:`numpy.ndarray` using ::
+
+        history[region, attribute]
+
+    .. note:: The views returned are not updated when new steps are
+        added. Get a new view after each step.
+
+    When a window is given, only the last steps are kept in memory
+    and the older ones are written to disk. Reading them returns
+    copies instead of views.
+
+    :param regions: The names of the regions.
+    :param attributes: The names of the attributes captured.
+    :param chunk_size: Number of steps allocated at once when the
+        store needs to grow.
+    :param window: Number of recent steps kept in memory. If None,
+        all the steps are kept in memory. Up to window + chunk_size
+        steps are in memory between two writes.
+    :param directory: Where to write the steps out of the window.
+        If None, a temporary directory removed on :py:meth:`close` .
+    """
+
+    chunk_size: int
+    window: int | None
+    # Whether snapshots can see the steps in the arrays
+    _shared: bool
+
+    def __init__(
+        self,
+        regions: Iterable[RegionName],
+        attributes: Iterable[AttributeName],
+        chunk_size: int = 1024,
+        window: int = None,
+        directory: Path = None,
+    ) -> None:
+        self.regions = list(regions)
+        self.attributes = list(attributes)
+        # Spill to disk at least every window steps
+        self.chunk_size = chunk_size if window is None else min(
+            chunk_size, max(window, 1)
+        )
+        self.window = window
+        self._regions_index = {
+            region: i for i, region in enumerate(self.regions)
+        }
+        self._attributes_index = {
+            attribute: i for i, attribute in enumerate(self.attributes)
+        }
+        self._values = np.empty(
+            (self.chunk_size, len(self.regions), len(self.attributes)),
+            dtype=np.float64,
+        )
+        self._time = np.empty(self.chunk_size, dtype=np.float64)
+        self._length = 0
+        self._offset = 0
+        self._shared = False
+        self._writer = None
+        if window is not None:
+            self._writer = HistoryWriter(
+                directory or tempfile.mkdtemp(prefix="pysimgame_history_"),
+                self.regions,
+                remove=directory is None,
+            )
+
+    @property
+    def capacity(self) -> int:
+        """Number of steps that can be stored in memory before growing."""
+        return len(self._time)
+
+    def append(self, time: float, values: np.ndarray):
+        """Add the values of a step.
+
+        :param time: The time of the step.
+        :param values: Array of shape (region, attribute).
+        """
+        row = self._length - self._offset
+        if row == self.capacity:
+            if self.window is not None and row > self.window:
+                self._spill(row - self.window)
+            else:
+                self._grow()
+            row = self._length - self._offset
+        self._values[row] = values
+        self._time[row] = time
+        # Increment at the end, so readers never see an incomplete step
+        self._length += 1
+
+    def _spill(self, n_steps: int):
+        """Write the oldest steps in memory to disk."""
+        self._writer.write(
+            self._offset,
+            self.attributes,
+            self._time[:n_steps].copy(),
+            self._values[:n_steps].copy(),
+        )
+        # New arrays, as readers can have views on the current ones
+        kept = self._length - self._offset - n_steps
+        values = np.empty_like(self._values)
+        values[:kept] = self._values[n_steps : n_steps + kept]
+        time = np.empty_like(self._time)
+        time[:kept] = self._time[n_steps : n_steps + kept]
+        self._values, self._time = values, time
+        self._shared = False
+        self._offset += n_steps
+
+    def update_latest(
+        self, attributes: Iterable[AttributeName], values: np.ndarray
+    ):
+        """Replace the values of some attributes at the last step.
+
+        :param attributes: The attributes to replace.
+        :param values: Array of shape (region, attribute).
+        """
+        indices = [self._attributes_index[a] for a in attributes]
+        self._unshare()
+        self._values[self._length - self._offset - 1][:, indices] = values
+
+    def set_attributes(self, attributes: Iterable[AttributeName]):
+        """Change the attributes stored.
+
+        The values of the attributes kept are preserved. The new
+        attributes have nan values for the steps already stored.
+        """
+        attributes = list(attributes)
+        if attributes == self.attributes:
+            return
+        rows = self._length - self._offset
+        values = np.full(
+            (self.capacity, len(self.regions), len(attributes)),
+            np.nan,
+            dtype=np.float64,
+        )
+        for i, attribute in enumerate(attributes):
+            if attribute in self._attributes_index:
+                values[:rows, :, i] = self._values[
+                    :rows, :, self._attributes_index[attribute]
+                ]
+        self._values = values
+        if self._shared:
+            self._time = self._time.copy()
+            self._shared = False
+        self.attributes = attributes
+        self._attributes_index = {
+            attribute: i for i, attribute in enumerate(self.attributes)
+        }
+
+    def _set_memory(
+        self, offset: int, time_axis: np.ndarray, values: np.ndarray
+    ):
+        """Replace the steps in memory, starting at offset."""
+        length = len(time_axis)
+        # Keep a free chunk at the end
+        capacity = (length // self.chunk_size + 1) * self.chunk_size
+        new_values = np.empty((capacity, *values.shape[1:]), dtype=np.float64)
+        new_values[:length] = values
+        new_time = np.empty(capacity, dtype=np.float64)
+        new_time[:length] = time_axis
+        self._values, self._time = new_values, new_time
+        self._shared = False
+        self._offset = offset
+        self._length = offset + length
+
+    def restore(self, time_axis: np.ndarray, values: np.ndarray):
+        """Replace the content of the history.
+
+        :param time_axis: The times of the steps.
+        :param values: Array of shape (time, region, attribute).
+        """
+        length = len(time_axis)
+        if values.shape != (length, len(self.regions), len(self.attributes)):
+            raise ValueError(
+                f"Cannot restore values of shape {values.shape} "
+                f"in a history of shape {self.shape}."
+            )
+        offset = 0
+        if self._writer is not None:
+            self._writer.truncate(0)
+            if length > self.window:
+                offset = length - self.window
+                self._writer.write(
+                    0,
+                    self.attributes,
+                    np.array(time_axis[:offset]),
+                    np.array(values[:offset]),
+                )
+        self._set_memory(offset, time_axis[offset:], values[offset:])
+
+    def truncate(self, length: int):
+        """Remove the steps after the given length."""
+        if not 0 <= length <= self._length:
+            raise ValueError(
+                f"Cannot truncate history of length {self._length} "
+                f"to {length}."
+            )
+        if length >= self._offset:
+            # The next steps are written over the removed ones
+            self._unshare()
+            self._length = length
+            return
+        # Read back the last steps from the disk
+        offset = max(0, length - self.window)
+        time_axis = self._writer.read_time(offset, length)
+        values = self._writer.read_values(offset, length, self.attributes)
+        self._writer.truncate(offset)
+        self._set_memory(offset, time_axis, values)
+
+    def copy(self) -> HistoryStore:
+        """Return a copy of the history, with all the steps in memory."""
+        history = HistoryStore(self.regions, self.attributes, self.chunk_size)
+        history.restore(self.time_axis, self.values)
+        return history
+
+    def close(self):
+        """Stop writing to the disk."""
+        if self._writer is not None:
+            self._writer.close()
+
+    def _grow(self):
+        """Add a chunk to the arrays."""
+        rows = self._length - self._offset
+        new_capacity = self.capacity + self.chunk_size
+        values = np.empty(
+            (new_capacity, *self._values.shape[1:]), dtype=np.float64
+        )
+        values[:rows] = self._values[:rows]
+        time = np.empty(new_capacity, dtype=np.float64)
+        time[:rows] = self._time[:rows]
+        self._values, self._time = values, time
+        self._shared = False
+
+    def snapshot(self) -> HistorySnapshot:
+        """Return an immutable view of the history at the last step."""
+        self._shared = True
+        return HistorySnapshot(self)
+
+    def _unshare(self):
+        """Copy the arrays before modifying steps seen by snapshots."""
+        if self._shared:
+            self._values = self._values.copy()
+            self._time = self._time.copy()
+            self._shared = False
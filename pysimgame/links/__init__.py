@@ -3,8 +3,9 @@
 This module contains several linking utilities for connecting
 regions with each other.
 """
-from .connexions import export_import, regions_average, regions_sum
+from .connexions import export_import, flows, regions_average, regions_sum
 from .exports_methods import (
+    DistributionRule,
     export_all_equally_distibuted,
     fulfil_imports,
     weighted_average,
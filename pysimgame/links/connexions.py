@@ -8,7 +8,10 @@ from pysimgame.utils.logging import logging, register_logger
 if TYPE_CHECKING:
     from typing import Callable, List
 
-    from pysimgame.types import ExportImportMethod, ModelsDict
+    from pysimgame.types import ExportImportMethod, FlowMatrix, ModelsDict
+
+    from .exports_methods import DistributionRule
+    from .flows import FlowLink
 
 
 def regions_sum(input_variable: str, output_variable: str) -> None:
@@ -39,7 +42,7 @@ def regions_average(input_variable: str, output_variable: str) -> None:
 def export_import(
     export_variable: str,
     import_variable: str,
-    method: ExportImportMethod,
+    method: DistributionRule | ExportImportMethod,
 ) -> None:
     """Create an import export system between regions.
 
@@ -48,15 +51,19 @@ def export_import(
     Different methods exist for splitting.
 
     """
+    from .exports_methods import DistributionRule
     from .manager import _LINKS_MANAGER
 
     # The method that will be send
-    export_import_method: ExportImportMethod
-    match len(signature(method).parameters):
-        case 1:
+    export_import_method: DistributionRule | ExportImportMethod
+    match method:
+        case DistributionRule():
+            # Computed for all the regions at once
+            export_import_method = method
+        case _ if len(signature(method).parameters) == 1:
             # only the models
             export_import_method = method
-        case 3:
+        case _ if len(signature(method).parameters) == 3:
             # need to specifiy the export and imports
             def export_import_method(models: ModelsDict):
                 return method(export_variable, import_variable, models)
@@ -73,3 +80,38 @@ def export_import(
     _LINKS_MANAGER.MODEL_MANAGER.link_export_import(
         export_variable, import_variable, export_import_method
     )
+
+
+def flows(
+    source_variable: str,
+    inflow_variable: str,
+    outflow_variable: str,
+    weights: FlowMatrix,
+    capacities: FlowMatrix | None = None,
+    record: bool = False,
+    max_records: int | None = 1000,
+) -> FlowLink:
+    """Create flows of a variable between pairs of regions.
+
+    At every step, the flow from region i to region j is the source
+    variable of i multiplied by ``weights[i, j]`` , limited by
+    ``capacities[i, j]`` if given.
+    The matrices have shape (region, region) and can be sparse, or be
+    functions of the time returning them.
+
+    The inflow and outflow variables of each region receive the sum
+    of the flows. The flows between the pairs of regions are recorded
+    if record is True, keeping the last max_records steps, see
+    :py:class:`~pysimgame.links.flows.FlowLink`.
+    """
+    from .manager import _LINKS_MANAGER
+
+    return _LINKS_MANAGER.MODEL_MANAGER.link_flows(
+        source_variable,
+        inflow_variable,
+        outflow_variable,
+        weights,
+        capacities,
+        record,
+        max_records,
+    )
@@ -5,11 +5,20 @@ Note import variables of time t are computed using the export variables
 of time t-1.
 Other variables computed at time t will use import variables computed in time t.
 TODO: make sure it should work this way, maybe other variables want to use t-1
+
+The splitting methods given here are :py:class:`DistributionRule`,
+computing the imports of all the regions at once from arrays.
+Functions taking the components of the models (see
+:py:data:`~pysimgame.types.ExportImportMethod`) can also be used.
 """
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Dict, List, Tuple
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
+
+import numpy as np
 
 from pysimgame.utils.logging import register_logger
 
@@ -17,34 +26,73 @@ logger = logging.getLogger(__name__)
 register_logger(logger)
 
 if TYPE_CHECKING:
-    from pysimgame.types import ExportImportMethod, ModelType, RegionName
+    import pysd
+
+    from pysimgame.types import (
+        AttributeName,
+        ExportImportMethod,
+        ModelMethod,
+        RegionName,
+    )
+
+
+@dataclass(frozen=True)
+class DistributionRule:
+    """Distribute the exports of all the regions to their imports.
+
+    :param distribute: Function receiving the array of the exports of
+        all the regions, then the arrays of the variables, and
+        returning the array of the imports.
+    :param variables: The variables read in all the regions and given
+        to distribute. Use :py:data:`IMPORTS` for the values of the
+        import variable given by its equation.
+    """
 
+    distribute: Callable[..., np.ndarray]
+    variables: Tuple[AttributeName, ...] = ()
 
-def export_all_equally_distibuted() -> ExportImportMethod:
-    """Distribute the sum of the exports to all regions equally.
 
-    .. note:: this ignores the equation set for the imports
-    """
+# Placeholder for the import variable in the variables of a rule
+IMPORTS = "__imports__"
 
-    def _export_all_equally_distibuted(
-        export_variable: str,
-        import_variable: str,
-        models: Dict[RegionName, ModelType],
-    ) -> Tuple[Dict[RegionName, float], Dict[RegionName, float]]:
 
-        exports = {
-            region: getattr(model, export_variable)()
-            for region, model in models.items()
-        }
-        total_export = sum(exports.items())
-        import_value = total_export / len(models)
-        imports = {region: import_value for region in models.keys()}
-        return exports, imports
+def _equally(exports: np.ndarray) -> np.ndarray:
+    return np.full_like(exports, exports.sum() / len(exports))
 
-    return _export_all_equally_distibuted
 
+def _weighted(exports: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    return exports.sum() * weights / weights.sum()
+
+
+def _fulfil(
+    exports: np.ndarray,
+    requested: np.ndarray,
+    preferences: np.ndarray,
+    reverse: bool = False,
+) -> np.ndarray:
+    # Stable sort, most needing first by default
+    order = np.argsort(
+        preferences if reverse else -preferences, kind="stable"
+    )
+    requested = requested[order]
+    # What is left of the exports when each region is served
+    available = exports.sum() - (np.cumsum(requested) - requested)
+    imports = np.empty_like(exports)
+    imports[order] = np.where(
+        available > 0, np.minimum(requested, available), 0.0
+    )
+    return imports
+
+
+def export_all_equally_distibuted() -> DistributionRule:
+    """Distribute the sum of the exports to all regions equally.
 
-def weighted_average(weighted_attribute: str) -> ExportImportMethod:
+    .. note:: this ignores the equation set for the imports
+    """
+    return DistributionRule(_equally)
+
+
+def weighted_average(weighted_attribute: str) -> DistributionRule:
     """Will perform a weighted average on the given attribute value.
 
     This method needs to be called and will return the desired import
@@ -52,35 +100,12 @@ def weighted_average(weighted_attribute: str) -> ExportImportMethod:
     .. note:: this ignores the equation set for the imports
 
     """
-
-    def _weighted_average(
-        export_variable: str,
-        import_variable: str,
-        models: Dict[RegionName, ModelType],
-    ) -> Tuple[Dict[RegionName, float], Dict[RegionName, float]]:
-
-        exports = {
-            region: getattr(model, export_variable)()
-            for region, model in models.items()
-        }
-        total_export = sum(exports.values())
-        weights = {
-            region: getattr(model, weighted_attribute)()
-            for region, model in models.items()
-        }
-        total_weight = sum(weights)
-        imports = {
-            region: total_export * w / total_weight
-            for region, w in weights.items()
-        }
-        return exports, imports
-
-    return _weighted_average
+    return DistributionRule(_weighted, (weighted_attribute,))
 
 
 def fulfil_imports(
     preference: str, reverse: bool = False
-) -> ExportImportMethod:
+) -> DistributionRule:
     """Try to fulfil the import values.
 
     Will try to fulfil first the imports using the highest value given
@@ -93,39 +118,120 @@ def fulfil_imports(
     then the overflow is thrown away.
 
     """
+    return DistributionRule(
+        partial(_fulfil, reverse=reverse), (IMPORTS, preference)
+    )
+
+
+class ExportImportLink:
+    """Link an export and an import variable between all the regions.
+
+    Before each step (when called), the exports of all the regions are
+    gathered into an array and the rule computes the imports.
+    During the step, the export and import variables of the models
+    return the values computed.
+    The components of the models are replaced only once, when the link
+    is created.
+
+    :param models: The models of the regions.
+    :param rule: A :py:class:`DistributionRule`, or a function taking
+        the components of the models and returning the exports and
+        imports of each region, as dicts or lists.
+    """
 
-    def _fulfil_imports(
-        export_variable: str,
-        import_variable: str,
-        models: Dict[str, ModelType],
-    ) -> Tuple[Dict[RegionName, float], Dict[RegionName, float]]:
-        exports = {
-            region: getattr(model, export_variable)()
-            for region, model in models.items()
-        }
-        total_export = sum(exports.values())
-        preference_values = {
-            region: getattr(model, preference)()
-            for region, model in models.items()
-        }
-        keys = sorted(
-            list(preference_values.keys()),
-            key=preference_values.values().__getitem__,
-            reverse=not reverse,  # Sort from most needing by default
-        )
-        logger.debug(f"Steps {total_export = }")
-        imports = {region: 0.0 for region in models.keys()}
-        while keys and total_export > 0:
-            region = keys.pop(0)
-            required = getattr(models[region], import_variable)()
-            logger.debug(f"{region = }, {required = }")
-            imports[region] = min(required, total_export)
-            # updates the exports left
-            total_export -= required
-        logger.debug(f"Steps {imports = }")
-
-        # TODO: decide if we throw away the exports or if we change their
-        # value
-        return exports, imports
-
-    return _fulfil_imports
+    regions: List[RegionName]
+    exports: np.ndarray
+    imports: np.ndarray
+
+    def __init__(
+        self,
+        models: Dict[RegionName, pysd.statefuls.Model],
+        export_variable: AttributeName,
+        import_variable: AttributeName,
+        rule: DistributionRule | ExportImportMethod,
+    ) -> None:
+        self.export_variable = export_variable
+        self.import_variable = import_variable
+        self.rule = rule
+        self.regions = list(models)
+        self._models = list(models.values())
+        components = [model.components for model in models.values()]
+        self._export_funcs = [
+            getattr(comps, export_variable) for comps in components
+        ]
+        self._import_funcs = [
+            getattr(comps, import_variable) for comps in components
+        ]
+        if isinstance(rule, DistributionRule):
+            self._variables_funcs = [
+                self._import_funcs
+                if variable == IMPORTS
+                else [getattr(comps, variable) for comps in components]
+                for variable in rule.variables
+            ]
+        else:
+            # Adapter for the methods using the components
+            self._components = dict(zip(self.regions, components))
+
+        self.exports = np.zeros(len(self.regions))
+        self.imports = np.zeros(len(self.regions))
+        # The equations of the variables are used while gathering, also
+        # when the methods read them from the components
+        self._gathering = False
+        for index, model in enumerate(models.values()):
+            model.set_components(
+                {
+                    export_variable: self._component(
+                        self.exports, index, self._export_funcs[index]
+                    ),
+                    import_variable: self._component(
+                        self.imports, index, self._import_funcs[index]
+                    ),
+                }
+            )
+
+    def _component(
+        self, values: np.ndarray, index: int, original: ModelMethod
+    ) -> ModelMethod:
+        def component():
+            if self._gathering:
+                return original()
+            return values[index]
+
+        return component
+
+    def __call__(self):
+        """Compute the exports and imports of all the regions."""
+        n_regions = len(self.regions)
+        self._gathering = True
+        self._clean_caches()
+        try:
+            if isinstance(self.rule, DistributionRule):
+                exports = np.fromiter(
+                    (f() for f in self._export_funcs), float, n_regions
+                )
+                arrays = [
+                    np.fromiter((f() for f in funcs), float, n_regions)
+                    for funcs in self._variables_funcs
+                ]
+                imports = self.rule.distribute(exports, *arrays)
+            else:
+                exports, imports = self.rule(self._components)
+                exports = self._to_array(exports)
+                imports = self._to_array(imports)
+        finally:
+            self._gathering = False
+            self._clean_caches()
+        self.exports[:] = exports
+        self.imports[:] = imports
+
+    def _clean_caches(self):
+        # The values cached while gathering used the equations and the
+        # ones cached during the step used the values computed
+        for model in self._models:
+            model.clean_caches()
+
+    def _to_array(self, values: Dict[RegionName, float] | List[float]):
+        if isinstance(values, dict):
+            values = [values[region] for region in self.regions]
+        return np.asarray(values, dtype=float)
@@ -0,0 +1,204 @@
+"""Flows between pairs of regions, like migrations or trade.
+
+The flows are given by sparse matrices of shape (region, region), where
+the rows are the regions of origin and the columns the regions of
+destination, in the order of the regions of the model manager.
+
+Before each step (when called), :py:class:`FlowLink` computes the flow
+of each pair of regions ::
+
+    flows[i, j] = weights[i, j] * source[i]
+
+limited by ``capacities[i, j]`` if given. The outflow of a region is
+the sum of its row and its inflow the sum of its column.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+if TYPE_CHECKING:
+    import pysd
+
+    from pysimgame.types import (
+        AttributeName,
+        FlowMatrix,
+        ModelMethod,
+        RegionName,
+    )
+
+
+class FlowLink:
+    """Link the flows of a variable between pairs of regions.
+
+    The inflow and outflow variables of the models are replaced once,
+    when the link is created, by functions returning the values
+    computed before the step.
+
+    :param models: The models of the regions.
+    :param source_variable: The variable of the region of origin
+        multiplied by the weights.
+    :param weights: The weights of the flows. A function of the time
+        returning the matrix can be given if they change.
+    :param capacities: The maximum flows, in the same format. Pairs
+        without capacity have no flow.
+    :param record: Whether the flows of each step are recorded in
+        :py:attr:`history` .
+    :param max_records: Number of steps kept in :py:attr:`history` ,
+        the oldest ones are dropped. If None, all the steps are kept.
+    """
+
+    regions: List[RegionName]
+    flows: sparse.csr_matrix
+    inflows: np.ndarray
+    outflows: np.ndarray
+    # Flows at each time, when recorded, from the oldest
+    history: Dict[float, sparse.csr_matrix]
+    max_records: int | None
+
+    def __init__(
+        self,
+        models: Dict[RegionName, pysd.statefuls.Model],
+        source_variable: AttributeName,
+        inflow_variable: AttributeName,
+        outflow_variable: AttributeName,
+        weights: FlowMatrix,
+        capacities: FlowMatrix | None = None,
+        record: bool = False,
+        max_records: int | None = 1000,
+    ) -> None:
+        self.source_variable = source_variable
+        self.inflow_variable = inflow_variable
+        self.outflow_variable = outflow_variable
+        self.regions = list(models)
+        self.record = record
+        self.history = {}
+        self.max_records = max_records
+        self._models = list(models.values())
+        self._source_funcs = [
+            getattr(model.components, source_variable)
+            for model in self._models
+        ]
+        self._weights = weights
+        self._capacities = capacities
+        # The structure of constant weights is computed only once
+        self._weights_matrix = None
+        if not callable(weights):
+            self._weights_matrix = self._to_csr(weights)
+            self._origins = self._rows(self._weights_matrix)
+
+        n_regions = len(self.regions)
+        self.flows = sparse.csr_matrix((n_regions, n_regions))
+        self.inflows = np.zeros(n_regions)
+        self.outflows = np.zeros(n_regions)
+        for index, model in enumerate(self._models):
+            model.set_components(
+                {
+                    inflow_variable: self._component(self.inflows, index),
+                    outflow_variable: self._component(self.outflows, index),
+                }
+            )
+
+    @staticmethod
+    def _component(values: np.ndarray, index: int) -> ModelMethod:
+        def component():
+            return values[index]
+
+        return component
+
+    def _to_csr(self, matrix: sparse.spmatrix | np.ndarray):
+        n_regions = len(self.regions)
+        matrix = sparse.csr_matrix(matrix, dtype=float)
+        if matrix.shape != (n_regions, n_regions):
+            raise ValueError(
+                f"Flow matrix of shape {matrix.shape} given for "
+                f"{n_regions} regions."
+            )
+        return matrix
+
+    @staticmethod
+    def _rows(matrix: sparse.csr_matrix) -> np.ndarray:
+        """Return the row of each stored value of the matrix."""
+        return np.repeat(
+            np.arange(matrix.shape[0]), np.diff(matrix.indptr)
+        )
+
+    def __call__(self):
+        """Compute the flows between the regions."""
+        n_regions = len(self.regions)
+        time = self._models[0].time()
+        if self._weights_matrix is None:
+            weights = self._to_csr(self._weights(time))
+            origins = self._rows(weights)
+        else:
+            weights = self._weights_matrix
+            origins = self._origins
+
+        source = np.fromiter(
+            (f() for f in self._source_funcs), float, n_regions
+        )
+        flows = sparse.csr_matrix(
+            (weights.data * source[origins], weights.indices, weights.indptr),
+            shape=weights.shape,
+        )
+        if self._capacities is not None:
+            capacities = self._capacities
+            if callable(capacities):
+                capacities = capacities(time)
+            flows = flows.minimum(self._to_csr(capacities)).tocsr()
+            origins = self._rows(flows)
+
+        self.flows = flows
+        self.outflows[:] = np.bincount(
+            origins, weights=flows.data, minlength=n_regions
+        )
+        self.inflows[:] = np.bincount(
+            flows.indices, weights=flows.data, minlength=n_regions
+        )
+        if self.record:
+            self.history[time] = flows
+            if (
+                self.max_records is not None
+                and len(self.history) > self.max_records
+            ):
+                del self.history[next(iter(self.history))]
+        # The values cached used the previous flows
+        for model in self._models:
+            model.clean_caches()
+
+    def truncate(self, time: float):
+        """Forget the flows recorded after the time.
+
+        Called when the model goes back to a previous time.
+        """
+        for recorded in [t for t in self.history if t > time]:
+            del self.history[recorded]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Return the flows recorded between each pair of regions.
+
+        Only the pairs with a flow stored in the matrices are given,
+        with the columns time, origin, destination and flow.
+        """
+        regions = np.array(self.regions, dtype=object)
+        frames = []
+        for time, flows in self.history.items():
+            coo = flows.tocoo()
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "time": time,
+                        "origin": regions[coo.row],
+                        "destination": regions[coo.col],
+                        "flow": coo.data,
+                    }
+                )
+            )
+        if not frames:
+            return pd.DataFrame(
+                columns=["time", "origin", "destination", "flow"]
+            )
+        return pd.concat(frames, ignore_index=True)
@@ -71,6 +71,12 @@ class MLVarMngr(GameComponentManager):
         # Create empty arrays for storing variables
         self.x_train = np.empty((0, len(self.x_variables)))
         self.y_pred = np.empty((0, len(self.y_variables)))
+        # The variables are read from the history
+        self.MODEL_MANAGER.subscribe(
+            self, [*self.x_variables, *self.y_variables]
+        )
+        # Steps of the history already read
+        self._n_steps_read = 0
 
     def process_events(self, event: pygame.event.Event) -> bool:
         """Listen the events for this manager."""
@@ -80,27 +86,33 @@ class MLVarMngr(GameComponentManager):
                 return False
 
     def read_model(self):
-        """Read the current variables in the model."""
-        self.MODEL_MANAGER.model_lock.acquire()
-
-        for region, model in self.MODEL_MANAGER.models.items():
-            # Add the current settings to the ml data
-            new_x = np.array(
-                # Note: i removed a () which was in pysd
-                # maybe that is a bug
-                [getattr(model, attr) for attr in self.x_variables]
-            ).reshape((1, -1))
-
+        """Read the variables of the steps added to the history.
+
+        All the steps are read, also when several steps are notified
+        at once.
+        """
+        # Not modified by the model thread while it is read
+        history = self.MODEL_MANAGER.snapshot
+        steps = slice(self._n_steps_read, len(history))
+        time_axis = history.time_axis[steps]
+        for region in history.regions:
+            # Arrays of shape (time, variable)
+            new_x = np.stack(
+                [history[region, attr][steps] for attr in self.x_variables],
+                axis=1,
+            )
             self.x_train = np.concatenate((self.x_train, new_x))
-            new_y = np.array(
-                # Note: i removed a () which was in pysd
-                # maybe that is a bug
-                [getattr(model, attr) for attr in self.y_variables]
-            ).reshape((1, -1))
+            new_y = np.stack(
+                [history[region, attr][steps] for attr in self.y_variables],
+                axis=1,
+            )
             self.y_pred = np.concatenate((self.y_pred, new_y))
             # Add the meta data
-            self.metadata.append(
-                {"time": getattr(model, "time"), "region": region}
+            self.metadata = pd.concat(
+                [
+                    self.metadata,
+                    pd.DataFrame({"time": time_axis, "region": region}),
+                ],
+                ignore_index=True,
             )
-
-        self.MODEL_MANAGER.model_lock.release()
+        self._n_steps_read = len(history)
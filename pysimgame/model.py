@@ -2,23 +2,43 @@
 from __future__ import annotations
 
 import json
+import math
+import pickle
 import re
-from functools import cached_property, singledispatchmethod
+import time
+from functools import cached_property, singledispatchmethod, wraps
 from pathlib import Path
 from threading import Lock, Thread
 from types import NotImplementedType
-from typing import TYPE_CHECKING, Callable, Dict, Iterable, List
-
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+)
+
+import numpy as np
 import pandas as pd
 import pygame
 
 import pysimgame
 from pysimgame import links
 from pysimgame.actions.actions import BaseAction, Budget, Edict, Policy
+from pysimgame.history import HistorySnapshot, HistoryStore
+from pysimgame.links.exports_methods import ExportImportLink
+from pysimgame.links.flows import FlowLink
 from pysimgame.links.manager import BaseLink
 from pysimgame.links.shared_variables import SharedVariables
+from pysimgame.profiling import ComponentProfiler
 from pysimgame.regions_display import RegionComponent
+from pysimgame.rewind import StateTimeline
 from pysimgame.utils.abstract_managers import GameComponentManager
+from pysimgame.utils.directories import DOC_CACHE_FILENAME
+from pysimgame.utils.misc import file_hash
+from pysimgame.utils.pysd_fork import fork_model
 
 from .utils.logging import logger_enter_exit
 
@@ -26,7 +46,8 @@ if TYPE_CHECKING:
     import pysd
     from pysimgame.types import AttributeName
 
-    from pysimgame.types import ExportImportMethod
+    from pysimgame.links.exports_methods import DistributionRule
+    from pysimgame.types import ExportImportMethod, FlowMatrix
     from pysimgame.ml.types import TestVariables, TrainVariables
 
     from .game_manager import GameManager
@@ -36,6 +57,7 @@ if TYPE_CHECKING:
 
 
 POLICY_PREFIX = "policy_"
+MODEL_SAVE_FILENAME = "model.pickle"
 # policy convention
 # 1. POLICY_PREFIX
 # 2. the name of the policy
@@ -82,13 +104,33 @@ class AbstractModelManager(GameComponentManager):
     :param model_lock: A lock for the model. This can be aquired by
         other manager that want to ensure no step can happen while
         they hold the lock.
+    :param snapshot: The values captured, as they were after the last
+        step. Other threads can read it without the lock.
     """
 
     models: dict[RegionName, ModelType]
     model_lock: Lock
+    snapshot: HistorySnapshot
 
     data: dict[(RegionName, AttributeName), pd.Series]
 
+    def subscribe(
+        self, subscriber: Hashable, attributes: Iterable[AttributeName]
+    ):
+        """Request the attributes to be captured at each step.
+
+        By default all the attributes are captured.
+        Override it if your model can capture only the attributes
+        that are read.
+
+        :param subscriber: Identifies who reads the attributes.
+            Subscribing again replaces the previous attributes.
+        :param attributes: The attributes read by the subscriber.
+        """
+
+    def unsubscribe(self, subscriber: Hashable):
+        """Remove the attributes requested by the subscriber."""
+
     def accept_ml_vars_mngr(
         self, ml_manager: MLVarMngr
     ) -> tuple[TrainVariables, TestVariables]:
@@ -103,6 +145,31 @@ class AbstractModelManager(GameComponentManager):
         )
 
 
+def model_manager_class(name: str = "pysd") -> type[ModelManager]:
+    """Return the class of model manager registered under name.
+
+    Available model managers:
+        * "pysd": one pysd model per region (:py:class:`ModelManager`)
+        * "vectorized": all the regions in a single vectorized model
+            (:py:class:`~pysimgame.vectorized.VectorizedModelManager`)
+        * "parallel": groups of regions stepped in worker processes
+            (:py:class:`~pysimgame.parallel.ParallelModelManager`)
+    """
+    match name:
+        case "pysd":
+            return ModelManager
+        case "vectorized":
+            from .vectorized import VectorizedModelManager
+
+            return VectorizedModelManager
+        case "parallel":
+            from .parallel import ParallelModelManager
+
+            return ParallelModelManager
+        case _:
+            raise ValueError(f"Unknown model manager '{name}'.")
+
+
 class ModelManager(AbstractModelManager):
     """Model used to manage the pysd model-s in the simulation.
 
@@ -122,10 +189,29 @@ class ModelManager(AbstractModelManager):
     time_step: float
     clock: pygame.time.Clock
     fps: float
+    # Maximum number of times per second the model thread wakes up
+    tick_rate: float
     doc: pd.DataFrame
+    history: HistoryStore
+    # States recorded for rewinding, None unless the "Rewind" setting
+    # is set
+    timeline: StateTimeline | None
+    # Whether all the capture attributes are stored in the history
+    full_history: bool
+    # Attributes requested by each subscriber
+    _subscriptions: Dict[Hashable, set[AttributeName]]
+    # Values replacing the initial conditions of the game for each region
+    initial_conditions_overrides: Dict[RegionName, Dict[str, float]] = {}
+    # Records the time spent in the components, None when not profiling
+    profiler: ComponentProfiler | None = None
 
     # Stores some functions that will be called before the step
     _presteps_calls: List[Callable[[], None]] = []
+    # Values of the functions evaluated once per step, for _step_cache_step
+    _step_cache: Dict[Callable, Any]
+    _step_cache_step: int
+    # Actions used, as (action path, region name, action state)
+    _actions_journal: List[tuple[tuple[str, ...], RegionName, Any]]
 
     _export_imports_dic: Dict = {}
 
@@ -153,18 +239,27 @@ class ModelManager(AbstractModelManager):
             Type
             Subs
             Comment
+        """
+        if not hasattr(self, "_doc_cache"):
+            self._load_models()
+        return self._doc_cache["components"]
+
+    def _parse_doc(
+        self, model: pysd.statefuls.Model
+    ) -> Dict[str, Dict[str, str]]:
+        """Parse the docstrings of the components of the model.
 
         Code directly copied and modified from pysd.
         """
         collector = {}
-        for name, varname in self._model.components._namespace.items():
+        for name, varname in model.components._namespace.items():
             # if varname not in self.capture_attributes:
             #     # Ignore variable not in capture elements
             #     continue
             try:
                 # TODO correct this when Original Eqn is in several lines
                 docstring: str
-                docstring = getattr(self._model.components, varname).__doc__
+                docstring = getattr(model.components, varname).__doc__
                 lines = docstring.split("\n")
 
                 for unit_line in range(3, 9):
@@ -209,6 +304,69 @@ class ModelManager(AbstractModelManager):
         self.logger.debug(f"Doc: {collector}")
         return collector
 
+    def _load_doc(self, model: pysd.statefuls.Model) -> Dict[str, Any]:
+        """Return the documentation of the model.
+
+        Parsing the docstrings is slow on large models, so the result
+        is cached in the game directory with the hash of the model
+        file, and read again while the model file does not change.
+
+        :return: A dict with the hash of the model file, the parsed
+            "components" (see :py:attr:`doc`) and the "model_doc"
+            table of :py:meth:`pysd.statefuls.Model.doc` as lists.
+        """
+        cache_file = Path(self.GAME.GAME_DIR, DOC_CACHE_FILENAME)
+        model_hash = file_hash(self.GAME.PYSD_MODEL_FILE)
+        if cache_file.exists():
+            try:
+                with open(cache_file, "r") as f:
+                    cache = json.load(f)
+                if cache.get("hash") == model_hash:
+                    self.logger.debug(f"Read doc from {cache_file}.")
+                    return cache
+            except (OSError, ValueError) as exp:
+                self.logger.warning(f"Could not read {cache_file}: {exp}")
+        cache = {
+            "hash": model_hash,
+            "components": self._parse_doc(model),
+            "model_doc": model.doc().to_dict(orient="list"),
+        }
+        try:
+            with open(cache_file, "w") as f:
+                json.dump(cache, f)
+        except (OSError, TypeError, ValueError) as exp:
+            self.logger.warning(f"Could not write {cache_file}: {exp}")
+        return cache
+
+    @property
+    def _constants(self) -> List[str]:
+        """The python names of the constants of the model."""
+        model_doc = self._doc_cache["model_doc"]
+        return [
+            name
+            for name, kind in zip(model_doc["Py Name"], model_doc["Type"])
+            if kind == "constant"
+        ]
+
+    @property
+    def outputs(self) -> pd.DataFrame:
+        """A DataFrame with the values stored in :py:attr:`history`.
+
+        The DataFrame is created at each call, prefer using the views
+        of the :py:attr:`history` when possible.
+        """
+        return self.history.to_dataframe()
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """Same as :py:attr:`outputs`."""
+        return self.outputs
+
+    @property
+    def time_axis(self) -> np.ndarray:
+        """The times at which the values were stored."""
+        return self.history.time_axis
+
     @property
     def fps(self):
         """Get the frames per second of the model."""
@@ -264,6 +422,10 @@ class ModelManager(AbstractModelManager):
     # endregion Properties
     # region Prepare
     def prepare(self):
+        # Each manager has its own calls, not the ones of the class
+        self._presteps_calls = []
+        self._actions_journal = []
+        self.model_lock = Lock()
 
         self._load_models()
         # Set the captured_elements
@@ -278,32 +440,47 @@ class ModelManager(AbstractModelManager):
         self.logger.debug(f"time_step {self._model.components.time_step()}.")
         self.logger.debug(f"final_time {self._model.components.final_time()}.")
 
-        self.time_axis = []
         self.current_time = self._model.time()
         self.current_step = int(0)
+        self._clean_step_cache()
         self.time_step = self._model.components.time_step()
 
         self.fps = self.GAME.SETTINGS.get("FPS", 1)
+        self.tick_rate = self.GAME.SETTINGS.get("ModelTickRate", 60)
 
         regions = self.GAME_MANAGER.game.REGIONS_DICT.keys()
-        # Create a df to store the output
-        index = pd.MultiIndex.from_product(
-            [regions, self.capture_attributes],
-            names=["regions", "elements"],
+        # Only the attributes subscribed are captured
+        self._subscriptions = {}
+        self.full_history = self.GAME.SETTINGS.get("FullHistory", False)
+        # Create the store for the output
+        self.history = HistoryStore(
+            regions,
+            self.subscribed_attributes,
+            # Older steps are written to disk
+            window=self.GAME.SETTINGS.get("HistoryWindow", None),
+            directory=self.GAME.SETTINGS.get("HistoryDirectory", None),
         )
-        self.logger.debug(f"Created Index {index}")
-        self.outputs = pd.DataFrame(columns=index)
-        self.data = self.outputs
-        # Sort the indexes for performance
-        self.outputs.sort_index()
 
         # Finds out all the policies available
         # All possible unique policies
         # self.policies = list(set(sum(self.policies_dict.values(), [])))
         self.policies_dict = self._discover_policies()
 
+        if self.GAME.SETTINGS.get("Profile", False):
+            self.start_profiling()
+
         # Saves the starting state
         self._save_current_elements()
+        self._publish_snapshot()
+        # Record the states for rewinding, only when enabled as it
+        # copies the states at every step
+        rewind = self.GAME.SETTINGS.get("Rewind", False)
+        self.timeline = (
+            StateTimeline(**({} if rewind is True else rewind))
+            if rewind
+            else None
+        )
+        self._record_step()
 
         self.doc
 
@@ -313,9 +490,12 @@ class ModelManager(AbstractModelManager):
         import pysd
 
         regions = self.GAME_MANAGER.game.REGIONS_DICT.keys()
+        # Load the model once and fork it for the other regions
+        loaded_model = pysd.load(self.GAME_MANAGER.game.PYSD_MODEL_FILE)
+        self._doc_cache = self._load_doc(loaded_model)
         self.models = {
-            region: pysd.load(self.GAME_MANAGER.game.PYSD_MODEL_FILE)
-            for region in regions
+            region: loaded_model if i == 0 else fork_model(loaded_model)
+            for i, region in enumerate(regions)
         }
 
         self.logger.info(
@@ -327,7 +507,7 @@ class ModelManager(AbstractModelManager):
         # Initialize each model
         for region, model in self.models.items():
             # Can set initial conditions to the model variables
-            if self.GAME.INITIAL_CONDITIONS_FILE.exists():
+            if region in self._load_initial_conditions:
                 # First finds out the constants components
                 self._set_initial_conditions(region, model)
 
@@ -351,11 +531,12 @@ class ModelManager(AbstractModelManager):
         # see new_game.create_initial_conditions_file for that
         # Then we need here to split between constants and
         # other variables
-        doc = model.doc()
-        constants = list(doc["Py Name"][doc["Type"] == "constant"])
+        constants = self._constants
 
         # Load the conditions for that region
         time, file_conditions = self._load_initial_conditions[region]
+        if time is None:
+            time = model.time()
         initial_constants, initial_conditions = {}, {}
         # Need to split between constants and others
         for variable, initial_value in file_conditions.items():
@@ -373,14 +554,23 @@ class ModelManager(AbstractModelManager):
 
     @cached_property
     def _load_initial_conditions(self):
-        """Load the content form the initial conditions file."""
-        with open(self.GAME.INITIAL_CONDITIONS_FILE, "r") as f:
-            initial_json = json.load(f)
-        initial_conditions = {
-            region: (initial_json["_time"], dic)
-            for region, dic in initial_json.items()
-            if not region == "_time"
-        }
+        """Load the content form the initial conditions file.
+
+        The :py:attr:`initial_conditions_overrides` replace the values
+        of the file. If no time is given, the time is None.
+        """
+        initial_conditions = {}
+        if self.GAME.INITIAL_CONDITIONS_FILE.exists():
+            with open(self.GAME.INITIAL_CONDITIONS_FILE, "r") as f:
+                initial_json = json.load(f)
+            initial_conditions = {
+                region: (initial_json["_time"], dic)
+                for region, dic in initial_json.items()
+                if not region == "_time"
+            }
+        for region, overrides in self.initial_conditions_overrides.items():
+            time, dic = initial_conditions.get(region, (None, {}))
+            initial_conditions[region] = (time, {**dic, **overrides})
         self.logger.debug(f"{initial_conditions = }")
         return initial_conditions
 
@@ -444,6 +634,72 @@ class ModelManager(AbstractModelManager):
         self._capture_attributes = elements
         self.logger.debug(f"Set captured elements: {elements}")
 
+    @property
+    def subscribed_attributes(self) -> List[AttributeName]:
+        """The attributes stored in the history.
+
+        Given in the order of :py:attr:`capture_attributes` .
+        """
+        if self.full_history:
+            return list(self.capture_attributes)
+        requested = set().union(*self._subscriptions.values())
+        return [a for a in self.capture_attributes if a in requested]
+
+    def subscribe(
+        self, subscriber: Hashable, attributes: Iterable[AttributeName]
+    ):
+        """Request the attributes to be captured at each step.
+
+        Only the attributes subscribed are evaluated and stored in the
+        history, unless the ``"FullHistory"`` setting is set.
+        New attributes are captured at the current step, they have nan
+        values for the previous steps.
+
+        :param subscriber: Identifies who reads the attributes.
+            Subscribing again replaces the previous attributes.
+        :param attributes: The attributes read by the subscriber.
+        """
+        attributes = set(attributes)
+        unknown = attributes.difference(self.capture_attributes)
+        if unknown:
+            raise ValueError(
+                f"Cannot subscribe to {unknown}, "
+                "they are not in the capture attributes."
+            )
+        if self._subscriptions.get(subscriber) == attributes:
+            return
+        with self.model_lock:
+            self._subscriptions[subscriber] = attributes
+            self._update_history_attributes()
+
+    def unsubscribe(self, subscriber: Hashable):
+        """Remove the attributes requested by the subscriber.
+
+        The attributes that are not subscribed anymore are removed
+        from the history.
+        """
+        with self.model_lock:
+            if self._subscriptions.pop(subscriber, None) is not None:
+                self._update_history_attributes()
+
+    def _update_history_attributes(self):
+        """Store the subscribed attributes in the history.
+
+        Must be called with the model lock, when the models are at
+        the last step of the history.
+        """
+        attributes = self.subscribed_attributes
+        new_attributes = [
+            a for a in attributes if a not in self.history.attributes
+        ]
+        self.history.set_attributes(attributes)
+        if new_attributes and len(self.history):
+            self.history.update_latest(
+                new_attributes, self._capture(new_attributes)
+            )
+        self._publish_snapshot()
+        self.logger.debug(f"Attributes stored in history: {attributes}")
+
     def connect(self):
         """Connect the components required by the Model Manager.
 
@@ -471,6 +727,7 @@ class ModelManager(AbstractModelManager):
     def _share_method(self, variable: str):
         """Create the method that is shared by all regions."""
 
+        @self._per_step
         def _shared_method():
             # This will always call the method called with the variable
             # name, so if it is modified, it will be for all models.
@@ -486,6 +743,7 @@ class ModelManager(AbstractModelManager):
     def link_region_sum(self, input_variable: str, output_variable: str):
         """Link a region sum variable for the model."""
 
+        @self._per_step
         def _summed_method():
             _sum = 0
             for model in self.models.values():
@@ -506,10 +764,13 @@ class ModelManager(AbstractModelManager):
         Connected to the :py:meth:`links.modifiy` method.
         """
         self.models[region].set_components({attribute: new_func})
+        # The values linked between regions can read the attribute
+        self._clean_step_cache()
 
     def link_region_average(self, input_variable: str, output_variable: str):
         """Link a region average variable for the model."""
 
+        @self._per_step
         def _average_method():
             _sum = 0
             for model in self.models.values():
@@ -522,22 +783,50 @@ class ModelManager(AbstractModelManager):
         # Add it to shared variable
         self._share_method(output_variable)
 
+    def _per_step(self, function: ModelMethod) -> ModelMethod:
+        """Evaluate the function only once per step.
+
+        The value is cached until :py:attr:`current_step` changes or
+        the states of the models are set.
+        """
+
+        @wraps(function)
+        def per_step_function():
+            if self._step_cache_step != self.current_step:
+                self._clean_step_cache()
+            try:
+                return self._step_cache[function]
+            except KeyError:
+                value = self._step_cache[function] = function()
+                return value
+
+        return per_step_function
+
+    def _clean_step_cache(self):
+        self._step_cache = {}
+        self._step_cache_step = self.current_step
+
+    def _truncate_links(self):
+        """Forget what the links recorded after the current time."""
+        for link in self._presteps_calls:
+            if isinstance(link, FlowLink):
+                link.truncate(self.current_time)
+
     def link_export_import(
         self,
         export_variable: str,
         import_variable: str,
-        export_import_method: ExportImportMethod,
-    ) -> None:
+        export_import_method: DistributionRule | ExportImportMethod,
+    ) -> ExportImportLink:
         """Link import export variable to the model.
 
         :arg export_import_method: The method that should be used to compute the
-            export. It takes either 1 or 3 inputs:
-                * export_variable
-                * import_variable
-                * a dict containing the model for each region
-            or
-                * a dict containing the model for each region
-            And returns either a list of float (obtained by looping
+            export. Either a
+            :py:class:`~pysimgame.links.exports_methods.DistributionRule`
+            computing the imports of all the regions from arrays, or
+            a function taking a dict containing the components of the
+            model for each region,
+            and returning either a list of float (obtained by looping
             over the models dict and assuming order is preserved)
             or a dictionary specifying the import value for each region.
 
@@ -545,72 +834,43 @@ class ModelManager(AbstractModelManager):
             so if you need it, consider creating another variable in the
             model.
         """
-        # Recall the original methods to not override
-        original_methods = {
-            region: [
-                getattr(model.components, export_variable),
-                getattr(model.components, import_variable),
-            ]
-            for region, model in self.models.items()
-        }
-
-        def compute_export_import():
-
-            # Set the original methods before we compute the variable
-            for region, methods in original_methods.items():
-                model = self.models[region]
-                model.set_components(
-                    {
-                        export_variable: methods[0],
-                        import_variable: methods[1],
-                    }
-                )
-
-            # Compute the actual values
-            export_values, import_values = export_import_method(
-                {name: model.components for name, model in self.models.items()}
-            )
-            self.logger.debug(f"{export_values = }")
-            self.logger.debug(f"{import_values = }")
-
-            if not isinstance(import_values, dict) or not isinstance(
-                export_values, dict
-            ):
-                self.logger.error(
-                    f"Wrong output type for import method:"
-                    f" {type(import_values)}. Must be dict."
-                )
-
-            for region in self.models.keys():
-                self.logger.debug(
-                    "Must be the default methods: {}, {}.".format(
-                        getattr(
-                            self.models[region].components, export_variable
-                        )(),
-                        getattr(
-                            self.models[region].components, import_variable
-                        )(),
-                    )
-                )
-                self.models[region].set_components(
-                    {
-                        export_variable: export_values[region],
-                        import_variable: import_values[region],
-                    }
-                )
-                self.logger.debug(
-                    "Must be the export import values: {}, {}.".format(
-                        getattr(
-                            self.models[region].components, export_variable
-                        )(),
-                        getattr(
-                            self.models[region].components, import_variable
-                        )(),
-                    )
-                )
-
+        link = ExportImportLink(
+            self.models, export_variable, import_variable, export_import_method
+        )
         # The output is computed before every step
-        self._presteps_calls.append(compute_export_import)
+        self._presteps_calls.append(link)
+        return link
+
+    def link_flows(
+        self,
+        source_variable: str,
+        inflow_variable: str,
+        outflow_variable: str,
+        weights: FlowMatrix,
+        capacities: FlowMatrix | None = None,
+        record: bool = False,
+        max_records: int | None = 1000,
+    ) -> FlowLink:
+        """Link flows between pairs of regions.
+
+        The flows are computed before every step, see
+        :py:class:`~pysimgame.links.flows.FlowLink` .
+
+        .. note:: The model inflow and outflow variables original
+            functions are erased.
+        """
+        link = FlowLink(
+            self.models,
+            source_variable,
+            inflow_variable,
+            outflow_variable,
+            weights,
+            capacities,
+            record,
+            max_records,
+        )
+        self._presteps_calls.append(link)
+        return link
 
     # endregion Links
     # endregion Prepare
@@ -623,35 +883,95 @@ class ModelManager(AbstractModelManager):
         Update all regions.
         TODO: Fix that the first step is the same as intialization.
         """
+        self.advance()
 
-        for f in self._presteps_calls:
-            f()
+        event = pygame.event.Event(
+            pysimgame.events.ModelStepped, {"n_steps": 1}
+        )
+        pygame.event.post(event)
 
-        # Update the steps
-        self.current_time += self.time_step
-        self.current_step += 1
+    def run_batch(self, n_steps: int | None, budget: float = math.inf) -> int:
+        """Run several steps and notify the game once for all of them.
 
+        :param n_steps: The number of steps to run. If None, run steps
+            until the budget is spent.
+        :param budget: The maximum duration of the batch in seconds.
+            At least one step is run.
+        :return: The number of steps that were run.
+        """
+        start_time = time.perf_counter()
+        n_done = 0
+        while n_steps is None or n_done < n_steps:
+            self.advance()
+            n_done += 1
+            if time.perf_counter() - start_time >= budget:
+                break
+        if n_done:
+            event = pygame.event.Event(
+                pysimgame.events.ModelStepped, {"n_steps": n_done}
+            )
+            pygame.event.post(event)
+        return n_done
+
+    def advance(self):
+        """Compute a step of the model without notifying the game.
+
+        Used when running without display, as no event is posted.
+        """
+        with self.model_lock:
+            for f in self._presteps_calls:
+                f()
+
+            # Update the steps
+            self.current_time += self.time_step
+            self._step_models()
+            # Once the models are updated, invalidates the values cached
+            # for the previous step
+            self.current_step += 1
+
+            # Saves right after the iteration
+            self._save_current_elements()
+            self._publish_snapshot()
+            self._record_step()
+
+    def _step_models(self):
+        """Update the models of all the regions to the current time."""
         model: pysd.statefuls.Model
-        # Update each region one by one
-        for model in self.models.values():
-            model._euler_step(self.current_time - model.time())
+        # All the derivatives are computed before any region is updated,
+        # so that links between regions read values of the same step
+        derivatives = [model.ddt() for model in self.models.values()]
+        for model, ddt in zip(self.models.values(), derivatives):
+            dt = self.current_time - model.time()
+            model.state = model.state + ddt * dt
             model.time.update(self.current_time)
             model.clean_caches()
-        # Saves right after the iteration
-        self._save_current_elements()
 
-        event = pygame.event.Event(pysimgame.events.ModelStepped, {})
-        pygame.event.post(event)
+    def _capture(self, attributes: List[AttributeName]) -> np.ndarray:
+        """Evaluate the attributes in all the regions.
+
+        :return: Array of shape (region, attribute).
+        """
+        return np.array(
+            [
+                [getattr(model.components, key)() for key in attributes]
+                for model in self.models.values()
+            ],
+            dtype=float,
+        ).reshape(len(self.models), len(attributes))
+
+    def _publish_snapshot(self):
+        """Replace the snapshot read by the other threads.
+
+        Only a reference is swapped, so readers keep a consistent
+        snapshot while the model continues.
+        """
+        self.snapshot = self.history.snapshot()
 
     @logger_enter_exit(ignore_exit=True)
     def _save_current_elements(self):
-        for region, model in self.models.items():
-            self.outputs.at[model.time(), region] = [
-                getattr(model.components, key)()
-                for key in self.capture_attributes
-            ]
-        # Also save the time
-        self.time_axis.append(self.current_time)
+        self.history.append(
+            self.current_time, self._capture(self.history.attributes)
+        )
 
     def pause(self):
         """Set the model to pause.
@@ -671,22 +991,46 @@ class ModelManager(AbstractModelManager):
     def run(self):
         """Run the model.
 
-        Will execute a step at each fps.
+        Will execute :py:attr:`fps` steps per second.
+        The thread wakes up at most :py:attr:`tick_rate` times per
+        second and runs in a batch the steps due since the last tick,
+        so that high speeds are not limited by the clock.
+        If :py:attr:`fps` is infinite, the steps run without waiting.
         It can be paused using :py:meth:`pause`.
         """
         with Lock():
             self._paused = False
         self.logger.info("Model started.")
-        self.clock.tick(self.fps)
+        # Start with a step, as the steps due are counted after the tick
+        steps_due = 1.0
+        self.clock.tick()
         while not self._paused:
-            self.step()
-            ms = self.clock.tick(self.fps)
+            fps = self.fps
+            n_steps = None if math.isinf(fps) else int(steps_due)
+            steps_due -= n_steps or 0
+            # A batch should not delay the next tick
+            n_done = self.run_batch(n_steps, budget=1 / self.tick_rate)
+            if n_steps is not None and n_done < n_steps:
+                self.logger.debug(
+                    f"Dropped {n_steps - n_done} steps late to catch up."
+                )
+                steps_due = 0.0
+            if math.isinf(fps):
+                ms = self.clock.tick()
+            else:
+                # Don't wake up more than needed at low speeds
+                ms = self.clock.tick(min(fps, self.tick_rate) or 1)
+                steps_due += ms / 1000 * fps
             # Record the exectution time
-            ms_step = self.clock.get_rawtime()
+            ms_batch = self.clock.get_rawtime()
             self.logger.info(
-                f"Model step executed in {ms_step} ms, ticked {ms} ms."
+                f"Model batch of {n_done} steps executed in {ms_batch} ms, "
+                f"ticked {ms} ms."
             )
 
+    def quit(self):
+        self.history.close()
+
     def process_events(self, event: pygame.event.Event) -> bool:
         """Listen the events for this manager."""
         match event:
@@ -701,13 +1045,236 @@ class ModelManager(AbstractModelManager):
                         f"No region is selected for action {event.action.name}"
                     )
                 else:
-                    self.process_action(event.action, event.region)
+                    with self.model_lock:
+                        self._actions_journal.append(
+                            (
+                                event.action.path,
+                                event.region.name,
+                                event.action.get_state(),
+                            )
+                        )
+                        self.process_action(event.action, event.region)
             case pygame.event.EventType(type=pysimgame.events.SpeedChanged):
                 self.fps = event.fps
 
             case _:
                 pass
 
+    # region Profiling
+    def _profiled_models(self) -> Dict[str, pysd.statefuls.Model]:
+        """Return the pysd models evaluating the components."""
+        return self.models
+
+    def start_profiling(self) -> ComponentProfiler:
+        """Record the time spent in each component of the models.
+
+        The statistics can be read with :py:meth:`profiling_stats`
+        while the model runs.
+        """
+        with self.model_lock:
+            if self.profiler is None:
+                self.profiler = ComponentProfiler()
+                for region, model in self._profiled_models().items():
+                    self.profiler.attach(region, model)
+                self.logger.info("Profiling the model components.")
+        return self.profiler
+
+    def stop_profiling(self) -> ComponentProfiler | None:
+        """Stop profiling and return the profiler with the statistics."""
+        with self.model_lock:
+            profiler, self.profiler = self.profiler, None
+            if profiler is not None:
+                profiler.detach()
+        return profiler
+
+    def profiling_stats(self, by_region: bool = True) -> pd.DataFrame:
+        """Return the profiling statistics, most expensive first.
+
+        See :py:class:`~pysimgame.profiling.ComponentProfiler` .
+        """
+        if self.profiler is None:
+            raise RuntimeError("The model components are not profiled.")
+        with self.model_lock:
+            return self.profiler.to_dataframe(by_region)
+
+    # endregion Profiling
+    # region Save
+    def _get_states(self) -> Dict[RegionName, np.ndarray]:
+        """Return the states of the stocks of each region."""
+        return {region: model.state for region, model in self.models.items()}
+
+    def _set_states(self, states: Dict[RegionName, np.ndarray], time: float):
+        """Set the states of the stocks of each region at the time."""
+        for region, model in self.models.items():
+            model.state = states[region]
+            model.time.update(time)
+            model.clean_caches()
+
+    def _states_array(self) -> np.ndarray:
+        """Return the states of all the regions as an array.
+
+        The array has shape (region, value), where the values of all
+        the stocks are flattened.
+        """
+        states = [
+            [np.asarray(value, dtype=float) for value in state]
+            for state in self._get_states().values()
+        ]
+        # Remember the shapes to restore the states
+        self._states_shapes = [value.shape for value in states[0]]
+        return np.array(
+            [
+                np.concatenate([np.ravel(value) for value in state])
+                if state
+                else np.empty(0)
+                for state in states
+            ]
+        )
+
+    def _record_step(self):
+        """Record the states of the current step in the timeline."""
+        if self.timeline is not None:
+            self.timeline.record(self.current_step, self._states_array())
+
+    def _states_from_array(
+        self, array: np.ndarray
+    ) -> Dict[RegionName, List[float | np.ndarray]]:
+        """Inverse of :py:meth:`_states_array` ."""
+        states = {}
+        for region, values in zip(self.models, array):
+            state, position = [], 0
+            for shape in self._states_shapes:
+                size = int(np.prod(shape))
+                state.append(values[position : position + size].reshape(shape))
+                position += size
+            states[region] = [
+                value if value.shape else float(value) for value in state
+            ]
+        return states
+
+    def rewind(self, step: int, fork: bool = False) -> HistoryStore | None:
+        """Set the model back to the state of a previous step.
+
+        The history after that step is removed, so that the plots and
+        the statistics show the new branch of the simulation.
+        The components changed by actions are not reverted.
+
+        The ``"Rewind"`` game setting must be set, to ``true`` or to
+        the parameters of the :py:class:`StateTimeline` .
+
+        :param step: The step to restore. Must be in :py:attr:`timeline` .
+        :param fork: If True, return a copy of the history before it
+            is truncated.
+        """
+        if self.timeline is None:
+            raise RuntimeError(
+                "Rewinding requires the 'Rewind' setting in the game "
+                "settings."
+            )
+        with self.model_lock:
+            if step not in self.timeline:
+                raise ValueError(
+                    f"Step {step} cannot be restored. "
+                    f"Steps available: {self.timeline.steps()}."
+                )
+            forked = self.history.copy() if fork else None
+            self.current_step = step
+            self.current_time = float(
+                self.history.time_slice(step, step + 1)[0]
+            )
+            self._set_states(
+                self._states_from_array(self.timeline.get(step)),
+                self.current_time,
+            )
+            self._clean_step_cache()
+            self._truncate_links()
+            self.timeline.truncate(step)
+            self.history.truncate(step + 1)
+            self._publish_snapshot()
+        self.logger.info(f"Rewound to step {step}.")
+        if pygame.display.get_init():
+            # Notify the other managers when a game is running
+            self.post(
+                pygame.event.Event(
+                    pysimgame.events.ModelRewound, {"step": step}
+                )
+            )
+        return forked
+
+    def save(self, save_dir: Path):
+        """Save the state of the models, the history and the actions used.
+
+        Can be called from any thread, the models are only locked while
+        the state is copied.
+        """
+        with self.model_lock:
+            content = self.copy_save_content()
+        self.save_content(content, save_dir)
+
+    def copy_save_content(self) -> dict:
+        """Copy the state of the models and the actions used.
+
+        Must be called with :py:attr:`model_lock` acquired. The history
+        is not copied: its snapshot is not changed by the next steps.
+        """
+        return {
+            "current_time": self.current_time,
+            "current_step": self.current_step,
+            "states": self._get_states(),
+            "actions": list(self._actions_journal),
+            "history": self.history.snapshot(),
+        }
+
+    def save_content(self, content: dict, save_dir: Path):
+        history = content["history"]
+        checkpoint = {
+            key: value for key, value in content.items() if key != "history"
+        }
+        checkpoint["history_attributes"] = list(history.attributes)
+        # The steps spilled to disk are read here, out of the lock
+        checkpoint["history_time"] = history.time_axis
+        checkpoint["history_values"] = history.values
+        with open(Path(save_dir, MODEL_SAVE_FILENAME), "wb") as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self, save_dir: Path):
+        """Load the state saved with :py:meth:`save`.
+
+        The actions used are applied again to the models, so the
+        actions manager must be prepared.
+        """
+        with open(Path(save_dir, MODEL_SAVE_FILENAME), "rb") as f:
+            checkpoint = pickle.load(f)
+        actions_manager = self.GAME_MANAGER.ACTIONS_MANAGER
+        with self.model_lock:
+            self.current_time = checkpoint["current_time"]
+            self.current_step = checkpoint["current_step"]
+            self._set_states(checkpoint["states"], self.current_time)
+            self._clean_step_cache()
+            self._truncate_links()
+            self.history.set_attributes(checkpoint["history_attributes"])
+            self.history.restore(
+                checkpoint["history_time"], checkpoint["history_values"]
+            )
+            # Replay the actions in the same order
+            self._actions_journal = []
+            for path, region, state in checkpoint["actions"]:
+                action = actions_manager.get_action(path)
+                action.set_state(state)
+                self._actions_journal.append((path, region, state))
+                self.process_action(action, region)
+            # Steps before the save cannot be restored
+            if self.timeline is not None:
+                self.timeline.clear()
+            self._record_step()
+            # The attributes subscribed can differ from the saved ones
+            self._update_history_attributes()
+        self.logger.info(
+            f"Loaded {save_dir} at step {self.current_step} "
+            f"(time {self.current_time})."
+        )
+
+    # endregion Save
     # region Actions
 
     @singledispatchmethod
@@ -741,6 +1308,8 @@ class ModelManager(AbstractModelManager):
             self.logger.debug(f"Deactivating {policy.name}.")
             # Restore the original methods
             model.set_components(policy.original_methods)
+        # The values linked between regions can read the components
+        self._clean_step_cache()
 
     @process_action.register
     def _(self, action: Edict, region: str):
@@ -756,6 +1325,7 @@ class ModelManager(AbstractModelManager):
 
         # simply set the function to the models components
         setattr(self[region].components, budget.variable, budget_value)
+        self._clean_step_cache()
         self.logger.debug(f"Set {v} to {budget.variable}.")
 
     # endregion Actions
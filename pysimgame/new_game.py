@@ -3,8 +3,10 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 import pathlib
 import shutil
+import tempfile
 from typing import TYPE_CHECKING, Any, List
 
 import pysd
@@ -20,13 +22,16 @@ from .utils.directories import (
     ORIGINAL_BACKGROUND_FILESTEM,
     PYSDGAME_DIR,
     REGIONS_FILE_NAME,
+    TRANSLATIONS_DIR,
 )
-from .utils.logging import logger
+from .utils.misc import file_hash
 from .utils.pysimgame_settings import PYSDGAME_SETTINGS
 
 if TYPE_CHECKING:
     from .types import RegionsDict
 
+logger = logging.getLogger(__name__)
+
 
 def error_popup(msg: str):
     return
@@ -88,19 +93,12 @@ def parse_model_file(model_filepath: pathlib.Path, game_path: pathlib.Path):
         )
 
     # Check which model type it is to parse it
-    if pysimgame_model_filepath.suffix == ".mdl":
-        # Vensim model
-        # Takes long to import so only if parsing is needed
-        from pysd import read_vensim
-
-        read_vensim(
-            str(pysimgame_model_filepath), initialize=False, split_views=True
-        )
-    elif pysimgame_model_filepath.suffix == ".xmile":
-        # Xmile model
-        from pysd import read_xmile
-
-        read_xmile(str(pysimgame_model_filepath), initialize=False)
+    if pysimgame_model_filepath.suffix in (".mdl", ".xmile"):
+        translated_dir = translate_model(pysimgame_model_filepath)
+        # The modules of a previous translation must not be kept
+        _remove_translated_files(game_path, MODEL_FILESTEM)
+        # Copy the python files created by pysd in the game
+        shutil.copytree(translated_dir, game_path, dirs_exist_ok=True)
     elif pysimgame_model_filepath.suffix == ".py":
         # Python model
         pass
@@ -115,6 +113,84 @@ def parse_model_file(model_filepath: pathlib.Path, game_path: pathlib.Path):
     pysimgame_model_filepath = pysimgame_model_filepath.with_suffix(".py")
 
 
+def _remove_translated_files(directory: pathlib.Path, model_stem: str):
+    """Remove the files created by pysd when translating a model.
+
+    pysd creates the python model, the json files of the namespace, the
+    subscripts and the dependencies, and a directory of modules when
+    the views are split.
+    """
+    for name in (
+        f"{model_stem}.py",
+        f"_namespace_{model_stem}.json",
+        f"_subscripts_{model_stem}.json",
+        f"_dependencies_{model_stem}.json",
+    ):
+        pathlib.Path(directory, name).unlink(missing_ok=True)
+    shutil.rmtree(
+        pathlib.Path(directory, f"modules_{model_stem}"), ignore_errors=True
+    )
+
+
+def translate_model(
+    model_filepath: pathlib.Path,
+    cache_dir: pathlib.Path = None,
+) -> pathlib.Path:
+    """Translate a vensim or xmile model to python using pysd.
+
+    The translation can take minutes on large models, so the files
+    created are cached using the hash of the model file and of the
+    pysd version. Translating the same model again is then instant.
+
+    :param model_filepath: The .mdl or .xmile file of the model.
+    :param cache_dir: Where the translations are stored. By default
+        the ``PYSIMGAME_TRANSLATIONS_DIR`` environment variable or a
+        directory in the pysimgame directory.
+    :return: The directory containing the files created by pysd,
+        named after the stem of the model file.
+    """
+    model_filepath = pathlib.Path(model_filepath)
+    cache_dir = pathlib.Path(cache_dir or TRANSLATIONS_DIR)
+    suffix = model_filepath.suffix
+    if suffix not in (".mdl", ".xmile"):
+        raise ValueError(f"Cannot translate {model_filepath}.")
+    translated_dir = pathlib.Path(
+        cache_dir,
+        file_hash(
+            model_filepath,
+            extra=f"{model_filepath.name} pysd {pysd.__version__}",
+        ),
+    )
+    if translated_dir.exists():
+        logger.info(f"Using the translation cached in {translated_dir}.")
+        return translated_dir
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Translate in a temporary directory, so that the cache is never
+    # left with a partial translation
+    tmp_dir = pathlib.Path(tempfile.mkdtemp(dir=cache_dir))
+    try:
+        tmp_model_file = pathlib.Path(tmp_dir, model_filepath.name)
+        shutil.copyfile(model_filepath, tmp_model_file)
+        logger.info(f"Translating {model_filepath} with pysd.")
+        if suffix == ".mdl":
+            pysd.read_vensim(
+                str(tmp_model_file), initialize=False, split_views=True
+            )
+        else:
+            pysd.read_xmile(str(tmp_model_file), initialize=False)
+        tmp_model_file.unlink()
+        try:
+            os.replace(tmp_dir, translated_dir)
+        except OSError:
+            # Another process cached the same translation meanwhile
+            if not translated_dir.exists():
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return translated_dir
+
+
 def create_initial_conditions_file(game: Game | str):
     """Create the file for inital conditions.
 
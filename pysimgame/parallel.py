@@ -0,0 +1,487 @@
+"""Model manager stepping groups of regions in worker processes.
+
+The workers are forked from the game process when the manager is
+connected, before the model thread starts, so that each of them has a
+copy of all the region models.
+A worker only steps and captures the regions it owns.
+
+The links are computed in the game process, whose models are kept up to
+date with the states sent back by the workers, so the state of the
+links (ex. the flows recorded by a
+:py:class:`~pysimgame.links.flows.FlowLink`) stays in the game process.
+At each step, a worker only receives the states of its regions and the
+values of their linked variables (shared variables, region sums and
+averages, exports and imports, inflows and outflows), which replace the
+linked components in the models of the worker.
+It sends back the new states with the values of the attributes captured.
+
+The shared variables, region sums and averages are evaluated at each
+step from the states of all the regions, so the attributes depending on
+them are captured again in the game process once the states of all the
+regions are known.
+The dependencies are read from the pysd models, the components
+replaced with :py:meth:`~pysimgame.model.ModelManager.link_modify`
+must then only depend on their own region.
+
+The actions used are applied again by each worker to its copy of the
+models. The links added and the saves loaded after the connection
+restart the workers from the models of the game process, which must
+then be done before the model thread starts.
+
+.. note:: The workers are forked, so this manager is only available on
+    platforms supporting the 'fork' start method.
+
+.. note:: The states and linked values of the regions are sent to the
+    workers at each step, which only pays off when stepping a region
+    costs more than sending it. The teacup example, measured with
+    ``benchmarks/parallel_regions.py`` on a single cpu, steps 3 times
+    slower than with :py:class:`~pysimgame.model.ModelManager` from 8
+    to 512 regions, so this manager does not help small models, for
+    which the ``"vectorized"`` manager should be used. It is meant for
+    models with many components, on as many cpus as workers.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import signal
+from multiprocessing.connection import Connection
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, List
+
+import numpy as np
+import pygame
+
+import pysimgame
+from pysimgame.model import ModelManager
+
+from .utils.logging import logger_enter_exit
+
+if TYPE_CHECKING:
+    import pysd
+
+    from .links.exports_methods import DistributionRule, ExportImportLink
+    from .links.flows import FlowLink
+    from .profiling import ComponentProfiler
+    from .types import (
+        AttributeName,
+        ExportImportMethod,
+        FlowMatrix,
+        ModelMethod,
+        RegionName,
+    )
+
+    States = Dict[RegionName, np.ndarray]
+    # Values of the linked variables of each region
+    LinksValues = Dict[RegionName, Dict[str, float]]
+
+
+def _set_states(
+    models: Dict[RegionName, pysd.statefuls.Model],
+    states: States,
+    time: float,
+):
+    """Set the states of the models at the given time."""
+    for region, model in models.items():
+        model.state = states[region]
+        model.time.update(time)
+        model.clean_caches()
+
+
+def _linked_component(values: Dict[str, float], variable: str) -> ModelMethod:
+    """Return a component returning the value received for the variable."""
+
+    def component():
+        return values[variable]
+
+    return component
+
+
+def _worker_loop(
+    manager: ParallelModelManager,
+    connection: Connection,
+    regions: List[RegionName],
+):
+    """Process the messages of the game process.
+
+    Messages are tuples, starting with the name of the command:
+
+        * ("step", time, states, links, new_time, attributes): Set the
+            states of the owned regions at time and the values of
+            their linked variables, then step them to new_time.
+            Send back the new states and the values of the attributes
+            at new_time, of shape (region, attribute).
+        * ("action", path, region, state): Apply again the action
+            used in the game process.
+        * ("stop",): Stop the worker.
+    """
+    # The handler of pygame would ignore the termination of the daemon
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if manager.profiler is not None:
+        # Only the game process profiles the components
+        manager.profiler.detach()
+    models = {region: manager.models[region] for region in regions}
+    links_values = {region: {} for region in regions}
+    for region, model in models.items():
+        model.set_components(
+            {
+                variable: _linked_component(links_values[region], variable)
+                for variable in manager._linked_variables
+            }
+        )
+    while True:
+        command, *args = connection.recv()
+        try:
+            match command:
+                case "step":
+                    time, states, links, new_time, attributes = args
+                    for region, values in links.items():
+                        links_values[region].update(values)
+                    _set_states(models, states, time)
+                    derivatives = [model.ddt() for model in models.values()]
+                    for model, ddt in zip(models.values(), derivatives):
+                        model.state = model.state + ddt * (new_time - time)
+                        model.time.update(new_time)
+                        model.clean_caches()
+                    result = (
+                        {
+                            region: model.state
+                            for region, model in models.items()
+                        },
+                        np.array(
+                            [
+                                [
+                                    getattr(model.components, key)()
+                                    for key in attributes
+                                ]
+                                for model in models.values()
+                            ],
+                            dtype=float,
+                        ).reshape(len(models), len(attributes)),
+                    )
+                case "action":
+                    path, region, state = args
+                    action = manager.GAME_MANAGER.ACTIONS_MANAGER.get_action(
+                        path
+                    )
+                    action.set_state(state)
+                    manager.process_action(action, region)
+                    result = None
+                case "stop":
+                    connection.close()
+                    return
+        except Exception as exp:
+            # The game process will raise it
+            result = exp
+        connection.send(result)
+
+
+class ParallelModelManager(ModelManager):
+    """Model manager stepping the regions in several processes.
+
+    Produce the same trajectories as :py:class:`ModelManager` , with the
+    same state of the links in the game process.
+
+    It is used when the game settings contain
+    ``"ModelManager": "parallel"`` . The number of processes can be
+    set with the ``"Workers"`` setting and is by default the number
+    of cpus.
+    """
+
+    n_workers: int
+    _workers: List[multiprocessing.Process]
+    _connections: List[Connection]
+    # Regions owned by each worker
+    _regions_groups: List[List[RegionName]]
+    # Variables replaced by the links, sent to the workers at each step
+    _linked_variables: List[str]
+    # Linked variables evaluated from the states of all the regions
+    _shared_variables: List[str]
+    # Whether each attribute depends on the shared variables
+    _depends_on_shared_cache: Dict[AttributeName, bool]
+    # Attributes and values captured by the workers at the last step
+    _captured: tuple[List[AttributeName], np.ndarray] | None
+    # Whether the workers are started, once the manager is connected
+    _connected: bool
+
+    def prepare(self):
+        try:
+            self._context = multiprocessing.get_context("fork")
+        except ValueError as exp:
+            raise RuntimeError(
+                f"{type(self).__name__} requires the 'fork' start method."
+            ) from exp
+        self._workers = []
+        self._connections = []
+        # Events can stop the workers while the model thread steps
+        self._workers_lock = Lock()
+        self._linked_variables = []
+        self._shared_variables = []
+        self._depends_on_shared_cache = {}
+        self._captured = None
+        self._connected = False
+        super().prepare()
+        self.n_workers = max(
+            1,
+            min(
+                self.GAME.SETTINGS.get("Workers", os.cpu_count() or 1),
+                len(self.models),
+            ),
+        )
+        regions = list(self.models)
+        self._regions_groups = [
+            [regions[i] for i in indices]
+            for indices in np.array_split(
+                np.arange(len(regions)), self.n_workers
+            )
+        ]
+
+    def connect(self):
+        super().connect()
+        self._connected = True
+        # Forked before the model thread starts
+        self._restart_workers()
+
+    # region Links
+    def _share_method(self, variable: str):
+        super()._share_method(variable)
+        self._add_linked_variables(variable, shared=True)
+
+    def link_modify(
+        self, region: RegionName, attribute: str, new_func: ModelMethod
+    ):
+        super().link_modify(region, attribute, new_func)
+        # The workers must be forked from the modified models
+        self._restart_workers()
+
+    def link_export_import(
+        self,
+        export_variable: str,
+        import_variable: str,
+        export_import_method: DistributionRule | ExportImportMethod,
+    ) -> ExportImportLink:
+        link = super().link_export_import(
+            export_variable, import_variable, export_import_method
+        )
+        self._add_linked_variables(export_variable, import_variable)
+        return link
+
+    def link_flows(
+        self,
+        source_variable: str,
+        inflow_variable: str,
+        outflow_variable: str,
+        weights: FlowMatrix,
+        capacities: FlowMatrix | None = None,
+        record: bool = False,
+        max_records: int | None = 1000,
+    ) -> FlowLink:
+        link = super().link_flows(
+            source_variable,
+            inflow_variable,
+            outflow_variable,
+            weights,
+            capacities,
+            record,
+            max_records,
+        )
+        self._add_linked_variables(inflow_variable, outflow_variable)
+        return link
+
+    def _add_linked_variables(self, *variables: str, shared: bool = False):
+        """Send the values of the variables to the workers at each step.
+
+        :param shared: Whether the variables are evaluated from the
+            states of all the regions at each step.
+        """
+        for variable in variables:
+            if variable not in self._linked_variables:
+                self._linked_variables.append(variable)
+            if shared and variable not in self._shared_variables:
+                self._shared_variables.append(variable)
+        self._depends_on_shared_cache = {}
+        # The workers must replace the components of the new variables
+        self._restart_workers()
+
+    def _depends_on_shared(self, attribute: AttributeName) -> bool:
+        """Whether the value of the attribute reads a shared variable."""
+        try:
+            return self._depends_on_shared_cache[attribute]
+        except KeyError:
+            pass
+        dependencies = self._model.components._dependencies
+        depends = False
+        to_visit = [attribute]
+        visited = set()
+        while to_visit:
+            name = to_visit.pop()
+            if name in self._shared_variables:
+                depends = True
+                break
+            if name in visited or name.startswith("_"):
+                # The stateful elements are read from the states
+                continue
+            visited.add(name)
+            to_visit.extend(dependencies.get(name, {}))
+        self._depends_on_shared_cache[attribute] = depends
+        return depends
+
+    # endregion Links
+
+    # region Workers
+    def _start_workers(self):
+        """Fork the workers from the current models."""
+        for regions in self._regions_groups:
+            connection, worker_connection = self._context.Pipe()
+            worker = self._context.Process(
+                target=_worker_loop,
+                args=(self, worker_connection, regions),
+                name=f"ModelWorker-{len(self._workers)}",
+                daemon=True,
+            )
+            worker.start()
+            worker_connection.close()
+            self._workers.append(worker)
+            self._connections.append(connection)
+        self.logger.info(
+            f"Started {len(self._workers)} workers for "
+            f"{len(self.models)} regions."
+        )
+
+    def _restart_workers(self):
+        """Fork the workers again from the current models.
+
+        Nothing is done if the manager is not connected yet.
+        """
+        if not self._connected:
+            return
+        self._stop_workers()
+        with self._workers_lock:
+            self._start_workers()
+
+    def _stop_workers(self):
+        """Stop the workers."""
+        with self._workers_lock:
+            for connection in self._connections:
+                connection.send(("stop",))
+                connection.close()
+            for worker in self._workers:
+                worker.join()
+            self._workers = []
+            self._connections = []
+
+    def _send_to_workers(self, messages: List[tuple]) -> list:
+        """Send its message to each worker and return their answers."""
+        with self._workers_lock:
+            if not self._workers:
+                raise RuntimeError(
+                    f"The workers of {type(self).__name__} are started "
+                    "when it is connected."
+                )
+            for connection, message in zip(self._connections, messages):
+                connection.send(message)
+            results = [connection.recv() for connection in self._connections]
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    def _links_values(self) -> LinksValues:
+        """Evaluate the linked variables in the game process."""
+        return {
+            region: {
+                variable: getattr(model.components, variable)()
+                for variable in self._linked_variables
+            }
+            for region, model in self.models.items()
+        }
+
+    # endregion Workers
+
+    # region Run
+    def _step_models(self):
+        time = self._model.time()
+        states = self._get_states()
+        links = self._links_values()
+        attributes = list(self.history.attributes)
+        results = self._send_to_workers(
+            [
+                (
+                    "step",
+                    time,
+                    {region: states[region] for region in regions},
+                    {region: links[region] for region in regions},
+                    self.current_time,
+                    attributes,
+                )
+                for regions in self._regions_groups
+            ]
+        )
+        new_states = {}
+        for states, _ in results:
+            new_states.update(states)
+        # Keep the models of the game process up to date for the links
+        self._set_states(new_states, self.current_time)
+        self._captured = (
+            attributes,
+            np.concatenate([values for _, values in results]),
+        )
+
+    @logger_enter_exit(ignore_exit=True)
+    def _save_current_elements(self):
+        captured, self._captured = self._captured, None
+        if captured is None or captured[0] != list(self.history.attributes):
+            # Not stepped by the workers, ex. the initial state
+            return super()._save_current_elements()
+        attributes, values = captured
+        # The workers had the shared variables of the previous step
+        recaptured = [
+            i
+            for i, attribute in enumerate(attributes)
+            if self._depends_on_shared(attribute)
+        ]
+        if recaptured:
+            values[:, recaptured] = self._capture(
+                [attributes[i] for i in recaptured]
+            )
+        self.history.append(self.current_time, values)
+
+    def process_events(self, event: pygame.event.Event) -> bool:
+        consumed = super().process_events(event)
+        match event:
+            case pygame.event.EventType(type=pysimgame.ActionUsed) if (
+                event.region is not None
+            ):
+                # Forking from the model thread could deadlock
+                with self.model_lock:
+                    path, region, state = self._actions_journal[-1]
+                    self._send_to_workers(
+                        [("action", path, region, state)] * self.n_workers
+                    )
+        return consumed
+
+    def load(self, save_dir: Path):
+        super().load(save_dir)
+        # The workers must be forked from the loaded models
+        self._restart_workers()
+
+    def quit(self):
+        self._connected = False
+        self._stop_workers()
+        super().quit()
+
+    # endregion Run
+
+    def start_profiling(self) -> ComponentProfiler:
+        """Profile the components evaluated in the game process.
+
+        These are the linked variables and the attributes depending on
+        the shared variables, the workers are not profiled.
+        """
+        self.logger.warning(
+            "Only the components evaluated in the game process are "
+            f"profiled by {type(self).__name__}, not the ones of the "
+            "workers."
+        )
+        return super().start_profiling()
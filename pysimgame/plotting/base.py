@@ -19,6 +19,35 @@ if TYPE_CHECKING:
 _PLOT_MANAGER: AbstractPlotsManager
 
 
+def plots_manager_class(name: str = "qt") -> type[AbstractPlotsManager]:
+    """Return the class of plots manager registered under name.
+
+    Available plots managers:
+        * "qt": matplotlib figures in qt windows
+            (:py:class:`~pysimgame.plotting.pyside.manager.QtPlotManager`)
+        * "pygame": line plots drawn with pygame in the game window
+            (:py:class:`~pysimgame.plotting.native.NativePlotsManager`)
+        * "matplotlib": matplotlib figures in the game window, rendered
+            on a thread or in a worker process
+            (:py:class:`~pysimgame.plotting.manager.PlotsManager`)
+    """
+    match name:
+        case "qt":
+            from .pyside.manager import QtPlotManager
+
+            return QtPlotManager
+        case "pygame":
+            from .native import NativePlotsManager
+
+            return NativePlotsManager
+        case "matplotlib":
+            from .manager import PlotsManager
+
+            return PlotsManager
+        case _:
+            raise ValueError(f"Unknown plots manager '{name}'.")
+
+
 class AbstractPlotsManager(GameComponentManager):
     """The abstract plot manager.
 
@@ -56,11 +85,9 @@ class AbstractPlotsManager(GameComponentManager):
 
     def _connect_to_model(self, MODEL_MANAGER: ModelManager):
         """Connect the plots display to the models."""
-        self.model_outputs = MODEL_MANAGER.outputs
         self.MODEL_MANAGER = MODEL_MANAGER
-
-        # Create a df containing regions and alements
-        self.df_keys = self.model_outputs.keys().to_frame(index=False)
+        # Views on the model outputs are taken from the history
+        self.history = MODEL_MANAGER.history
 
         # Load the plots
         plots_dir = Path(self.GAME.GAME_DIR, "plots")
@@ -85,6 +112,20 @@ class AbstractPlotsManager(GameComponentManager):
 
         self.plots.append(plot)
 
+    def _subscribe_plot(self, plot: Plot):
+        """Capture the attributes read by the plot while it is open."""
+        model_manager = self.GAME_MANAGER.MODEL_MANAGER
+        model_manager.subscribe(
+            ("plot", plot.name),
+            model_manager.capture_attributes
+            if plot.attributes is None
+            else plot.attributes,
+        )
+
+    def _unsubscribe_plot(self, plot_name: str):
+        """Stop capturing the attributes of a closed plot."""
+        self.GAME_MANAGER.MODEL_MANAGER.unsubscribe(("plot", plot_name))
+
     @abstractmethod
     def show_plots_list(self):
         """Show all the available plots on the GUI.
@@ -17,12 +17,9 @@ import time
 from importlib.machinery import SourceFileLoader
 from typing import TYPE_CHECKING, Dict, List, Tuple, Type
 
-import numpy as np
-import pandas
 import pygame
 import pygame_gui
 import pysimgame
-from matplotlib.lines import Line2D
 from pygame_gui.elements.ui_button import UIButton
 from pygame_gui.ui_manager import UIManager
 from pygame_matplotlib import pygame_color_to_plt
@@ -30,6 +27,9 @@ from pygame_matplotlib.backend_pygame import FigureSurface
 from pygame_matplotlib.gui_window import UIPlotWindow
 from pysimgame.model import ModelManager
 from pysimgame.plotting.base import AbstractPlotsManager
+from pysimgame.plotting.process import PlotsRenderer
+from pysimgame.plotting.utils.agg import UIAggPlotWindow
+from pysimgame.plotting.utils.figure import LinePlotFigure
 from pysimgame.utils.abstract_managers import GameComponentManager
 from pysimgame.utils.strings import beautify_parameter_name
 
@@ -43,7 +43,6 @@ if TYPE_CHECKING:
     import matplotlib.artist
     from pysimgame.types import AttributeName, RegionName
 
-import matplotlib.pyplot as plt
 
 COLORS_LIST = ("red", "blue", "green", "orange")
 
@@ -105,15 +104,29 @@ class PlotsManager(AbstractPlotsManager):
 
 
     Notes on the implementation.
-    The plotting process runs on separated threads, as it takes a bit of
-    time, so the main process can run without needing to wait for the plots.
+    The figures (see :py:class:`LinePlotFigure`) take a bit of time to
+    render, so the main process can run without needing to wait for
+    the plots.
+    They are rendered on a thread of the game process, and the
+    windows show the pixels of the renderers without copying them
+    (see :py:class:`AggFigureSurface`).
+    When the ``"PlotsProcess"`` game setting is true, they are
+    rendered in a worker process instead, which receives the new steps
+    and returns the frames through shared memory (see
+    :py:class:`PlotsRenderer`). The windows then show the last frame
+    completed. It is opt-in, as it only helps when a cpu core is
+    free for the worker.
     """
 
-    ui_plot_windows: Dict[str, UIPlotWindow]
+    ui_plot_windows: Dict[str, UIAggPlotWindow]
     GAME_MANAGER: GameManager
     MODEL_MANAGER: ModelManager
-    axes: Dict[str, List[matplotlib.axes.Axes]]
-    lines: Dict[str, List[Line2D]]
+    # Renders the figures, None when they are rendered on a thread
+    _renderer: PlotsRenderer | None
+    # Whether the model has new steps not sent to the renderer
+    _history_changed: bool
+    # Steps kept by the rewinds since the last update
+    _kept: int | None
     _connected: bool = False
     region_colors: Dict[str, Tuple[float, float, float, float]]
 
@@ -124,7 +137,6 @@ class PlotsManager(AbstractPlotsManager):
 
     _content_thread: threading.Thread
     _surface_thread: threading.Thread
-    _figsurface_locks: Dict[str, threading.Lock]
     _last_time: float
 
     # Initialization Methods #
@@ -133,14 +145,14 @@ class PlotsManager(AbstractPlotsManager):
         """Prepare the graph manager."""
         super().prepare()
         self.ui_plot_windows = {}
-        self.axes = {}
-        self.lines = {}
+        self._renderer = None
+        self._history_changed = False
+        self._kept = None
         self.previous_serie = None
         self._plot_list_buttons = []
         self.plots = {}
         self._content_thread = None
         self._surface_thread = None
-        self._figsurface_locks = {}
         self._last_time = time.time()
 
         self._read_regions_colors()
@@ -171,6 +183,12 @@ class PlotsManager(AbstractPlotsManager):
             .get_abs_rect()
             .bottomleft
         )
+        if self.GAME.SETTINGS.get("PlotsProcess", False):
+            # Forked before the model thread starts
+            try:
+                self._renderer = PlotsRenderer()
+            except RuntimeError as exp:
+                self.logger.warning(f"{exp} Plots rendered on a thread.")
 
     # Adding plots methods
 
@@ -183,11 +201,7 @@ class PlotsManager(AbstractPlotsManager):
 
     def register_plot(self, plot: Plot):
         """Add a :py:class:`Plot` to the manager."""
-        super().register_plot(plot)
-
-        # Also create the locks and surface for it
-        self._figsurface_locks[plot.name] = threading.Lock()
-        self.logger.debug(f"Lock created : {self._figsurface_locks[plot.name]}")
+        self.plots[plot.name] = plot
 
         if self._connected:
             self._create_plot_window(plot.name)
@@ -200,42 +214,32 @@ class PlotsManager(AbstractPlotsManager):
         """
         if not isinstance(plot_name, str):
             plot_name = plot_name.name
-        if plot_name not in self.ui_plot_windows.keys():
-            # Needs to recall the ui to update
-            figure, ax = plt.subplots(1, 1)
-            plot_window = UIPlotWindow(
-                self.get_a_rect(),
-                self._UI_MANAGER,
-                figure,
-                window_display_title=plot_name,
-                object_id=f"#plot_window",
-                resizable=True,
-            )
-            self.ui_plot_windows[plot_name] = plot_window
-            # The first ax is automatically the first line
-            self.axes[plot_name] = [ax]
-            for plot_line in self.plots[plot_name].plot_lines[1:]:
-                # If other plot lines have different y values
-                if not plot_line.share_y:
-                    self.axes[plot_name].append(ax.twinx())
-
-            self.lines[plot_name] = []
-
-            # plot_window.get_container().set_image(figure)
-            # plot_window._created = False
-            self.logger.info("Graph added.")
-            self.logger.debug(f"Graph: {plot_window}.")
-        else:
-            plot_window = self.ui_plot_windows[plot_name]
-
-        if len(self.model_outputs) < 2:
-            # Cannot plot lines if only one point
+        if plot_name in self.ui_plot_windows.keys():
             return
-
-        # Now it is created
-        plot_window._created = True
+        rect = self.get_a_rect()
+        plot_lines = self.plots[plot_name].plot_lines
+        if self._renderer is None:
+            figure = LinePlotFigure(plot_lines)
+        else:
+            figure = self._renderer.open(plot_name, plot_lines, rect.size)
+            self._history_changed = True
+        plot_window = UIAggPlotWindow(
+            rect,
+            self._UI_MANAGER,
+            figure,
+            window_display_title=plot_name,
+            object_id=f"#plot_window",
+            resizable=True,
+        )
+        # The figure has the size of the content of the window
+        figure.set_bounding_rect(plot_window.get_container().get_rect())
+        if self._renderer is None:
+            figure.render(self.MODEL_MANAGER.snapshot)
         plot_window.update_window_image()
-        self.logger.debug(f"FigureSurf {plot_window.figuresurf}")
+        self.ui_plot_windows[plot_name] = plot_window
+        self._subscribe_plot(self.plots[plot_name])
+        self.logger.info("Graph added.")
+        self.logger.debug(f"Graph: {plot_window}.")
 
     def show_plots_list(self):
         x, y = self._menu_button_position
@@ -277,14 +281,31 @@ class PlotsManager(AbstractPlotsManager):
                         button.hide()
                     return True
             case pygame.event.EventType(type=pygame_gui.UI_WINDOW_CLOSE):
-                if event.ui_element in self.ui_plot_windows:
+                if event.ui_element in self.ui_plot_windows.values():
                     # Remove the window
-                    window: UIPlotWindow = event.ui_element
-                    del self.ui_plot_windows[window.window_display_title]
+                    window: UIAggPlotWindow = event.ui_element
+                    plot_name = window.window_display_title
+                    del self.ui_plot_windows[plot_name]
+                    if self._renderer is not None:
+                        self._renderer.close(plot_name)
+                    self._unsubscribe_plot(plot_name)
                     return True
-            case pygame.event.EventType(type=pysimgame.ModelStepped):
+            case pygame.event.EventType(
+                type=pysimgame.ModelStepped | pysimgame.ModelRewound
+            ):
+                if event.type == pysimgame.ModelRewound:
+                    # The steps after it can change before the update
+                    length = event.step + 1
+                    self._kept = (
+                        length
+                        if self._kept is None
+                        else min(self._kept, length)
+                    )
+                if self._renderer is not None:
+                    # Sent once per frame by draw
+                    self._history_changed = True
                 # Update the plot on a separated thread
-                if (
+                elif (
                     self._content_thread is None
                     or not self._content_thread.is_alive()
                 ):
@@ -301,85 +322,37 @@ class PlotsManager(AbstractPlotsManager):
         """Update the plots based on the new outputs.
 
         All the windows are updated with their parameters one by one.
+        Used when the plots are rendered on a thread.
         """
-        model_outputs = self.MODEL_MANAGER.outputs
-        x = self.MODEL_MANAGER.time_axis.copy()
-        if len(model_outputs) < 2:
-            # Cannot plot lines if only one point
-            return
-
-        for plot_name, plot_window in self.ui_plot_windows.items():
+        # Not modified while the model continues
+        history = self.MODEL_MANAGER.snapshot
+        kept, self._kept = self._kept, None
+
+        for plot_name, plot_window in list(self.ui_plot_windows.items()):
+            figure: LinePlotFigure = plot_window.figuresurf
+            if kept is not None:
+                with figure.lock:
+                    figure.truncate(kept)
             self.logger.info(f"Plotting {plot_window}.")
             if not plot_window.visible:
                 # If the window is not visible
                 continue
-
-            if not plot_window._created:
-                self._create_plot_window(plot_name)
-
-            # First get the ax and cleans it
-            axes = self.axes[plot_name]
-            for ax in axes:
-                ax.clear()
-                ax.set_xlim(x[0], x[-1])
-
-            # Will follow the ax on which to plot
-            ax_index = int(0)
-            # Plot all the lines required
-            for plot_line in self.plots[plot_name].plot_lines:
-                ax = axes[ax_index]
-                ax_index += 0 if plot_line.share_y else 1
-
-                if plot_line.y_lims is not None:
-                    ax.set_ylim(plot_line.y_lims)
-                # Gets the attributes
-                y = (
-                    (
-                        self.model_outputs[
-                            plot_line.region, plot_line.attribute
-                        ]
-                        .to_numpy()
-                        .reshape(-1)
-                    )
-                    if isinstance(plot_line.attribute, str)
-                    else np.c_[  # Concatenate the values
-                        [
-                            self.model_outputs[plot_line.region, attr]
-                            .to_numpy()
-                            .reshape(-1)
-                            for attr in plot_line.attribute
-                        ]
-                    ].T
-                )
-                if "label" not in plot_line.kwargs:
-                    plot_line.kwargs[
-                        "label"
-                    ] = plot_line.attribute or " ".join(
-                        (plot_line.region, plot_line.attribute)
-                    )
-                artists = ax.plot(
-                    x,
-                    y,
-                    # color=self.region_colors[plot_line.region],
-                    **plot_line.kwargs,
-                )
-                self.logger.debug(
-                    f"Plotting {plot_line.region} {plot_line.attribute}."
-                )
-                self.logger.debug(f"Setting: \n x: {x} \n y: {y}.")
-
-                ax.legend()
-
-            # lock the figsurface, so it is not used during the drawing
-            self._figsurface_locks[plot_name].acquire()
-            self.logger.debug(
-                f"Lock acquired : {self._figsurface_locks[plot_name]}"
-            )
-            plot_window.figuresurf.canvas.draw()
-            plot_window.update_window_image()
-            self._figsurface_locks[plot_name].release()
-            # plot_window.figuresurf.canvas.flush_events()
-            # plot_window.get_container().set_image(plot_window.figuresurf)
+            if figure.render(history):
+                # lock the figure, so it is not used during the drawing
+                with figure.lock:
+                    plot_window.update_window_image()
+
+    def _send_history(self):
+        """Send the new steps to the renderer and show its new frames."""
+        if self._history_changed and self.ui_plot_windows:
+            self._history_changed = False
+            if self._kept is not None:
+                self._renderer.rewound(self._kept)
+                self._kept = None
+            self._renderer.update(self.MODEL_MANAGER.snapshot)
+        for plot_name in self._renderer.poll():
+            if plot_name in self.ui_plot_windows:
+                self.ui_plot_windows[plot_name].update_window_image()
 
     def draw(self):
         # Call the thread drawing the plot
@@ -389,16 +362,20 @@ class PlotsManager(AbstractPlotsManager):
         #     )
         #     self._surface_thread.start()
         #     self.logger.debug(f"Thread Started : {self._surface_thread}")
+        if self._renderer is not None:
+            self._send_history()
         self._draw()
-        # Draw the UI
-        self._UI_MANAGER.draw_ui(self.GAME_MANAGER.MAIN_DISPLAY)
 
     def _draw(self):
-        # Aquire the lock on all the active plots
-        locks = [
-            self._figsurface_locks[name]
-            for name in self.ui_plot_windows.keys()
-        ]
+        # Aquire the lock on all the figures rendered on a thread
+        locks = (
+            [
+                window.figuresurf.lock
+                for window in self.ui_plot_windows.values()
+            ]
+            if self._renderer is None
+            else []
+        )
         for lock in locks:
             lock.acquire()
             self.logger.debug(f"Lock acquired : {lock}")
@@ -406,13 +383,18 @@ class PlotsManager(AbstractPlotsManager):
         _time_elapsed = time.time() - self._last_time
         self._UI_MANAGER.update(_time_elapsed)
         self._last_time = time.time()
+        # Draw the UI, the windows read the pixels of the figures
+        self._UI_MANAGER.draw_ui(self.GAME_MANAGER.MAIN_DISPLAY)
 
         for lock in locks:
             lock.release()
             self.logger.debug(f"Lock released : {lock}")
 
     def quit(self):
-        self._content_thread.join()
+        if self._content_thread is not None:
+            self._content_thread.join()
+        if self._renderer is not None:
+            self._renderer.stop()
 
     def coordinates_from_serie(self, serie):
         """Convert a serie to pixel coordinates.
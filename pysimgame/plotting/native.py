@@ -0,0 +1,486 @@
+"""A plot manager drawing the plots directly with pygame.
+
+The lines are converted to pixel coordinates with numpy and drawn with
+:py:func:`pygame.draw.lines`, so no matplotlib figure is drawn during
+the game. Only :py:class:`LinePlot` are supported.
+"""
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+import numpy as np
+import pygame
+import pygame_gui
+from pygame_gui.elements import UIButton, UIWindow
+from pygame_gui.ui_manager import UIManager
+
+import pysimgame
+from pysimgame.plotting.base import AbstractPlotsManager
+from pysimgame.plotting.plot import LinePlot, Plot
+from pysimgame.plotting.utils.downsampling import MinMaxPyramid
+from pysimgame.plotting.utils.limits import GrowingLimits
+
+if TYPE_CHECKING:
+    from pysimgame.history import HistorySnapshot
+    from pysimgame.types import AttributeName, RegionName
+
+# Same colors as the default cycle of matplotlib
+LINE_COLORS = [
+    "#1f77b4",
+    "#ff7f0e",
+    "#2ca02c",
+    "#d62728",
+    "#9467bd",
+    "#8c564b",
+    "#e377c2",
+    "#7f7f7f",
+    "#bcbd22",
+    "#17becf",
+]
+BACKGROUND_COLOR = "white"
+AXIS_COLOR = "black"
+TICK_LENGTH = 4
+# Space around the axes, for the ticks labels
+MARGINS = {"left": 45, "right": 10, "top": 10, "bottom": 22}
+
+
+def nice_ticks(low: float, high: float, n_ticks: int = 5) -> np.ndarray:
+    """Return at most n_ticks round values between low and high.
+
+    The step between the ticks is 1, 2 or 5 times a power of 10.
+    """
+    span = high - low
+    if not span > 0:
+        return np.array([low])
+    step = 10 ** np.floor(np.log10(span / n_ticks))
+    for factor in (1, 2, 5, 10):
+        if span / (factor * step) <= n_ticks:
+            break
+    step *= factor
+    ticks = np.arange(np.ceil(low / step), np.floor(high / step) + 1) * step
+    # Avoid showing -0
+    return ticks + 0.0
+
+
+class _Line:
+    """A line of a plot, with its downsampling."""
+
+    def __init__(
+        self,
+        region: RegionName,
+        attribute: AttributeName,
+        label: str,
+        color: pygame.Color,
+        right: bool,
+    ) -> None:
+        self.region = region
+        self.attribute = attribute
+        self.label = label
+        self.color = color
+        # Whether the line uses the y axis on the right
+        self.right = right
+        self.pyramid = MinMaxPyramid()
+
+
+class LinePlotSurface:
+    """Draw a :py:class:`LinePlot` on a pygame surface.
+
+    The lines sharing the y axis are on the left axis, the other ones on
+    the right axis. As for :py:class:`PlotsManager`, the axes, ticks and
+    legend are drawn only when the limits change and the lines are drawn
+    over a copy of them.
+    """
+
+    surface: pygame.Surface
+    lines: List[_Line]
+    # Area of the axes in the surface
+    area: pygame.Rect
+    _background: pygame.Surface | None
+    _x_limits: GrowingLimits
+    # Limits of the left and right axes
+    _y_limits: Tuple[GrowingLimits, GrowingLimits]
+    # y limits given by the plot lines
+    _fixed_y_limits: List[list | None]
+    # Number of steps already included in the limits
+    _n_points: int
+
+    def __init__(
+        self,
+        plot: LinePlot,
+        size: Tuple[int, int],
+        font: pygame.font.Font = None,
+    ) -> None:
+        self.plot = plot
+        self.font = font or pygame.font.Font(None, 16)
+        self.lines = []
+        self._fixed_y_limits = [None, None]
+        for plot_line in plot.plot_lines:
+            attributes = (
+                [plot_line.attribute]
+                if isinstance(plot_line.attribute, str)
+                else plot_line.attribute
+            )
+            right = not plot_line.share_y
+            if plot_line.y_lims is not None:
+                self._fixed_y_limits[right] = plot_line.y_lims
+            for attribute in attributes:
+                self.lines.append(
+                    _Line(
+                        plot_line.region,
+                        attribute,
+                        plot_line.kwargs.get(
+                            "label", f"{plot_line.region} {attribute}"
+                        ),
+                        self._line_color(plot_line.kwargs, len(self.lines)),
+                        right,
+                    )
+                )
+        self._x_limits = GrowingLimits()
+        self._y_limits = (GrowingLimits(), GrowingLimits())
+        self.resize(size)
+
+    @staticmethod
+    def _line_color(kwargs: dict, index: int) -> pygame.Color:
+        try:
+            return pygame.Color(kwargs["color"])
+        except (KeyError, ValueError):
+            # Not given or only known by matplotlib
+            return pygame.Color(LINE_COLORS[index % len(LINE_COLORS)])
+
+    def resize(self, size: Tuple[int, int]):
+        """Change the size of the surface, drawn again at next render."""
+        self.surface = pygame.Surface(size)
+        self.area = pygame.Rect(
+            MARGINS["left"],
+            MARGINS["top"],
+            max(size[0] - MARGINS["left"] - MARGINS["right"], 1),
+            max(size[1] - MARGINS["top"] - MARGINS["bottom"], 1),
+        )
+        if any(line.right for line in self.lines):
+            # Space for the ticks labels of the right axis
+            self.area.width = max(
+                self.area.width - MARGINS["left"] + MARGINS["right"], 1
+            )
+        self._background = None
+        self._n_points = 0
+
+    def truncate(self, length: int):
+        """Forget the steps after length, the history was rewound.
+
+        The history can grow again past the steps removed before the
+        next render, so the surface cannot detect the rewind itself.
+        """
+        if length < self._n_points:
+            # The limits must include only the steps kept
+            self._n_points = 0
+            self._background = None
+        for line in self.lines:
+            line.pyramid.truncate(length)
+
+    def _y_axis_limits(self, right: bool) -> Tuple[float, float] | None:
+        if self._fixed_y_limits[right] is not None:
+            return tuple(self._fixed_y_limits[right])
+        limits = self._y_limits[right]
+        return None if limits.low is None else limits.limits
+
+    def render(self, history: HistorySnapshot) -> pygame.Surface:
+        """Draw the values of the history on the surface and return it."""
+        x = history.time_axis
+        if len(x) < 2:
+            # Cannot plot lines if only one point
+            self.surface.fill(BACKGROUND_COLOR)
+            return self.surface
+
+        n_points = self._n_points
+        if n_points > len(x) or self._background is None:
+            # Rewound or resized, the limits include only the steps kept
+            n_points = 0
+            self._background = None
+            self._x_limits.reset()
+            for limits in self._y_limits:
+                limits.reset()
+        redraw = self._x_limits.update(x[n_points:])
+        values = []
+        for line in self.lines:
+            # Views on the snapshot, nothing is copied
+            y = history[line.region, line.attribute][: len(x)]
+            values.append(y)
+            if self._fixed_y_limits[line.right] is None:
+                redraw |= self._y_limits[line.right].update(y[n_points:])
+        self._n_points = len(x)
+
+        x_limits = (x[0], self._x_limits.high)
+        if redraw or self._background is None:
+            self._draw_background(x_limits)
+        self.surface.blit(self._background, (0, 0))
+
+        self.surface.set_clip(self.area)
+        for line, y in zip(self.lines, values):
+            y_limits = self._y_axis_limits(line.right)
+            if y_limits is None:
+                continue
+            self._draw_line(
+                line,
+                *line.pyramid.downsample(x, y, self.area.width),
+                x_limits,
+                y_limits,
+            )
+        self.surface.set_clip(None)
+        return self.surface
+
+    def _to_pixels(
+        self,
+        values: np.ndarray,
+        limits: Tuple[float, float],
+        start: int,
+        length: int,
+        reverse: bool = False,
+    ) -> np.ndarray:
+        low, high = limits
+        scale = length / (high - low) if high > low else 0.0
+        if reverse:
+            # The pixels of y start from the top
+            return start + length - (values - low) * scale
+        return start + (values - low) * scale
+
+    def _draw_line(
+        self,
+        line: _Line,
+        x: np.ndarray,
+        y: np.ndarray,
+        x_limits: Tuple[float, float],
+        y_limits: Tuple[float, float],
+    ):
+        points = np.column_stack(
+            (
+                self._to_pixels(x, x_limits, self.area.left, self.area.width),
+                self._to_pixels(
+                    y, y_limits, self.area.top, self.area.height, True
+                ),
+            )
+        )
+        # Missing values are skipped
+        points = points[np.isfinite(points).all(axis=1)]
+        if len(points) >= 2:
+            pygame.draw.lines(
+                self.surface, line.color, False, points.tolist(), 2
+            )
+
+    def _draw_background(self, x_limits: Tuple[float, float]):
+        """Draw the axes, ticks and legend."""
+        background = pygame.Surface(self.surface.get_size())
+        background.fill(BACKGROUND_COLOR)
+        area = self.area
+        pygame.draw.rect(background, AXIS_COLOR, area.inflate(2, 2), 1)
+
+        for tick in nice_ticks(*x_limits):
+            pixel = self._to_pixels(tick, x_limits, area.left, area.width)
+            pygame.draw.line(
+                background,
+                AXIS_COLOR,
+                (pixel, area.bottom),
+                (pixel, area.bottom + TICK_LENGTH),
+            )
+            label = self.font.render(f"{tick:g}", True, AXIS_COLOR)
+            background.blit(
+                label,
+                label.get_rect(midtop=(pixel, area.bottom + TICK_LENGTH)),
+            )
+
+        for right in (False, True):
+            y_limits = self._y_axis_limits(right)
+            if y_limits is None or not any(
+                line.right == right for line in self.lines
+            ):
+                continue
+            side = area.right if right else area.left
+            direction = 1 if right else -1
+            for tick in nice_ticks(*y_limits):
+                pixel = self._to_pixels(
+                    tick, y_limits, area.top, area.height, True
+                )
+                pygame.draw.line(
+                    background,
+                    AXIS_COLOR,
+                    (side, pixel),
+                    (side + direction * TICK_LENGTH, pixel),
+                )
+                label = self.font.render(f"{tick:g}", True, AXIS_COLOR)
+                position = (side + direction * (TICK_LENGTH + 1), pixel)
+                background.blit(
+                    label,
+                    (
+                        label.get_rect(midleft=position)
+                        if right
+                        else label.get_rect(midright=position)
+                    ),
+                )
+
+        self._draw_legend(background)
+        self._background = background
+
+    def _draw_legend(self, background: pygame.Surface):
+        labels = [
+            self.font.render(line.label, True, AXIS_COLOR)
+            for line in self.lines
+        ]
+        if not labels:
+            return
+        swatch = 15
+        height = max(label.get_height() for label in labels)
+        width = swatch + 4 + max(label.get_width() for label in labels)
+        legend = pygame.Rect(0, 0, width + 6, height * len(labels) + 6)
+        legend.topright = (self.area.right - 4, self.area.top + 4)
+        if not self.area.contains(legend):
+            # Would hide the plot
+            return
+        pygame.draw.rect(background, BACKGROUND_COLOR, legend)
+        pygame.draw.rect(background, AXIS_COLOR, legend, 1)
+        for i, (line, label) in enumerate(zip(self.lines, labels)):
+            y = legend.top + 3 + i * height
+            pygame.draw.line(
+                background,
+                line.color,
+                (legend.left + 3, y + height // 2),
+                (legend.left + 3 + swatch, y + height // 2),
+                2,
+            )
+            background.blit(label, (legend.left + 7 + swatch, y))
+
+
+class NativePlotsManager(AbstractPlotsManager):
+    """Manager drawing the :py:class:`LinePlot` with pygame.
+
+    The plots are shown in windows of their own ui manager. A plot is
+    rendered again only when the model has new values or its window is
+    resized, otherwise the previous surface is reused.
+    """
+
+    # Name of the plot of each open window
+    windows: Dict[UIWindow, str]
+    surfaces: Dict[str, LinePlotSurface]
+
+    _plot_list_buttons: List[UIButton]
+    _menu_button_position: Tuple[int, int]
+    # The snapshot of the last render of each plot
+    _rendered: Dict[str, HistorySnapshot]
+    _last_time: float
+
+    def prepare(self):
+        self.windows = {}
+        self.surfaces = {}
+        self._rendered = {}
+        self._plot_list_buttons = []
+        self._last_time = time.time()
+        self.font = pygame.font.Font(None, 16)
+        # The windows are drawn with the plots, before the game UI
+        self._UI_MANAGER = UIManager(self.GAME_MANAGER.MAIN_DISPLAY.get_size())
+
+    def connect(self):
+        super().connect()
+        self._menu_button_position = (
+            self.GAME_MANAGER.MENU_OVERLAY.overlay_buttons[-1]
+            .get_abs_rect()
+            .bottomleft
+        )
+
+    def register_plot(self, plot: Plot):
+        """Register the plot, only :py:class:`LinePlot` can be shown."""
+        if not isinstance(plot, LinePlot):
+            self.logger.warning(f"{plot} is not a LinePlot, not shown.")
+            return
+        super().register_plot(plot)
+
+    def _plot(self, plot_name: str) -> LinePlot:
+        return next(plot for plot in self.plots if plot.name == plot_name)
+
+    def show_plots_list(self):
+        x, y = self._menu_button_position
+        width = 100
+        heigth = 30
+        for button in self._plot_list_buttons:
+            button.kill()
+        self._plot_list_buttons = [
+            UIButton(
+                relative_rect=pygame.Rect(x, y + i * heigth, width, heigth),
+                text=plot.name,
+                manager=self.GAME_MANAGER.UI_MANAGER,
+            )
+            for i, plot in enumerate(self.plots)
+        ]
+
+    def open_plot(self, plot_name: str) -> UIWindow:
+        """Open a window showing the plot."""
+        for window, name in self.windows.items():
+            if name == plot_name:
+                return window
+        x, y = self.GAME_MANAGER.MAIN_DISPLAY.get_size()
+        window = UIWindow(
+            pygame.Rect(x // 4, y // 4, 400, 300),
+            self._UI_MANAGER,
+            window_display_title=plot_name,
+            object_id="#plot_window",
+            resizable=True,
+        )
+        self.windows[window] = plot_name
+        self.surfaces[plot_name] = LinePlotSurface(
+            self._plot(plot_name),
+            window.get_container().get_size(),
+            self.font,
+        )
+        self._subscribe_plot(self._plot(plot_name))
+        return window
+
+    def close_plot(self, window: UIWindow):
+        """Remove the window of a plot."""
+        plot_name = self.windows.pop(window)
+        self.surfaces.pop(plot_name)
+        self._rendered.pop(plot_name, None)
+        self._unsubscribe_plot(plot_name)
+
+    def process_events(self, event: pygame.event.Event) -> bool:
+        if self._UI_MANAGER.process_events(event):
+            return True
+        if super().process_events(event):
+            return True
+
+        match event:
+            case pygame.event.EventType(type=pygame_gui.UI_BUTTON_PRESSED):
+                if event.ui_element in self._plot_list_buttons:
+                    self.open_plot(event.ui_element.text)
+                    for button in self._plot_list_buttons:
+                        button.kill()
+                    self._plot_list_buttons = []
+                    return True
+            case pygame.event.EventType(type=pygame_gui.UI_WINDOW_CLOSE):
+                if event.ui_element in self.windows:
+                    self.close_plot(event.ui_element)
+                    return True
+            case pygame.event.EventType(type=pysimgame.ModelRewound):
+                # The steps after it can change before the next draw
+                for plot_surface in self.surfaces.values():
+                    plot_surface.truncate(event.step + 1)
+                self._rendered = {}
+        return False
+
+    def draw(self):
+        """Draw the windows and the plots on the main display."""
+        now = time.time()
+        self._UI_MANAGER.update(now - self._last_time)
+        self._last_time = now
+        display = self.GAME_MANAGER.MAIN_DISPLAY
+        self._UI_MANAGER.draw_ui(display)
+
+        # Not modified while the model continues
+        snapshot = self.MODEL_MANAGER.snapshot
+        for window, plot_name in self.windows.items():
+            rect = window.get_container().get_abs_rect()
+            plot_surface = self.surfaces[plot_name]
+            if rect.size != plot_surface.surface.get_size():
+                plot_surface.resize(rect.size)
+                self._rendered.pop(plot_name, None)
+            if self._rendered.get(plot_name) is not snapshot:
+                plot_surface.render(snapshot)
+                self._rendered[plot_name] = snapshot
+            display.blit(plot_surface.surface, rect)
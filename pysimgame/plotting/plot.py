@@ -6,8 +6,6 @@ from dataclasses import dataclass, field
 
 from typing import TYPE_CHECKING, Callable, Dict, List, overload
 
-import matplotlib.axes
-import matplotlib.figure
 import numpy as np
 
 from pysimgame.regions_display import RegionComponent
@@ -15,10 +13,13 @@ from pysimgame.regions_display import RegionComponent
 if TYPE_CHECKING:
     from pysimgame.types import AttributeName, RegionName
     import matplotlib.artist
-    import pandas as pd
+    import matplotlib.axes
+    import matplotlib.figure
+    from pysimgame.history import HistoryStore
 
     ArtistsDict = dict[str, matplotlib.artist.Artist]
-    DataFrames = dict[tuple[RegionName, AttributeName], pd.Series]
+    # Gives the values of (region, attribute) through time
+    DataFrames = HistoryStore
     PlotFunction = Callable[[matplotlib.axes.Axes, DataFrames], ArtistsDict]
     BlitFunction = Callable[[ArtistsDict, DataFrames], None]
 
@@ -52,6 +53,9 @@ class Plot:
     """Represent a plot for pysimgame."""
 
     name: str
+    # Attributes read by the plot, captured while it is open
+    # None reads all the capture attributes
+    attributes: List[AttributeName] | None = None
 
     def __init__(self, name: str) -> None:
         """Create a plot and register it in the plot manager."""
@@ -101,7 +105,6 @@ class LinePlot(Plot):
         attributes: AttributeName | List[AttributeName] = None,
     ) -> None:
         """Create a plot object."""
-        super().__init__(name)
         from .base import _PLOT_MANAGER
 
         game = _PLOT_MANAGER.GAME
@@ -127,6 +130,19 @@ class LinePlot(Plot):
         self.plot_lines = list(args) + [
             PlotLine(reg, attributes) for reg in regions
         ]
+        self.attributes = list(
+            dict.fromkeys(
+                attribute
+                for line in self.plot_lines
+                for attribute in (
+                    [line.attribute]
+                    if isinstance(line.attribute, str)
+                    else line.attribute
+                )
+            )
+        )
+        # Register once the lines are known
+        super().__init__(name)
 
 
 class MplPlot(Plot):
@@ -142,6 +158,8 @@ class MplPlot(Plot):
     :arg blit_func: Called at every model update, knows what to change
         in the plot.
         Usually just setting the data.
+    :arg attributes: The attributes read by the functions. If None,
+        all the capture attributes of the model.
     """
 
     # A function receiving a dataframe with the data and returning the created artists
@@ -150,11 +168,16 @@ class MplPlot(Plot):
     blit_func: BlitFunction
 
     def __init__(
-        self, name: str, plot_func: PlotFunction, blit_func: BlitFunction
+        self,
+        name: str,
+        plot_func: PlotFunction,
+        blit_func: BlitFunction,
+        attributes: List[AttributeName] = None,
     ) -> None:
-        super().__init__(name)
         self.plot_func = plot_func
         self.blit_func = blit_func
+        self.attributes = attributes
+        super().__init__(name)
 
 
 class FakePlot(Plot):
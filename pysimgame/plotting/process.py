@@ -0,0 +1,576 @@
+"""Render the plots in a worker process.
+
+Drawing the matplotlib figures takes time, and in a thread of the game
+process it competes for the GIL with the model and the game loop.
+The :py:class:`PlotsRenderer` forks a worker rendering the figures
+(see :py:class:`LinePlotFigure`) instead.
+
+The data goes through shared memory in both directions:
+
+    * The game process copies the new steps of the series read by the
+        open plots in a :py:class:`SharedHistory` .
+    * The worker draws each plot in one of its two frames, RGBA
+        pixels in shared memory. The game process shows the last frame
+        completed while the worker draws the next one in the other
+        frame, so it only blits pixels and never waits for the worker.
+
+Only short messages are sent through the pipe, to tell which steps
+and frames are ready.
+
+.. note:: The worker is forked, as the workers of
+    :py:class:`~pysimgame.parallel.ParallelModelManager` , so it is
+    only available on platforms supporting the 'fork' start method.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+from itertools import chain
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Dict, List, Set, Tuple
+
+import numpy as np
+import pygame
+
+from .utils.figure import LinePlotFigure
+
+if TYPE_CHECKING:
+    from pysimgame.history import HistorySnapshot
+    from pysimgame.types import AttributeName, RegionName
+
+    from .plot import PlotLine
+
+    Series = Tuple[RegionName, AttributeName]
+
+logger = logging.getLogger(__name__)
+
+
+def plot_lines_series(plot_lines: List[PlotLine]) -> List[Series]:
+    """The series of the history read by the plot lines."""
+    series = []
+    for plot_line in plot_lines:
+        attributes = (
+            [plot_line.attribute]
+            if isinstance(plot_line.attribute, str)
+            else plot_line.attribute
+        )
+        series.extend(
+            (plot_line.region, attribute) for attribute in attributes
+        )
+    return series
+
+
+def _close(shared_memory: SharedMemory) -> bool:
+    """Close the shared memory, False if its buffer is still used."""
+    try:
+        shared_memory.close()
+    except BufferError:
+        # Surfaces still show it, try again later
+        return False
+    return True
+
+
+class _SharedMemory(SharedMemory):
+    """Shared memory which can be dropped while surfaces still show it.
+
+    The memory is then unmapped with the last surface using it.
+    """
+
+    def __del__(self):
+        _close(self)
+
+
+class SharedHistory:
+    """Steps of some series of the history, in shared memory.
+
+    It is read like the history, for the series it contains.
+    The game process allocates the memory and writes the steps, the
+    worker attaches to it and reads them.
+    """
+
+    series: List[Series]
+    # Number of steps the memory can contain
+    capacity: int
+    # Number of steps written
+    length: int
+    shared_memory: SharedMemory | None
+    # The times and then the values of each series, one row each
+    _array: np.ndarray
+    _rows: Dict[Series, int]
+
+    def __init__(self) -> None:
+        self.series = []
+        self.capacity = 0
+        self.length = 0
+        self.shared_memory = None
+        self._array = np.empty((1, 0))
+        self._rows = {}
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, key: Series) -> np.ndarray:
+        return self._array[self._rows[key], : self.length]
+
+    @property
+    def time_axis(self) -> np.ndarray:
+        return self._array[0, : self.length]
+
+    def _set_memory(
+        self, shared_memory: SharedMemory, series: List[Series], capacity: int
+    ) -> SharedMemory | None:
+        """Use the memory and return the previous one."""
+        previous = self.shared_memory
+        self.shared_memory = shared_memory
+        self.series = list(series)
+        self.capacity = capacity
+        self._rows = {key: i + 1 for i, key in enumerate(self.series)}
+        self._array = np.ndarray(
+            (len(self.series) + 1, capacity),
+            dtype=np.float64,
+            buffer=shared_memory.buf,
+        )
+        return previous
+
+    def allocate(
+        self, series: List[Series], capacity: int
+    ) -> SharedMemory | None:
+        """Use new memory for the series, empty.
+
+        :return: The previous memory, which must be unlinked once the
+            worker does not use it.
+        """
+        self._array = None
+        shared_memory = _SharedMemory(
+            create=True, size=8 * (len(series) + 1) * max(capacity, 1)
+        )
+        self.length = 0
+        return self._set_memory(shared_memory, series, capacity)
+
+    def attach(self, name: str, series: List[Series], capacity: int):
+        """Read the memory allocated by the game process."""
+        self._array = None
+        previous = self._set_memory(_SharedMemory(name), series, capacity)
+        if previous is not None:
+            previous.close()
+
+    def write(self, history: HistorySnapshot, start: int):
+        """Copy the steps of the history from start."""
+        stop = len(history)
+        # Only the steps copied are read, also from the disk
+        self._array[0, start:stop] = history.time_slice(start, stop)
+        for (region, attribute), row in self._rows.items():
+            try:
+                self._array[row, start:stop] = history.column(
+                    region, attribute, start, stop
+                )
+            except KeyError:
+                # Not captured yet
+                self._array[row, start:stop] = np.nan
+        self.length = stop
+
+    def close(self):
+        self._array = None
+        if self.shared_memory is not None:
+            self.shared_memory.close()
+            self.shared_memory = None
+
+
+class _Frames:
+    """The two RGBA frames of a plot, in shared memory."""
+
+    size: Tuple[int, int]
+    shared_memory: SharedMemory
+
+    def __init__(self, size: Tuple[int, int], name: str = None) -> None:
+        self.size = width, height = size
+        if name is None:
+            self.shared_memory = _SharedMemory(
+                create=True, size=max(2 * width * height * 4, 1)
+            )
+        else:
+            self.shared_memory = _SharedMemory(name)
+
+    @property
+    def name(self) -> str:
+        return self.shared_memory.name
+
+    def surfaces(self) -> List[pygame.Surface]:
+        """Surfaces on the pixels of the frames, without copies."""
+        n_bytes = self.size[0] * self.size[1] * 4
+        return [
+            pygame.image.frombuffer(
+                self.shared_memory.buf[i * n_bytes : (i + 1) * n_bytes],
+                self.size,
+                "RGBA",
+            )
+            for i in range(2)
+        ]
+
+    def write(self, index: int, figure: LinePlotFigure):
+        """Copy the pixels of the figure in the frame."""
+        width, height = self.size
+        frames = np.ndarray(
+            (2, height, width, 4),
+            dtype=np.uint8,
+            buffer=self.shared_memory.buf,
+        )
+        pixels = np.asarray(figure.figure.canvas.get_renderer().buffer_rgba())
+        # The renderer can be a pixel smaller after rounding its size
+        height, width = min(height, len(pixels)), min(width, pixels.shape[1])
+        frames[index, :height, :width] = pixels[:height, :width]
+        del frames
+
+
+class _RenderedPlot:
+    """A plot of the worker, with its figure and frames."""
+
+    figure: LinePlotFigure
+    frames: _Frames
+    # Frame written at the next render
+    index: int
+    # Whether the game process shows the last frame sent, so the
+    # other one can be written
+    ready: bool
+    # Whether the figure must be rendered again
+    dirty: bool
+
+    def __init__(self, figure: LinePlotFigure, frames: _Frames) -> None:
+        self.figure = figure
+        self.frames = frames
+        self.index = 0
+        self.ready = True
+        self.dirty = True
+
+
+def _render_loop(connection: Connection):
+    """Render the plots for the game process.
+
+    Messages are tuples, starting with the name of the command:
+
+        * ("history", name, series, capacity): Read the steps from the
+            shared memory of that name.
+        * ("length", length, kept): The shared memory contains length
+            steps, the steps from kept were changed by a rewind.
+        * ("open", plot_name, plot_lines, frames_name, size): Render
+            the plot in the frames of that name.
+        * ("resize", plot_name, frames_name, size): Render the plot in
+            new frames.
+        * ("shown", plot_name, frames_name): The last frame sent is
+            shown, the other one can be written.
+        * ("close", plot_name): Stop rendering the plot.
+        * ("stop",): Stop the worker.
+
+    A plot is rendered again when the steps change, once its last
+    frame is shown. ("frame", plot_name, frames_name, index) is sent
+    back when a frame is written, and ("released", name) when a shared
+    memory is not used anymore.
+    """
+    # The game loop gets the cpu first when they share it
+    os.nice(10)
+    history = SharedHistory()
+    plots: Dict[str, _RenderedPlot] = {}
+    while True:
+        if not any(plot.dirty and plot.ready for plot in plots.values()):
+            # Nothing to render, wait for the game process
+            connection.poll(None)
+        while connection.poll():
+            command, *args = connection.recv()
+            match command:
+                case "history":
+                    name, series, capacity = args
+                    previous = history.shared_memory
+                    history.attach(name, series, capacity)
+                    if previous is not None:
+                        connection.send(("released", previous.name))
+                case "length":
+                    history.length, kept = args
+                    for plot in plots.values():
+                        plot.figure.truncate(kept)
+                        plot.dirty = True
+                case "open":
+                    plot_name, plot_lines, frames_name, size = args
+                    plot = _RenderedPlot(
+                        LinePlotFigure(plot_lines), _Frames(size, frames_name)
+                    )
+                    plot.figure.set_bounding_rect(pygame.Rect((0, 0), size))
+                    plots[plot_name] = plot
+                case "resize":
+                    plot_name, frames_name, size = args
+                    plot = plots[plot_name]
+                    previous = plot.frames
+                    plot.frames = _Frames(size, frames_name)
+                    previous.shared_memory.close()
+                    connection.send(("released", previous.name))
+                    plot.figure.set_bounding_rect(pygame.Rect((0, 0), size))
+                    # No frame of the new memory is shown yet
+                    plot.index, plot.ready, plot.dirty = 0, True, True
+                case "shown":
+                    plot_name, frames_name = args
+                    plot = plots.get(plot_name)
+                    if plot is not None and plot.frames.name == frames_name:
+                        plot.ready = True
+                case "close":
+                    (plot_name,) = args
+                    plot = plots.pop(plot_name)
+                    plot.frames.shared_memory.close()
+                    connection.send(("released", plot.frames.name))
+                case "stop":
+                    for plot in plots.values():
+                        plot.frames.shared_memory.close()
+                    history.close()
+                    connection.close()
+                    return
+
+        for plot_name, plot in plots.items():
+            if not (plot.dirty and plot.ready):
+                continue
+            plot.dirty = False
+            try:
+                if not plot.figure.render(history):
+                    continue
+                plot.frames.write(plot.index, plot.figure)
+            except Exception as exp:
+                # The game process logs it
+                connection.send(("error", plot_name, exp))
+                continue
+            connection.send(("frame", plot_name, plot.frames.name, plot.index))
+            plot.index = 1 - plot.index
+            plot.ready = False
+
+
+class RemoteFigure:
+    """The frames of a plot rendered by the worker.
+
+    Used as the figure of a
+    :py:class:`~pysimgame.plotting.utils.agg.UIAggPlotWindow` , the
+    window shows the last frame completed.
+    """
+
+    plot_name: str
+    frames: _Frames
+    _renderer: PlotsRenderer
+    _surfaces: List[pygame.Surface]
+    # Frame shown, None until the first frame is rendered
+    _shown: int | None
+    # Shown until the first frame is rendered
+    _blank: pygame.Surface | None
+
+    def __init__(
+        self, renderer: PlotsRenderer, plot_name: str, frames: _Frames
+    ) -> None:
+        self._renderer = renderer
+        self.plot_name = plot_name
+        self._blank = None
+        self.set_frames(frames)
+
+    @property
+    def surface(self) -> pygame.Surface:
+        if self._shown is not None:
+            return self._surfaces[self._shown]
+        if self._blank is None or self._blank.get_size() != self.frames.size:
+            self._blank = pygame.Surface(self.frames.size)
+            self._blank.fill("white")
+        return self._blank
+
+    def set_frames(self, frames: _Frames):
+        self.frames = frames
+        self._surfaces = frames.surfaces()
+        self._shown = None
+
+    def release(self):
+        """Stop showing the frames, so that their memory can be freed."""
+        self._surfaces = []
+        self._shown = None
+
+    def show(self, frames_name: str, index: int) -> bool:
+        """Show the frame, False if it is from previous frames."""
+        if frames_name != self.frames.name:
+            return False
+        self._shown = index
+        return True
+
+    def set_bounding_rect(self, rect: pygame.Rect):
+        """Request frames of the size of the rectangle."""
+        self._renderer.resize(self.plot_name, rect.size)
+
+
+class PlotsRenderer:
+    """A worker process rendering plots, see the module documentation.
+
+    All the methods must be called from the same thread of the game
+    process.
+    """
+
+    figures: Dict[str, RemoteFigure]
+    history: SharedHistory
+    _process: multiprocessing.Process
+    _connection: Connection
+    # Series read by each plot
+    _series: Dict[str, List[Series]]
+    # Memory still used by the worker
+    _released: Dict[str, SharedMemory]
+    # Memory released by the worker but maybe still shown
+    _closing: List[SharedMemory]
+    # Attributes of the history of the last update
+    _attributes: List[AttributeName] | None
+    # Steps unchanged since the last update
+    _kept: int | None
+
+    def __init__(self) -> None:
+        try:
+            context = multiprocessing.get_context("fork")
+        except ValueError as exp:
+            raise RuntimeError(
+                f"{type(self).__name__} requires the 'fork' start method."
+            ) from exp
+        self.figures = {}
+        self.history = SharedHistory()
+        self._series = {}
+        self._released = {}
+        self._closing = []
+        self._attributes = None
+        self._kept = None
+        # The worker must not start its own tracker, which would remove
+        # the memory of the game process when the worker stops
+        resource_tracker.ensure_running()
+        self._connection, worker_connection = context.Pipe()
+        self._process = context.Process(
+            target=_render_loop,
+            args=(worker_connection,),
+            name="PlotsRenderer",
+            daemon=True,
+        )
+        self._process.start()
+        worker_connection.close()
+
+    def _send(self, *message):
+        self._connection.send(message)
+
+    # region Plots
+    def open(
+        self, plot_name: str, plot_lines: List[PlotLine], size: Tuple[int, int]
+    ) -> RemoteFigure:
+        """Start rendering the plot in frames of the given size."""
+        frames = _Frames(size)
+        self.figures[plot_name] = RemoteFigure(self, plot_name, frames)
+        self._series[plot_name] = plot_lines_series(plot_lines)
+        self._send("open", plot_name, plot_lines, frames.name, size)
+        return self.figures[plot_name]
+
+    def resize(self, plot_name: str, size: Tuple[int, int]):
+        """Render the plot in frames of the new size."""
+        figure = self.figures[plot_name]
+        if figure.frames.size == tuple(size):
+            return
+        previous = figure.frames
+        figure.set_frames(_Frames(tuple(size)))
+        self._released[previous.name] = previous.shared_memory
+        self._send("resize", plot_name, figure.frames.name, tuple(size))
+
+    def close(self, plot_name: str):
+        """Stop rendering the plot."""
+        figure = self.figures.pop(plot_name)
+        figure.release()
+        del self._series[plot_name]
+        self._released[figure.frames.name] = figure.frames.shared_memory
+        self._send("close", plot_name)
+
+    # endregion Plots
+
+    # region Data
+    def rewound(self, length: int):
+        """The history was truncated to length steps."""
+        self._kept = length if self._kept is None else min(self._kept, length)
+
+    def update(self, history: HistorySnapshot):
+        """Send the steps of the history not sent yet to the worker."""
+        kept = len(self.history) if self._kept is None else self._kept
+        self._kept = None
+        if history.attributes is not self._attributes:
+            # New attributes may have values at steps already sent
+            self._attributes = history.attributes
+            kept = 0
+        kept = min(kept, len(self.history))
+        length = len(history)
+        series = list(dict.fromkeys(chain(*self._series.values())))
+        if (
+            not set(series).issubset(self.history.series)
+            or length > self.history.capacity
+        ):
+            previous = self.history.allocate(
+                series, max(length, 2 * self.history.capacity, 256)
+            )
+            self.history.write(history, 0)
+            if previous is not None:
+                self._released[previous.name] = previous
+            self._send(
+                "history",
+                self.history.shared_memory.name,
+                self.history.series,
+                self.history.capacity,
+            )
+        elif length == len(self.history) and kept == length:
+            return
+        else:
+            self.history.write(history, kept)
+        self._send("length", length, kept)
+
+    # endregion Data
+
+    def poll(self) -> Set[str]:
+        """Show the frames completed.
+
+        :return: The names of the plots with a new frame.
+        """
+        updated = set()
+        while self._connection.poll():
+            command, *args = self._connection.recv()
+            match command:
+                case "frame":
+                    plot_name, frames_name, index = args
+                    figure = self.figures.get(plot_name)
+                    if figure is not None and figure.show(frames_name, index):
+                        self._send("shown", plot_name, frames_name)
+                        updated.add(plot_name)
+                case "released":
+                    (name,) = args
+                    self._closing.append(self._released.pop(name))
+                case "error":
+                    plot_name, exp = args
+                    logger.error(f"Could not render {plot_name}: {exp!r}")
+        self._free()
+        return updated
+
+    def _free(self):
+        """Close and unlink the memory released by the worker."""
+        closing = []
+        for shared_memory in self._closing:
+            if _close(shared_memory):
+                shared_memory.unlink()
+            else:
+                closing.append(shared_memory)
+        self._closing = closing
+
+    def stop(self):
+        """Stop the worker and free the shared memory."""
+        self._send("stop")
+        self._process.join()
+        self._connection.close()
+        self._closing.extend(self._released.values())
+        for figure in self.figures.values():
+            figure.release()
+            self._closing.append(figure.frames.shared_memory)
+        self._released = {}
+        self.figures = {}
+        if self.history.shared_memory is not None:
+            self.history.shared_memory.unlink()
+            self.history.close()
+        self._free()
+        for shared_memory in self._closing:
+            # Still shown, unmapped with the last surface using it
+            shared_memory.unlink()
+        self._closing = []
@@ -1,9 +1,9 @@
 """A plot manager using basic matplotlib backends."""
 from __future__ import annotations
 import sys
+from functools import cache
 from typing import TYPE_CHECKING
 
-import matplotlib
 from pysimgame.plotting.utils.conversions import lineplots_to_mplplots
 from pysimgame.utils.abstract_managers import AbstractGameManager
 
@@ -11,32 +11,42 @@ from pysimgame.utils.fake import FakeGameManager
 
 from pysimgame.plotting.plot import  FakePlot, LinePlot, MplPlot, Plot
 from pysimgame.plotting.base import AbstractPlotsManager
-from pysimgame.plotting.pyside.plot_list import PlotsList, PlotButton
-
-from PySide6.QtWidgets import (
-    QMainWindow,
-    QPushButton,
-    QApplication,
-    QWidget,
-    QVBoxLayout,
-)
-
-
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
-from matplotlib.figure import Figure
 
+# Qt is only imported once the plots are shown, as it is slow to import
 if TYPE_CHECKING:
     import matplotlib.axes
+    from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+    from pysimgame.history import HistorySnapshot
     from pysimgame.plotting.plot import ArtistsDict
+    from pysimgame.plotting.pyside.plot_list import PlotsList
+
+    MplCanvas = FigureCanvasQTAgg
+
+
+@cache
+def _mpl_canvas_class() -> type[MplCanvas]:
+    """Create the canvas class, importing the qt backend."""
+    # The backend uses the qt binding already imported
+    import PySide6.QtWidgets
+    from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+    from matplotlib.figure import Figure
+    from PySide6.QtCore import Signal
 
+    class MplCanvas(FigureCanvasQTAgg):
+        ax: matplotlib.axes.Axes
+        # Emitted when the user closes the canvas
+        closed = Signal()
 
-class MplCanvas(FigureCanvasQTAgg):
-    ax: matplotlib.axes.Axes
+        def __init__(self, parent=None, width=5, height=4, dpi=100):
+            fig = Figure(figsize=(width, height), dpi=dpi)
+            self.ax = fig.add_subplot(111)
+            super(MplCanvas, self).__init__(fig)
 
-    def __init__(self, parent=None, width=5, height=4, dpi=100):
-        fig = Figure(figsize=(width, height), dpi=dpi)
-        self.ax = fig.add_subplot(111)
-        super(MplCanvas, self).__init__(fig)
+        def closeEvent(self, event):
+            super().closeEvent(event)
+            self.closed.emit()
+
+    return MplCanvas
 
 
 class QtPlotManager(AbstractPlotsManager):
@@ -62,7 +72,12 @@ class QtPlotManager(AbstractPlotsManager):
         self.artists = {}
     
     def connect(self):
-        self.data = self.GAME_MANAGER.MODEL_MANAGER.data
+        self.MODEL_MANAGER = self.GAME_MANAGER.MODEL_MANAGER
+
+    @property
+    def data(self) -> HistorySnapshot:
+        """The values of the model after its last step."""
+        return self.MODEL_MANAGER.snapshot
 
     def register_plot(self, plot: Plot):
         """Register new plots.
@@ -86,6 +101,8 @@ class QtPlotManager(AbstractPlotsManager):
 
     def show_plots_list(self):
         if not hasattr(self, "plot_list"):
+            from pysimgame.plotting.pyside.plot_list import PlotsList
+
             # Create the plot list if was not created
             self.plot_list = PlotsList(self.plots)
             self.plot_list.open_plot.connect(self.open_plot)
@@ -100,12 +117,21 @@ class QtPlotManager(AbstractPlotsManager):
             self.logger.debug(f"{plot} already in canvas.")
             self.canvas[plot]
             return
-        self.canvas[plot] = MplCanvas()
+        self.canvas[plot] = _mpl_canvas_class()()
+        self.canvas[plot].closed.connect(lambda: self.close_plot(plot))
+        self._subscribe_plot(plot)
 
         ax = self.canvas[plot].ax
 
         self.artists[plot] = plot.plot_func(ax, self.data)
 
+    def close_plot(self, plot: MplPlot):
+        """Remove the canvas of the plot closed by the player."""
+        if self.canvas.pop(plot, None) is None:
+            return
+        self.artists.pop(plot, None)
+        self._unsubscribe_plot(plot.name)
+
     def draw(self):
         """Updates the plots."""
         # Automatically called by the abstract
@@ -115,6 +141,7 @@ class QtPlotManager(AbstractPlotsManager):
 
 
 if __name__ == "__main__":
+    from PySide6.QtWidgets import QApplication
 
     app = QApplication()
 
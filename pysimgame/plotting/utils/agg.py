@@ -0,0 +1,113 @@
+"""Show matplotlib figures drawn with Agg in pygame, without copies.
+
+The pixels of the Agg renderer are wrapped in a pygame surface
+sharing their memory, see :py:func:`pygame.image.frombuffer` .
+The renderer, and so the surface, is reused by matplotlib as long as
+the size of the figure does not change, so drawing the figure again
+directly updates the surface shown.
+"""
+from __future__ import annotations
+
+from contextlib import nullcontext
+from typing import Union
+
+import pygame
+from matplotlib.backends.backend_agg import FigureCanvasAgg, RendererAgg
+from matplotlib.figure import Figure
+from pygame_gui.core.interfaces.manager_interface import IUIManagerInterface
+from pygame_gui.core.ui_element import ObjectID
+from pygame_gui.elements.ui_window import UIWindow
+
+
+class AggFigureSurface:
+    """A matplotlib figure with a pygame surface on its pixels.
+
+    :param figure: The figure, a new Agg canvas is attached to it.
+    """
+
+    figure: Figure
+    canvas: FigureCanvasAgg
+    _surface: pygame.Surface | None
+    # The renderer owning the memory of the surface
+    _renderer: RendererAgg | None
+
+    def __init__(self, figure: Figure) -> None:
+        self.figure = figure
+        self.canvas = FigureCanvasAgg(figure)
+        self._surface = None
+        self._renderer = None
+
+    @property
+    def surface(self) -> pygame.Surface:
+        """The pixels of the figure, since its last draw.
+
+        The same surface is returned until the figure is resized.
+        """
+        renderer = self.canvas.get_renderer()
+        if renderer is not self._renderer:
+            self._renderer = renderer
+            self._surface = pygame.image.frombuffer(
+                renderer.buffer_rgba(),
+                (int(renderer.width), int(renderer.height)),
+                "RGBA",
+            )
+        return self._surface
+
+    def set_bounding_rect(self, rect: pygame.Rect):
+        """Resize the figure to the rectangle and draw it."""
+        dpi = self.figure.get_dpi()
+        self.figure.set_size_inches(rect.width / dpi, rect.height / dpi)
+        self.canvas.draw()
+
+
+class UIAggPlotWindow(UIWindow):
+    """A pygame_gui window showing an :py:class:`AggFigureSurface` .
+
+    The container of the window uses the surface of the figure as its
+    image, instead of a copy of it, when the window is not clipped.
+    The figure can be any object with a ``surface`` and a
+    ``set_bounding_rect`` method, such as the
+    :py:class:`~pysimgame.plotting.process.RemoteFigure` of a plot
+    rendered in a worker. If the figure has a ``lock`` , as the
+    :py:class:`~pysimgame.plotting.utils.figure.LinePlotFigure`
+    rendered on a thread, it is held while the figure is resized.
+    """
+
+    def __init__(
+        self,
+        rect: pygame.Rect,
+        manager: IUIManagerInterface,
+        figuresurf: AggFigureSurface,
+        window_display_title: str = "",
+        element_id: Union[str, None] = None,
+        object_id: Union[ObjectID, str, None] = None,
+        resizable: bool = False,
+        visible: int = 1,
+    ):
+        self.figuresurf = figuresurf
+        super().__init__(
+            rect,
+            manager,
+            window_display_title=window_display_title,
+            element_id=element_id,
+            object_id=object_id,
+            resizable=resizable,
+            visible=visible,
+        )
+
+    def set_dimensions(self, *args, **kwargs):
+        super().set_dimensions(*args, **kwargs)
+        # Not rendered by another thread while resized
+        with getattr(self.figuresurf, "lock", nullcontext()):
+            self.figuresurf.set_bounding_rect(self.get_container().get_rect())
+            self.update_window_image()
+
+    def update_window_image(self):
+        """Show the last drawing of the figure."""
+        container = self.get_container()
+        surface = self.figuresurf.surface
+        if container.get_image_clipping_rect() is not None:
+            # pygame_gui draws a clipped copy
+            container._set_image(surface)
+        elif container.image is not surface:
+            container.image = surface
@@ -1,17 +1,17 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING, Any
-from matplotlib.lines import Line2D
-
-import pandas as pd
 
 
 from ..plot import LinePlot, MplPlot
+from .downsampling import MinMaxPyramid
 
 
 if TYPE_CHECKING:
     from pysimgame.types import AttributeName, RegionName
     from matplotlib.artist import Artist
+    from matplotlib.lines import Line2D
     from matplotlib.axes import Axes
+    from pysimgame.history import HistoryStore
     from ..plot import (
         ArtistsDict,
         BlitFunction,
@@ -21,32 +21,44 @@ if TYPE_CHECKING:
 
 
 def lineplots_to_mplplots(line_plot: LinePlot) -> MplPlot:
-    """Convert a :py:class:`LinePlot` to a :py:class:`MplPlot`."""
+    """Convert a :py:class:`LinePlot` to a :py:class:`MplPlot`.
+
+    The lines are downsampled to the width of the axes, using a
+    :py:class:`MinMaxPyramid` for each line.
+    """
+    pyramids: dict[str, MinMaxPyramid] = {}
 
+    def downsample(line: Line2D, name: str, data: HistoryStore):
+        x = data.time_axis
+        region, attr = name.split("|", maxsplit=1)
+        if name not in pyramids:
+            pyramids[name] = MinMaxPyramid()
+        return pyramids[name].downsample(
+            x, data[(region, attr)][: len(x)], int(line.axes.bbox.width)
+        )
 
-    def plot_func(
-        ax: Axes, data: dict[tuple[RegionName, AttributeName], pd.Series]
-    ) -> dict[str, Artist]:
+    def plot_func(ax: Axes, data: HistoryStore) -> dict[str, Artist]:
         """Create the artists needed for the lines."""
         artists: dict[str, Line2D] = {}
         for line in line_plot.plot_lines:
             attr_list = [line.attribute] if isinstance(line.attribute, str) else line.attribute
             for attr in attr_list:
                 # There will be only 1 artist per line
-                artist[f"{line.region}|{attr}"] =  ax.plot(
-                    data[(line.region, attr)]
-                )[0]
-               
-            
+                artists[f"{line.region}|{attr}"] = ax.plot([], [])[0]
 
-        for artist in artists.values():
+        for name, artist in artists.items():
+            artist.set_data(*downsample(artist, name, data))
             artist.set_animated(True)
+        ax.relim()
+        ax.autoscale_view()
 
         return artists
 
-    def blit_func(artists: dict[str, Line2D], data: DataFrames) -> None:
+    def blit_func(artists: dict[str, Line2D], data: HistoryStore) -> None:
         for art_str, line in artists.items():
             # TODO: make sure | is forbidden in RegionName
-            line.set_data(data[art_str.split("|", maxsplit=1)])
+            line.set_data(*downsample(line, art_str, data))
 
-    return MplPlot(line_plot.name, plot_func, blit_func)
+    return MplPlot(
+        line_plot.name, plot_func, blit_func, attributes=line_plot.attributes
+    )
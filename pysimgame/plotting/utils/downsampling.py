@@ -0,0 +1,193 @@
+"""Downsampling of the time series plotted.
+
+A plot is only a few hundreds pixels wide, so the lines do not need
+more points than the pixels. :py:class:`MinMaxPyramid` keeps for each
+bucket of steps the indices of its minimum and maximum, so that the
+peaks are still visible on the downsampled line.
+
+The buckets are stored at several levels, each bucket of a level
+containing ``factor`` buckets of the level below. Only the new steps
+are added to the levels, and the level used depends on the number of
+steps shown, so showing the whole history stays fast.
+"""
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import numpy as np
+
+
+def _extrema(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Position of the minimum and maximum of each row, nan ignored."""
+    nans = np.isnan(values)
+    if not nans.any():
+        return values.argmin(axis=1), values.argmax(axis=1)
+    return (
+        np.where(nans, np.inf, values).argmin(axis=1),
+        np.where(nans, -np.inf, values).argmax(axis=1),
+    )
+
+
+class MinMaxPyramid:
+    """Multi-resolution min/max buckets of a series growing in time.
+
+    :param factor: Number of buckets merged in a bucket of the next
+        level.
+    """
+
+    factor: int
+    # Indices of the (min, max) of each bucket, for each level
+    _levels: List[np.ndarray]
+    # Number of buckets stored in each level
+    _sizes: List[int]
+    # Number of values included in the levels
+    _length: int
+
+    def __init__(self, factor: int = 2) -> None:
+        if factor < 2:
+            raise ValueError(f"Factor must be at least 2, not {factor}.")
+        self.factor = factor
+        self.reset()
+
+    def reset(self):
+        """Forget the values added."""
+        self._levels = []
+        self._sizes = []
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def bucket_size(self, level: int) -> int:
+        """Number of values in a bucket of the level."""
+        return self.factor ** (level + 1)
+
+    def update(self, y: np.ndarray):
+        """Add the values not yet in the buckets.
+
+        The series can only grow. If it is shorter than the values
+        added, it was rewound and the buckets after its end are
+        removed.
+        """
+        length = len(y)
+        self.truncate(length)
+        if length == self._length:
+            return
+        self._length = length
+
+        level = 0
+        while True:
+            n_buckets = length // self.bucket_size(level)
+            done = self._sizes[level] if level < len(self._sizes) else 0
+            if n_buckets <= done:
+                # No new bucket here, so none on the next levels
+                return
+            if level == 0:
+                indices = np.arange(
+                    done * self.factor, n_buckets * self.factor
+                ).reshape(-1, self.factor)
+                mins = maxs = indices
+            else:
+                below = self._levels[level - 1][
+                    done * self.factor : n_buckets * self.factor
+                ]
+                mins = below[:, 0].reshape(-1, self.factor)
+                maxs = below[:, 1].reshape(-1, self.factor)
+            rows = np.arange(len(mins))
+            buckets = np.empty((len(mins), 2), int)
+            buckets[:, 0] = mins[rows, _extrema(y[mins])[0]]
+            buckets[:, 1] = maxs[rows, _extrema(y[maxs])[1]]
+            self._append(level, buckets)
+            level += 1
+
+    def _append(self, level: int, buckets: np.ndarray):
+        if level == len(self._levels):
+            self._levels.append(np.empty((max(len(buckets), 16), 2), int))
+            self._sizes.append(0)
+        size = self._sizes[level]
+        stop = size + len(buckets)
+        if stop > len(self._levels[level]):
+            # Double the capacity, so the values are rarely copied
+            buffer = np.empty(
+                (max(stop, 2 * len(self._levels[level])), 2), int
+            )
+            buffer[:size] = self._levels[level][:size]
+            self._levels[level] = buffer
+        self._levels[level][size:stop] = buckets
+        self._sizes[level] = stop
+
+    def truncate(self, length: int):
+        """Remove the buckets including values after length."""
+        if length >= self._length:
+            return
+        self._length = length
+        self._sizes = [
+            min(size, length // self.bucket_size(level))
+            for level, size in enumerate(self._sizes)
+        ]
+
+    def indices(
+        self, y: np.ndarray, n_buckets: int, start: int = 0, stop: int = None
+    ) -> np.ndarray:
+        """Return the indices of the values to plot, in increasing order.
+
+        At most the minimum and maximum of about n_buckets buckets
+        between start and stop are given.
+        """
+        stop = len(y) if stop is None else min(stop, len(y))
+        start = max(start, 0)
+        if stop - start <= 2 * n_buckets:
+            return np.arange(start, stop)
+        # Only updated when needed, adding more values at once
+        self.update(y)
+
+        # Smallest buckets giving not more than n_buckets
+        level = 0
+        while stop - start > n_buckets * self.bucket_size(
+            level
+        ) and level + 1 < len(self._sizes):
+            level += 1
+        size = self.bucket_size(level)
+        first = -(-start // size)
+        last = stop // size
+
+        if first > last or not self._sizes:
+            # All in one bucket
+            pieces = [self._raw_extrema(y, start, stop)]
+        else:
+            pieces = [
+                self._raw_extrema(y, start, first * size),
+                self._levels[level][first:last],
+                self._raw_extrema(y, last * size, stop),
+            ]
+        # The buckets are in order, only the min and max can be swapped
+        indices = np.sort(np.concatenate(pieces), axis=1).ravel()
+        return indices[np.diff(indices, prepend=-1) > 0]
+
+    @staticmethod
+    def _raw_extrema(y: np.ndarray, start: int, stop: int) -> np.ndarray:
+        if start >= stop:
+            return np.empty((0, 2), int)
+        arg_min, arg_max = _extrema(y[None, start:stop])
+        return np.array([[arg_min[0], arg_max[0]]]) + start
+
+    def downsample(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        n_buckets: int,
+        start: int = 0,
+        stop: int = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the points of the line to plot.
+
+        :param x: The times of the values.
+        :param y: All the values of the series, including the ones
+            already added.
+        :param n_buckets: The number of buckets, usually the width of
+            the plot in pixels.
+        :param start: The first step to plot.
+        :param stop: The step after the last step to plot.
+        """
+        indices = self.indices(y, n_buckets, start, stop)
+        return x[indices], y[indices]
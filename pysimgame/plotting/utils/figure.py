@@ -0,0 +1,235 @@
+"""Matplotlib figure of a line plot, updated at each step.
+
+The lines are created once and their data is replaced at each
+render. The static parts of the figure (axes, ticks, legend) are
+drawn only when the limits change, otherwise they are restored from a
+background and only the lines are drawn over it.
+The lines are given at most two points per pixel of the axes
+(see :py:class:`MinMaxPyramid`).
+
+The figure only reads the history given to :py:meth:`LinePlotFigure.render`
+so it can be rendered in the game process or in a worker process.
+"""
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, List, Protocol, Tuple
+
+import numpy as np
+import pygame
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+
+from .agg import AggFigureSurface
+from .downsampling import MinMaxPyramid
+from .limits import GrowingLimits
+
+if TYPE_CHECKING:
+    import matplotlib.axes
+
+    from pysimgame.types import AttributeName, RegionName
+
+    from ..plot import PlotLine
+
+
+class PlottedHistory(Protocol):
+    """What the figure reads from the history of the model."""
+
+    time_axis: np.ndarray
+
+    def __getitem__(
+        self, key: Tuple[RegionName, AttributeName]
+    ) -> np.ndarray: ...
+
+
+class LinePlotFigure:
+    """The figure of the lines of a :py:class:`LinePlot` .
+
+    :param plot_lines: The lines plotted. The lines not sharing the
+        y axis are plotted on a twin axis.
+    """
+
+    plot_lines: List[PlotLine]
+    figure_surface: AggFigureSurface
+    axes: List[matplotlib.axes.Axes]
+    # Artists of each plot line
+    lines: List[List[Line2D]]
+    # Index of the axes of each plot line
+    _lines_axes: List[int]
+    # Plot lines drawn on each axes
+    _axes_lines: List[List[PlotLine]]
+    # Downsampling of the data of each line
+    pyramids: List[List[MinMaxPyramid]]
+    # Held while the figure is drawn, reentrant as the windows resized
+    # while drawn on the main thread render the figure again
+    lock: threading.RLock
+    # Static parts of the figure, restored before drawing the lines
+    _background: object | None
+    _x_limits: GrowingLimits
+    _y_limits: List[GrowingLimits]
+    # Number of steps already included in the limits
+    _n_points: int
+    # Last history rendered, to render again after a resize
+    _history: PlottedHistory | None
+
+    def __init__(self, plot_lines: List[PlotLine]) -> None:
+        self.plot_lines = plot_lines
+        figure = Figure()
+        ax = figure.subplots(1, 1)
+        self.figure_surface = AggFigureSurface(figure)
+        # The first ax is automatically the first line
+        self.axes = [ax]
+        for plot_line in plot_lines[1:]:
+            # If other plot lines have different y values
+            if not plot_line.share_y:
+                self.axes.append(ax.twinx())
+        self.lines = []
+        self.pyramids = []
+        self.lock = threading.RLock()
+        self._background = None
+        self._x_limits = GrowingLimits()
+        self._y_limits = [GrowingLimits() for _ in self.axes]
+        self._n_points = 0
+        self._history = None
+        self._create_lines()
+
+    @property
+    def figure(self) -> Figure:
+        return self.figure_surface.figure
+
+    @property
+    def surface(self) -> pygame.Surface:
+        """The pixels of the figure, since its last render."""
+        return self.figure_surface.surface
+
+    def _create_lines(self):
+        """Create the artists of the lines, updated at each render."""
+        self._lines_axes = []
+        self._axes_lines = [[] for _ in self.axes]
+        ax_index = int(0)
+        for plot_line in self.plot_lines:
+            ax = self.axes[ax_index]
+            self._lines_axes.append(ax_index)
+            self._axes_lines[ax_index].append(plot_line)
+            ax_index += 0 if plot_line.share_y else 1
+            n_lines = (
+                1
+                if isinstance(plot_line.attribute, str)
+                else len(plot_line.attribute)
+            )
+            if "label" not in plot_line.kwargs:
+                plot_line.kwargs["label"] = plot_line.attribute or " ".join(
+                    (plot_line.region, plot_line.attribute)
+                )
+            lines = ax.plot(
+                np.empty((0, n_lines)),
+                np.empty((0, n_lines)),
+                **plot_line.kwargs,
+            )
+            for line in lines:
+                # Not drawn with the background
+                line.set_animated(True)
+            self.lines.append(lines)
+            self.pyramids.append([MinMaxPyramid() for _ in lines])
+        for ax in self.axes:
+            ax.legend()
+
+    def set_bounding_rect(self, rect: pygame.Rect):
+        """Resize the figure to the rectangle and render it again."""
+        with self.lock:
+            self.figure_surface.set_bounding_rect(rect)
+            self._background = None
+            if self._history is not None:
+                self.render(self._history)
+
+    def truncate(self, length: int):
+        """Forget the steps after length, the history was rewound.
+
+        Needed only when the history can be rewound and grown again
+        between two renders, which the figure cannot detect.
+        """
+        if length < self._n_points:
+            # The limits must include only the steps kept
+            self._n_points = 0
+        for pyramids in self.pyramids:
+            for pyramid in pyramids:
+                pyramid.truncate(length)
+
+    def render(self, history: PlottedHistory) -> bool:
+        """Draw the lines of the history on the figure.
+
+        :return: False if the history has not enough steps to draw
+            lines, in which case the figure is not drawn.
+        """
+        x = history.time_axis
+        if len(x) < 2:
+            # Cannot plot lines if only one point
+            return False
+        with self.lock:
+            self._history = history
+            self._render(history, x)
+        return True
+
+    def _render(self, history: PlottedHistory, x: np.ndarray):
+        n_points = self._n_points
+        if n_points > len(x):
+            # Rewound, the limits must include only the steps kept
+            n_points = 0
+        # Full redraw the first time and when the limits change
+        redraw = n_points == 0 or self._background is None
+        if n_points == 0:
+            self._x_limits.reset()
+            for limits in self._y_limits:
+                limits.reset()
+        redraw |= self._x_limits.update(x[n_points:])
+
+        for plot_line, lines, pyramids, ax_index in zip(
+            self.plot_lines, self.lines, self.pyramids, self._lines_axes
+        ):
+            limits = self._y_limits[ax_index]
+            attributes = (
+                [plot_line.attribute]
+                if isinstance(plot_line.attribute, str)
+                else plot_line.attribute
+            )
+            for line, pyramid, attribute in zip(lines, pyramids, attributes):
+                # Views on the history, nothing is copied
+                y = history[plot_line.region, attribute][: len(x)]
+                line.set_data(
+                    *pyramid.downsample(x, y, int(line.axes.bbox.width))
+                )
+                if plot_line.y_lims is None:
+                    redraw |= limits.update(y[n_points:])
+        self._n_points = len(x)
+
+        if redraw:
+            for ax, limits, plot_lines in zip(
+                self.axes, self._y_limits, self._axes_lines
+            ):
+                ax.set_xlim(x[0], self._x_limits.high)
+                # Limits given by a line drawn on the axes
+                y_lims = next(
+                    (p.y_lims for p in plot_lines if p.y_lims is not None),
+                    None,
+                )
+                if y_lims is not None:
+                    ax.set_ylim(y_lims)
+                elif limits.low is not None:
+                    ax.set_ylim(*limits.limits)
+        self._draw_lines(redraw)
+
+    def _draw_lines(self, redraw: bool):
+        """Draw the lines on the figure.
+
+        :param redraw: Whether to draw the background again.
+        """
+        figure = self.figure
+        canvas = figure.canvas
+        if redraw:
+            canvas.draw()
+            self._background = canvas.copy_from_bbox(figure.bbox)
+        else:
+            canvas.restore_region(self._background)
+        for lines in self.lines:
+            for line in lines:
+                line.axes.draw_artist(line)
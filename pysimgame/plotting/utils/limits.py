@@ -0,0 +1,61 @@
+"""Limits of the plots axis, updated with the new values only."""
+from __future__ import annotations
+
+import numpy as np
+
+
+class GrowingLimits:
+    """Limits of an axis that grow with the values plotted.
+
+    When new values are out of the limits, the limits are extended
+    with a margin, so that they change only a few times while the
+    values are added and the static parts of the plot (axis, ticks)
+    can be reused between the updates.
+
+    :param margin: Fraction of the range added to the side extended.
+    """
+
+    low: float | None
+    high: float | None
+
+    def __init__(self, margin: float = 0.25) -> None:
+        self.margin = margin
+        self.reset()
+
+    def reset(self):
+        """Forget the values seen."""
+        self.low = None
+        self.high = None
+
+    @property
+    def limits(self) -> tuple[float, float]:
+        return self.low, self.high
+
+    def update(self, values: np.ndarray) -> bool:
+        """Include the new values in the limits.
+
+        :return: Whether the limits changed.
+        """
+        if values.size == 0:
+            return False
+        low, high = float(values.min()), float(values.max())
+        if np.isnan(low):
+            # Slower, only with missing values
+            if np.all(np.isnan(values)):
+                return False
+            low, high = float(np.nanmin(values)), float(np.nanmax(values))
+        if self.low is not None and self.low <= low and high <= self.high:
+            return False
+
+        if self.low is not None:
+            low, high = min(low, self.low), max(high, self.high)
+        span = high - low
+        if span == 0:
+            # Avoid an empty range with constant values
+            span = abs(high) or 1.0
+        if self.low is None or low < self.low:
+            low -= self.margin * span
+        if self.high is None or high > self.high:
+            high += self.margin * span
+        self.low, self.high = low, high
+        return True
@@ -0,0 +1,170 @@
+"""Profiling of the components of the pysd models.
+
+The functions of the components are evaluated through the namespace of
+the model, where they call each other.
+:py:class:`ComponentProfiler` replaces them in the namespace by
+wrappers recording the number of calls and the time spent, and
+restores the original functions when detached.
+Nothing is changed in the models when the profiler is not attached.
+"""
+from __future__ import annotations
+
+import functools
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    import pysd
+
+    from pysimgame.types import RegionName
+
+
+class ComponentProfiler:
+    """Record the time spent in the components of pysd models.
+
+    For each region and component, it records:
+
+        * calls: The number of calls, including the ones returning the
+            cached value.
+        * total_time: The time spent in the component, including the
+            other components it calls [s].
+        * own_time: The time spent in the component only [s].
+    """
+
+    # [calls, total_time, own_time] of each (region, component)
+    _stats: Dict[tuple[RegionName, str], list]
+    # Namespace and original functions of the components wrapped
+    _originals: Dict[RegionName, tuple[dict, Dict[str, Callable]]]
+    # Components of the models, whose setter is replaced
+    _components: Dict[RegionName, pysd.py_backend.components.Components]
+    # Time spent in the components called by the ones being evaluated
+    _children_times: List[float]
+
+    def __init__(self) -> None:
+        self._stats = {}
+        self._originals = {}
+        self._components = {}
+        self._children_times = []
+
+    def attach(self, region: RegionName, model: pysd.statefuls.Model):
+        """Profile the components of the model of a region.
+
+        Components set later in the model (ex. by links or policies)
+        are also profiled.
+        """
+        components = model.components
+        namespace = vars(components._components)
+        originals = {}
+        self._originals[region] = (namespace, originals)
+        for name in set(components._namespace.values()):
+            func = namespace.get(name)
+            if callable(func):
+                namespace[name] = self._wrap(region, name, func, model)
+                originals[name] = func
+
+        set_component = components._set_component
+
+        def _set_profiled_component(name: str, value: Callable):
+            if getattr(value, "profiler", None) is self:
+                # Restoring a component that was profiled
+                value = value.__wrapped__
+            originals[name] = value
+            set_component(name, self._wrap(region, name, value, model))
+
+        # Only replaced on this instance
+        object.__setattr__(
+            components, "_set_component", _set_profiled_component
+        )
+        self._components[region] = components
+
+    def detach(self):
+        """Restore the original components of the models."""
+        for namespace, originals in self._originals.values():
+            for name, func in originals.items():
+                if getattr(namespace.get(name), "__wrapped__", None) is func:
+                    namespace[name] = func
+        for components in self._components.values():
+            object.__delattr__(components, "_set_component")
+        self._originals = {}
+        self._components = {}
+
+    def _wrap(
+        self,
+        region: RegionName,
+        name: str,
+        func: Callable,
+        model: pysd.statefuls.Model,
+    ) -> Callable:
+        stats = self._stats.setdefault((region, name), [0, 0.0, 0.0])
+        children_times = self._children_times
+        perf_counter = time.perf_counter
+
+        @functools.wraps(func)
+        def profiled(*args, **kwargs):
+            children_times.append(0.0)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = perf_counter() - start
+                stats[0] += 1
+                stats[1] += duration
+                stats[2] += duration - children_times.pop()
+                if children_times:
+                    children_times[-1] += duration
+
+        # pysd reads the arguments of the components
+        profiled.args = model.get_args(func)
+        profiled.profiler = self
+        return profiled
+
+    def clear(self):
+        """Reset the statistics recorded."""
+        for stats in self._stats.values():
+            stats[:] = [0, 0.0, 0.0]
+
+    def to_dataframe(self, by_region: bool = True) -> pd.DataFrame:
+        """Return the statistics, sorted by decreasing own time.
+
+        :param by_region: If False, sum the statistics of all the
+            regions for each component.
+        """
+        df = pd.DataFrame(
+            [
+                (region, name, *stats)
+                for (region, name), stats in self._stats.items()
+                if stats[0]
+            ],
+            columns=[
+                "region",
+                "component",
+                "calls",
+                "total_time",
+                "own_time",
+            ],
+        )
+        if not by_region:
+            df = df.drop(columns="region").groupby("component").sum()
+            df = df.reset_index()
+        return df.sort_values("own_time", ascending=False, ignore_index=True)
+
+    def report(self, by_region: bool = True, limit: int = None) -> str:
+        """Return a table of the statistics, most expensive first.
+
+        :param limit: The maximum number of rows.
+        """
+        df = self.to_dataframe(by_region)
+        if limit is not None:
+            df = df.head(limit)
+        return df.to_string(index=False, float_format="{:.6f}".format)
+
+    def save(self, file: Path, by_region: bool = True):
+        """Save the statistics to a .csv or .json file."""
+        df = self.to_dataframe(by_region)
+        if Path(file).suffix == ".json":
+            df.to_json(file, orient="records", indent=2)
+        else:
+            df.to_csv(file, index=False)
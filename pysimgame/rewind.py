@@ -0,0 +1,143 @@
+"""Timeline of the states of a model, for rewinding it.
+
+The states of all the regions at a step are stored as a float64 array
+of shape (region, value).
+Every ``keyframe_interval`` steps the full array is stored (keyframe).
+Other steps only store the values that changed since the previous
+step (delta), as the xor of their bits, so that restoring is exact.
+
+To keep the memory bounded on long runs:
+
+    * Only the last ``delta_segments`` keyframes keep their deltas.
+        Older steps can only be restored at the keyframes.
+    * At most ``max_keyframes`` keyframes are kept, the oldest are
+        removed.
+"""
+from __future__ import annotations
+
+import bisect
+from typing import Dict, List
+
+import numpy as np
+
+
+class StateTimeline:
+    """Record the states of a model at each step to restore them later.
+
+    :param keyframe_interval: Number of steps between two keyframes.
+    :param max_keyframes: Maximum number of keyframes kept.
+    :param delta_segments: Number of recent keyframes for which the
+        deltas of the following steps are kept.
+    """
+
+    keyframe_interval: int
+    max_keyframes: int
+    delta_segments: int
+
+    _keyframes: Dict[int, np.ndarray]
+    # Sorted steps of the keyframes
+    _keyframe_steps: List[int]
+    # Flat indices and xor of the values that changed at each step
+    _deltas: Dict[int, tuple[np.ndarray, np.ndarray]]
+    # Bits of the last state recorded
+    _last: np.ndarray
+    _last_step: int
+
+    def __init__(
+        self,
+        keyframe_interval: int = 100,
+        max_keyframes: int = 100,
+        delta_segments: int = 10,
+    ) -> None:
+        self.keyframe_interval = keyframe_interval
+        self.max_keyframes = max_keyframes
+        self.delta_segments = delta_segments
+        self.clear()
+
+    def __contains__(self, step: int) -> bool:
+        """Whether the state at that step can be restored."""
+        return step in self._keyframes or step in self._deltas
+
+    def __len__(self) -> int:
+        """Number of steps that can be restored."""
+        return len(self._keyframes) + len(self._deltas)
+
+    @property
+    def last_step(self) -> int:
+        return self._last_step
+
+    def clear(self):
+        """Remove all the states recorded."""
+        self._keyframes = {}
+        self._keyframe_steps = []
+        self._deltas = {}
+        self._last = None
+        self._last_step = None
+
+    def steps(self) -> List[int]:
+        """Return the steps that can be restored."""
+        return sorted([*self._keyframes, *self._deltas])
+
+    def record(self, step: int, states: np.ndarray):
+        """Record the states of a step.
+
+        :param step: Must follow the last step recorded, except for the
+            first step recorded.
+        :param states: Array of shape (region, value).
+        """
+        bits = np.array(states, dtype=np.float64).view(np.uint64)
+        if self._last is not None and step != self._last_step + 1:
+            raise ValueError(
+                f"Cannot record step {step} after step {self._last_step}."
+            )
+        if self._last is None or step % self.keyframe_interval == 0:
+            self._add_keyframe(step, bits)
+        else:
+            changed = np.ravel(bits ^ self._last)
+            indices = np.flatnonzero(changed)
+            self._deltas[step] = (indices, changed[indices])
+        self._last = bits
+        self._last_step = step
+
+    def _add_keyframe(self, step: int, bits: np.ndarray):
+        self._keyframes[step] = bits
+        self._keyframe_steps.append(step)
+        # The current segment always keeps its deltas
+        segments = max(self.delta_segments, 1)
+        if len(self._keyframe_steps) >= segments:
+            # Old segments only keep their keyframe
+            limit = self._keyframe_steps[-segments]
+            for delta_step in [s for s in self._deltas if s < limit]:
+                del self._deltas[delta_step]
+        while len(self._keyframe_steps) > self.max_keyframes:
+            del self._keyframes[self._keyframe_steps.pop(0)]
+            oldest = self._keyframe_steps[0]
+            for delta_step in [s for s in self._deltas if s < oldest]:
+                del self._deltas[delta_step]
+
+    def get(self, step: int) -> np.ndarray:
+        """Return the states of a step, as an array (region, value)."""
+        if step not in self:
+            raise KeyError(f"Step {step} is not in the timeline.")
+        position = bisect.bisect_right(self._keyframe_steps, step) - 1
+        keyframe_step = self._keyframe_steps[position]
+        bits = self._keyframes[keyframe_step].copy()
+        flat_bits = bits.reshape(-1)
+        for delta_step in range(keyframe_step + 1, step + 1):
+            indices, changed = self._deltas[delta_step]
+            flat_bits[indices] ^= changed
+        return bits.view(np.float64)
+
+    def truncate(self, step: int):
+        """Remove the steps after the given step.
+
+        The next step recorded must then be step + 1.
+        """
+        states = self.get(step)
+        for keyframe_step in [s for s in self._keyframe_steps if s > step]:
+            del self._keyframes[keyframe_step]
+            self._keyframe_steps.remove(keyframe_step)
+        for delta_step in [s for s in self._deltas if s > step]:
+            del self._deltas[delta_step]
+        self._last = states.view(np.uint64)
+        self._last_step = step
@@ -1,3 +1,4 @@
+import math
 from typing import Dict, List, Tuple
 
 import pygame
@@ -64,14 +65,15 @@ class SpeedManager(GameComponentManager):
 
         self.speed_label = UILabel(
             relative_rect=self.settings["text_rect"],
-            text=f"{self.speed} X",
+            text=self._speed_text(),
             manager=self.ui_manager,
             container=self.container,
         )
 
     def prepare(self):
         self.settings = {
-            "available_speeds": [1 / 4, 1 / 2, 1, 2, 4, 10],
+            # inf runs the model as fast as possible
+            "available_speeds": [1 / 4, 1 / 2, 1, 2, 4, 10, math.inf],
             "container_rect": pygame.Rect(-1, 500, 200, 50),
             "play_rect": pygame.Rect(0, 0, 50, 50),
             "faster_rect": pygame.Rect(175, 0, 25, 25),
@@ -87,6 +89,9 @@ class SpeedManager(GameComponentManager):
         self.MODEL_MANAGER = self.GAME_MANAGER.MODEL_MANAGER
         self._base_fps = self.MODEL_MANAGER.fps
 
+    def _speed_text(self) -> str:
+        return "Max" if math.isinf(self.speed) else f"{self.speed} X"
+
     def increase_speed(self):
         """Increase the speed.
 
@@ -136,7 +141,7 @@ class SpeedManager(GameComponentManager):
                 self.decrease_speed()
 
             case EventType(type=pysimgame.events.SpeedChanged):
-                self.speed_label.set_text(f"{self.speed} X")
+                self.speed_label.set_text(self._speed_text())
             case EventType(
                 type=pygame_gui.UI_BUTTON_PRESSED,
                 ui_element=self.play_button,
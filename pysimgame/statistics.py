@@ -87,6 +87,7 @@ class StatisticsDisplayManager(GameComponentManager):
     def hide(self):
         self.CONTAINER.hide()
         self._hidden = True
+        self.MODEL_MANAGER.unsubscribe(self)
 
     def show(self):
         self.CONTAINER.show()
@@ -129,16 +130,30 @@ class StatisticsDisplayManager(GameComponentManager):
         self.CONTAINER.add_row(button, value_label)
 
     def _update_stats(self) -> None:
-        # Get the model of the current region
+        # Get the region currently selected
         if self.GAME.SINGLE_REGION:
-            model = self.MODEL_MANAGER._model
+            region = list(self.GAME.REGIONS_DICT)[-1]
         else:
             self.logger.debug(
                 f"Updating for region {self.drop_down.selected_option}"
             )
-            model = self.MODEL_MANAGER.models[self.drop_down.selected_option]
-        for element, label in self.labels.items():
-            label.set_text("{:1.3f}".format(model[element]))
+            region = self.drop_down.selected_option
+        if self._hidden:
+            return
+        # Only the rows visible in the scrolling container are captured
+        visible_rect = self.CONTAINER.get_abs_rect()
+        visible = [
+            element
+            for element, label in self.labels.items()
+            if label.get_abs_rect().colliderect(visible_rect)
+        ]
+        self.MODEL_MANAGER.subscribe(self, visible)
+        # Read the last values saved instead of evaluating the model
+        history = self.MODEL_MANAGER.snapshot
+        values = history.latest(region)
+        for element in visible:
+            value = values[history.attribute_index(element)]
+            self.labels[element].set_text("{:1.3f}".format(value))
 
     def process_events(self, event: pygame.event.Event) -> bool:
         self.UI_MANAGER.process_events(event)
@@ -152,7 +167,10 @@ class StatisticsDisplayManager(GameComponentManager):
                     self.drop_down.selected_option = region.name
                     self.logger.debug(f"Updating for  {event=}")
                     self._update_stats()
-            case EventType(type=pysimgame.events.ModelStepped):
+            case EventType(
+                type=pysimgame.events.ModelStepped
+                | pysimgame.events.ModelRewound
+            ):
                 self._update_stats()
             case EventType(
                 type=pygame_gui.UI_DROP_DOWN_MENU_CHANGED,
@@ -4,6 +4,9 @@
 from typing import TYPE_CHECKING, Callable, Dict, List, Tuple, TypeVar, Union
 
 if TYPE_CHECKING:
+    import numpy as np
+    from scipy import sparse
+
     from pysimgame.model import Policy
     from pysimgame.regions_display import RegionComponent
 
@@ -30,3 +33,9 @@ if TYPE_CHECKING:
         ],  # Union[[str, str, ModelsDict], [ModelsDict]]
         Tuple[Dict[RegionName, float], Dict[RegionName, float]],
     ]
+
+    # Matrix of shape (region, region), or a function of the time
+    # returning it
+    FlowMatrix = Union[
+        sparse.spmatrix, np.ndarray, Callable[[float], sparse.spmatrix]
+    ]
@@ -4,16 +4,20 @@ Help to solve some dependency issues with some managers.
 """
 from __future__ import annotations
 import logging
+import tempfile
+import time
+import zipfile
 from pathlib import Path
-from typing import TYPE_CHECKING, Type
+from threading import Thread
+from typing import TYPE_CHECKING, Any, Type
 from abc import ABC, abstractmethod
 
-from pygame_gui.ui_manager import UIManager
+import pygame
 
 from pysimgame.utils import register_logger
 
 if TYPE_CHECKING:
-    import pygame
+    from pygame_gui.ui_manager import UIManager
     from pysimgame.game import Game
     from pysimgame.actions.actions import ActionsManager
     from pysimgame.menu import MenuOverlayManager
@@ -118,6 +122,26 @@ class GameComponentManager(ABC):
         """
         pass
 
+    def copy_save_content(self) -> Any:
+        """Copy in memory the content saved when the user saves game.
+
+        Called while the model is locked, so that the content saved by
+        all the managers is from the same step. Only copy the content
+        here, the files are written by :py:meth:`save_content` once
+        the model is unlocked.
+
+        :return: The copied content, or None to be saved with
+            :py:meth:`save` instead.
+        """
+        return None
+
+    def save_content(self, content: Any, save_dir: Path):
+        """Save the content copied in the specified save dir.
+
+        See :py:meth:`copy_save_content` .
+        """
+        pass
+
     def load(self, save_dir: Path):
         """Load component content when the users loads game.
 
@@ -167,3 +191,84 @@ class AbstractGameManager(GameComponentManager):
         if _GAME_MANAGER is None:
             _GAME_MANAGER = self
         self.MANAGERS = {}
+
+    def save(self, save_file: Path) -> Thread:
+        """Save the game in a file, on a background thread.
+
+        The content of the component managers is copied while the model
+        is locked, then each of them saves its copy in a directory,
+        which is compressed in the save file.
+
+        :return: The thread saving the game, can be joined to wait.
+        """
+        thread = Thread(
+            target=self._save, args=(Path(save_file),), name="SaveThread"
+        )
+        thread.start()
+        return thread
+
+    def _save(self, save_file: Path):
+        start_time = time.perf_counter()
+        with self.MODEL_MANAGER.model_lock:
+            contents = [
+                (manager, manager.copy_save_content())
+                for manager in self.MANAGERS.values()
+            ]
+        with tempfile.TemporaryDirectory() as save_dir:
+            for manager, content in contents:
+                if content is None:
+                    manager.save(Path(save_dir))
+                else:
+                    manager.save_content(content, Path(save_dir))
+            with zipfile.ZipFile(
+                save_file, "w", zipfile.ZIP_DEFLATED, compresslevel=1
+            ) as archive:
+                for file in Path(save_dir).iterdir():
+                    archive.write(file, file.name)
+        self.logger.info(
+            "Saved game in {} ({:.3f} sec).".format(
+                save_file, time.perf_counter() - start_time
+            )
+        )
+
+    def load(self, save_file: Path):
+        """Load a game from a file created by :py:meth:`save` .
+
+        The component managers must be prepared and connected.
+        """
+        start_time = time.perf_counter()
+        with tempfile.TemporaryDirectory() as save_dir:
+            with zipfile.ZipFile(save_file) as archive:
+                archive.extractall(save_dir)
+            for manager in self.MANAGERS.values():
+                manager.load(Path(save_dir))
+        self.logger.info(
+            "Loaded game from {} ({:.3f} sec).".format(
+                save_file, time.perf_counter() - start_time
+            )
+        )
+
+    def _resolve_manager_class(
+        self, manager_class: Type[GameComponentManager]
+    ) -> Type[GameComponentManager]:
+        """Return the class that should be used for the manager.
+
+        The game settings can replace the model manager by a specialised
+        one using the "ModelManager" key, and the plots manager using the
+        "PlotsManager" key.
+        The managers are still registered under the class of
+        :py:attr:`_manager_classes` .
+        """
+        from pysimgame.model import ModelManager, model_manager_class
+        from pysimgame.plotting.base import plots_manager_class
+        from pysimgame.plotting.pyside.manager import QtPlotManager
+
+        if manager_class is ModelManager:
+            return model_manager_class(
+                self.game.SETTINGS.get("ModelManager", "pysd")
+            )
+        if manager_class is QtPlotManager:
+            return plots_manager_class(
+                self.game.SETTINGS.get("PlotsManager", "qt")
+            )
+        return manager_class
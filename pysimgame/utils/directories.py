@@ -19,6 +19,14 @@ DEFAULT_THEMES_DIR = os.path.join(*pysimgame.__path__, "themes")
 
 SETTINGS_DIR = os.path.join(PYSDGAME_DIR, "settings")
 
+# Models translated by pysd, can be shared (ex. in CI) with the env var
+TRANSLATIONS_DIR = pathlib.Path(
+    os.environ.get(
+        "PYSIMGAME_TRANSLATIONS_DIR",
+        pathlib.Path(PYSDGAME_DIR, "translations"),
+    )
+)
+
 TEST_DIR = pathlib.Path(*pysimgame.__path__, "..", "tests")
 EXAMPLES_DIR = pathlib.Path(*pysimgame.__path__, "..", "examples")
 
@@ -36,6 +44,8 @@ INITIAL_CONDITIONS_FILENAME = "initial_conditions.json"
 BACKGROUND_DIR_NAME = "backgrounds"
 ORIGINAL_BACKGROUND_FILESTEM = "orginal"
 GAME_SETTINGS_FILENAME = "settings.json"
+# Parsed documentation of the model, see ModelManager.doc
+DOC_CACHE_FILENAME = "model_doc.json"
 
 FORBIDDEN_GAME_NAMES = [
     "settings",
@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
 
 from pysimgame.game import FakeGame
+from pysimgame.history import HistoryStore
 from pysimgame.model import AbstractModelManager
 from pysimgame.utils.abstract_managers import AbstractGameManager
 
@@ -11,7 +13,11 @@ class FakeModelManager(AbstractModelManager):
     data = pd.DataFrame({
         ('a', 'b'): [1, 2, 3]
     })
-    
+    history = HistoryStore(["a"], ["b"])
+    for i, value in enumerate([1, 2, 3]):
+        history.append(i, np.array([[value]]))
+    snapshot = history.snapshot()
+
 
     def connect(self):
         pass
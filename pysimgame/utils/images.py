@@ -1,11 +1,13 @@
 from pathlib import Path
 from typing import Tuple
-from skimage.transform import resize
-from skimage.io import imread, imsave
 
 
 def resize_image(source: Path, dest: Path, dimensions: Tuple[int, int]):
     """Resize the source image and save it in dest."""
+    # skimage is slow to import and only needed for resizing
+    from skimage.io import imread, imsave
+    from skimage.transform import resize
+
     x, y = dimensions
     # Size is inverted
     img = imread(source)
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import configparser
 import functools
 import importlib.util
@@ -5,12 +7,13 @@ import json
 import logging
 import logging.config
 from pathlib import Path
-from typing import Callable
+from typing import TYPE_CHECKING, Callable
 
 import pygame
 import pysimgame
-from pygame_gui.ui_manager import UIManager
-from pygame_gui.windows import UIMessageWindow
+
+if TYPE_CHECKING:
+    from pygame_gui.ui_manager import UIManager
 
 from .directories import PYSDGAME_DIR
 from .pysimgame_settings import PYSDGAME_SETTINGS
@@ -161,6 +164,8 @@ class PopUpHandler(logging.Handler):
             )
 
     def emit(self, record: logging.LogRecord) -> None:
+        from pygame_gui.windows import UIMessageWindow
+
         window = UIMessageWindow(
             self.rect,
             html_message=record.msg,
@@ -1,4 +1,8 @@
 """General utility functions that don't belong to a specific module."""
+from __future__ import annotations
+
+import hashlib
+import os
 
 
 def recursive_dict_missing_values(dic_from: dict, dic_to: dict) -> dict:
@@ -16,3 +20,18 @@ def recursive_dict_missing_values(dic_from: dict, dic_to: dict) -> dict:
         else:
             pass
     return dic_to
+
+
+def file_hash(*files: str | os.PathLike, extra: str = "") -> str:
+    """Return the sha256 hash of the content of the files.
+
+    :param extra: A string also included in the hash, for example
+        the version of the tool that reads the files.
+    """
+    digest = hashlib.sha256()
+    for file in files:
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    digest.update(extra.encode())
+    return digest.hexdigest()
@@ -0,0 +1,142 @@
+"""Create copies of a loaded pysd model.
+
+:py:func:`pysd.load` imports the python file of the model each time it
+is called, which executes again all the module and initializes the
+model. When many regions run the same model, we load it once and
+fork it for each region:
+
+    * The code of the components is shared by all the regions.
+    * Each region gets its own namespace, stateful elements, time and
+        cache, so that changing a region does not change the others.
+"""
+from __future__ import annotations
+
+import copy
+from types import CellType, FunctionType, ModuleType
+from typing import TYPE_CHECKING, Any, Dict
+
+if TYPE_CHECKING:
+    import pysd
+
+
+class _Rebinder:
+    """Rebind the functions of a namespace to a new namespace."""
+
+    def __init__(self, old_namespace: dict, new_namespace: dict) -> None:
+        self.old_namespace = old_namespace
+        self.new_namespace = new_namespace
+        # Remember the objects already rebinded
+        self._memo: Dict[int, Any] = {}
+
+    def __call__(self, value: Any) -> Any:
+        """Return the value, rebinded to the new namespace if needed."""
+        if isinstance(value, FunctionType):
+            return self.function(value)
+        return value
+
+    def function(self, func: FunctionType) -> FunctionType:
+        if id(func) in self._memo:
+            return self._memo[id(func)]
+        closure = func.__closure__
+        if func.__globals__ is not self.old_namespace and not closure:
+            # Functions defined elsewhere are shared
+            return func
+        if closure is not None:
+            # Functions can be wrapped (ex. by decorators)
+            closure = tuple(
+                CellType(self(cell.cell_contents)) for cell in closure
+            )
+        new_func = FunctionType(
+            func.__code__,
+            (
+                self.new_namespace
+                if func.__globals__ is self.old_namespace
+                else func.__globals__
+            ),
+            func.__name__,
+            func.__defaults__,
+            closure,
+        )
+        new_func.__doc__ = func.__doc__
+        new_func.__qualname__ = func.__qualname__
+        new_func.__kwdefaults__ = func.__kwdefaults__
+        new_func.__dict__.update(func.__dict__)
+        self._memo[id(func)] = new_func
+        return new_func
+
+    def stateful(self, stateful: Any) -> Any:
+        """Copy a stateful element, rebinding its functions."""
+        new_stateful = copy.copy(stateful)
+        for name, value in vars(stateful).items():
+            if isinstance(value, FunctionType):
+                setattr(new_stateful, name, self.function(value))
+        self._memo[id(stateful)] = new_stateful
+        return new_stateful
+
+
+def fork_model(model: pysd.statefuls.Model) -> pysd.statefuls.Model:
+    """Return a new model, independent of the one given.
+
+    The model given should not have been modified after loading it
+    (by setting components or running it).
+    The copy is initialized if the model was.
+
+    Models containing macros are loaded again from their file.
+    """
+    import pysd
+    from pysd.py_backend.components import Components, Time
+    from pysd.py_backend.statefuls import Cache, Stateful
+
+    if model._macro_elements:
+        # Macros are models inside the model, load the file instead
+        return pysd.load(
+            model.py_model_file,
+            data_files=model.data_files,
+            initialize=model.time.stage != "Load",
+            missing_values=model.missing_values,
+        )
+
+    old_namespace = vars(model.components._components)
+    # The functions use the dict of the module as globals
+    module = ModuleType(model.components._components.__name__)
+    new_namespace = vars(module)
+    rebinder = _Rebinder(old_namespace, new_namespace)
+    new_model = object.__new__(type(model))
+    new_model.__dict__.update(vars(model))
+    new_model.cache = Cache()
+
+    for name, value in old_namespace.items():
+        if name in model.cache.cached_funcs:
+            # Wrap the original function in the cache of the new model
+            value = new_model.cache(rebinder.function(value.__wrapped__))
+        elif isinstance(value, Stateful):
+            value = rebinder.stateful(value)
+        elif isinstance(value, dict):
+            # Dictionaries (dependencies, control vars, ...) can be changed
+            value = {key: rebinder(val) for key, val in value.items()}
+        else:
+            value = rebinder(value)
+        new_namespace[name] = value
+    new_model.cache.cached_funcs = set(model.cache.cached_funcs)
+
+    components = object.__new__(Components)
+    object.__setattr__(components, "_components", module)
+    object.__setattr__(
+        components, "_set_components", new_model.set_components
+    )
+    new_model.components = components
+
+    new_model._stateful_elements = {
+        name: new_namespace[name] for name in model._stateful_elements
+    }
+    new_model._dynamicstateful_elements = [
+        rebinder._memo[id(element)]
+        for element in model._dynamicstateful_elements
+    ]
+
+    new_model.time = Time()
+    new_model.time.set_control_vars(**components._control_vars)
+    new_model.time.stage = model.time.stage
+    if model.time.stage != "Load":
+        new_model.initialize()
+    return new_model
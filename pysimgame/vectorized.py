@@ -0,0 +1,391 @@
+"""Vectorized model manager.
+
+Instead of running one pysd model per region, a single pysd model is
+loaded and every stock, flow and constant holds a NumPy array with one
+value per region. A step of the model is then a single Euler update
+of these arrays, whatever the number of regions.
+
+The other managers still access the regions through
+:py:attr:`VectorizedModelManager.models`, which maps each region name
+to a :py:class:`RegionModel` view on its row of the arrays.
+
+.. note:: Only models without subscripts and without functions that
+    branch on scalar values (ex. IF THEN ELSE) can be vectorized.
+"""
+from __future__ import annotations
+
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, Dict, List
+
+import numpy as np
+
+from pysimgame.model import ModelManager
+
+if TYPE_CHECKING:
+    import pysd
+
+    from .types import AttributeName, ModelMethod, RegionName
+
+
+class ModelNotVectorizableError(Exception):
+    """A model cannot be run by the :py:class:`VectorizedModelManager`."""
+
+
+def _row(value: Any, index: int) -> Any:
+    """Return the value of a region from a (maybe scalar) value."""
+    if np.ndim(value) == 0:
+        return value
+    return value[index]
+
+
+class RegionComponents:
+    """The components of a region in a vectorized model.
+
+    Work like the pysd components of a model:
+    ``getattr(components, name)()`` returns the value of the region.
+    """
+
+    def __init__(self, region_model: RegionModel) -> None:
+        object.__setattr__(self, "_region_model", region_model)
+
+    def __getattr__(self, name: str) -> Any:
+        region_model: RegionModel = object.__getattribute__(
+            self, "_region_model"
+        )
+        return region_model.MANAGER._region_component(
+            name, region_model.index
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__getattribute__(self, "_region_model").set_components(
+            {name: value}
+        )
+
+    def __dir__(self) -> List[str]:
+        region_model: RegionModel = object.__getattribute__(
+            self, "_region_model"
+        )
+        return dir(region_model.MANAGER._vectorized_model.components)
+
+
+class RegionModel:
+    """View of a single region in a :py:class:`VectorizedModelManager`.
+
+    Provide the part of the pysd model API used by pysimgame.
+    """
+
+    MANAGER: VectorizedModelManager
+    name: RegionName
+    index: int
+    components: RegionComponents
+
+    def __init__(
+        self, manager: VectorizedModelManager, name: RegionName, index: int
+    ) -> None:
+        self.MANAGER = manager
+        self.name = name
+        self.index = index
+        self.components = RegionComponents(self)
+
+    def __repr__(self) -> str:
+        return f"RegionModel(name='{self.name}', index={self.index})"
+
+    @property
+    def time(self):
+        """The time object, shared by all the regions."""
+        return self.MANAGER._vectorized_model.time
+
+    @property
+    def cache(self):
+        """The cache, shared by all the regions."""
+        return self.MANAGER._vectorized_model.cache
+
+    def clean_caches(self):
+        self.MANAGER._clean_caches()
+
+    def doc(self):
+        return self.MANAGER._vectorized_model.doc()
+
+    def set_components(self, params: Dict[str, ModelMethod | float]):
+        """Set components only for this region."""
+        for name, value in params.items():
+            self.MANAGER._set_region_component(name, self.index, value)
+
+
+class VectorizedModelManager(ModelManager):
+    """Model manager running all the regions in one vectorized model.
+
+    Produce the same trajectories as :py:class:`ModelManager`, but the
+    cost of a step does not grow in python with the number of regions.
+
+    It is used when the game settings contain
+    ``"ModelManager": "vectorized"``.
+    """
+
+    models: Dict[RegionName, RegionModel]
+    _vectorized_model: pysd.statefuls.Model
+    _regions: List[RegionName]
+    # Original functions of the components that regions have overriden
+    _originals: Dict[str, Callable]
+    # Functions of the regions that override a component
+    _overrides: Dict[str, Dict[int, Callable]]
+    # Values computed during the current step
+    _values: Dict[str, np.ndarray]
+    _overridden_values: Dict[str, np.ndarray]
+
+    def _load_models(self):
+        import pysd
+
+        self._regions = list(self.GAME_MANAGER.game.REGIONS_DICT.keys())
+        self._originals = {}
+        self._overrides = {}
+        self._values = {}
+        self._overridden_values = {}
+
+        self._vectorized_model = model = pysd.load(
+            self.GAME_MANAGER.game.PYSD_MODEL_FILE
+        )
+        self._doc_cache = self._load_doc(model)
+        if model.components._subscript_dict:
+            raise ModelNotVectorizableError(
+                "Subscripted models cannot be vectorized."
+            )
+        self.logger.info(
+            "Created vectorized model for {} regions from file {}".format(
+                len(self._regions), self.GAME_MANAGER.game.PYSD_MODEL_FILE
+            )
+        )
+
+        if self._load_initial_conditions:
+            self._set_vectorized_initial_conditions(model)
+        else:
+            model.set_initial_condition("original")
+
+        model.time.stage = "Run"
+        model.cache.clean()
+
+        self.models = {
+            region: RegionModel(self, region, index)
+            for index, region in enumerate(self._regions)
+        }
+        # The last region is the 'shared' one, as in the ModelManager
+        self._model = self.models[self._regions[-1]]
+
+        self._check_vectorizable()
+
+    def _set_vectorized_initial_conditions(
+        self, model: pysd.statefuls.Model
+    ):
+        """Stack the initial conditions of all the regions."""
+        constants = set(self._constants)
+
+        # Start from the original values of the model
+        model.set_initial_condition("original")
+
+        conditions = [
+            self._load_initial_conditions.get(region, (None, {}))[1]
+            for region in self._regions
+        ]
+        time = self._load_initial_conditions.get(
+            self._regions[-1], (None, {})
+        )[0]
+        if time is None:
+            time = model.time()
+        variables = set().union(*[dic.keys() for dic in conditions])
+
+        # Constants are set as functions returning an array
+        for variable in variables & constants:
+            default = getattr(model.components, variable)()
+            values = np.array(
+                [dic.get(variable, default) for dic in conditions],
+                dtype=float,
+            )
+            model.set_components({variable: (lambda v: lambda: v)(values)})
+
+        # Initial values are given directly to the stateful elements
+        # as pysd does not accept arrays in set_initial_value
+        model.initialize()
+        model.time.set_control_vars(initial_time=time)
+        modified_statefuls = set()
+        for variable in variables - constants:
+            deps = list(model.components._dependencies[variable])
+            if len(deps) != 1 or deps[0] not in model.initialize_order:
+                self.logger.warning(
+                    f"Cannot set initial condition of {variable}."
+                )
+                continue
+            stateful = model._stateful_elements[deps[0]]
+            current = np.broadcast_to(
+                stateful.state, (len(self._regions),)
+            )
+            values = np.array(
+                [
+                    dic.get(variable, current[i])
+                    for i, dic in enumerate(conditions)
+                ],
+                dtype=float,
+            )
+            stateful.initialize(values)
+            modified_statefuls.add(deps[0])
+        model.clean_caches()
+        to_initialize = model._get_elements_to_initialize(modified_statefuls)
+        for element_name in model.initialize_order:
+            if element_name in to_initialize:
+                model._stateful_elements[element_name].initialize()
+
+    def _check_vectorizable(self):
+        """Evaluate the model once to check it accepts arrays."""
+        try:
+            self._vectorized_model.ddt()
+            for name in self.elements_names:
+                self._original_values(name)
+        except (ValueError, TypeError) as exp:
+            raise ModelNotVectorizableError(
+                f"{self.GAME.PYSD_MODEL_FILE} cannot be vectorized: {exp}"
+            ) from exp
+        finally:
+            self._clean_caches()
+
+    # region Components
+    def _original_values(self, name: str) -> np.ndarray:
+        """Return the values of a component, ignoring region overrides."""
+        try:
+            return self._values[name]
+        except KeyError:
+            function = self._originals.get(name)
+            if function is None:
+                function = getattr(self._vectorized_model.components, name)
+            value = np.broadcast_to(function(), (len(self._regions),))
+            self._values[name] = value
+            return value
+
+    def _evaluate(self, name: str) -> np.ndarray:
+        """Return the values of a component for all the regions."""
+        if name in self._overrides:
+            return getattr(self._vectorized_model.components, name)()
+        return self._original_values(name)
+
+    def _region_component(self, name: str, index: int) -> Any:
+        """Return the component of a region, as pysd components would."""
+        region_func = self._overrides.get(name, {}).get(index)
+        if region_func is not None:
+            return region_func
+
+        component = self._originals.get(name)
+        if component is None:
+            component = getattr(self._vectorized_model.components, name)
+        if not callable(component) or name.startswith("_"):
+            # Attributes like _namespace are shared
+            return component
+
+        @wraps(component)
+        def region_component(*args):
+            if args:
+                # Lookups and other functions with arguments
+                return _row(component(*args), index)
+            return self._original_values(name)[index]
+
+        # Remember what this is, to know when a region restores it
+        region_component._vectorized = (name, index)
+        return region_component
+
+    def _set_region_component(
+        self, name: str, index: int, value: ModelMethod | float
+    ):
+        """Override a component only for the region at index."""
+        if name not in self._originals:
+            self._originals[name] = getattr(
+                self._vectorized_model.components, name
+            )
+        overrides = self._overrides.setdefault(name, {})
+
+        if getattr(value, "_vectorized", None) == (name, index):
+            # The region restores its original method
+            overrides.pop(index, None)
+        elif callable(value):
+            overrides[index] = value
+        else:
+            overrides[index] = (lambda v: lambda: v)(value)
+
+        original = self._originals[name]
+        if not overrides:
+            # No region is overriding anymore
+            del self._originals[name]
+            del self._overrides[name]
+            new_function = original
+        else:
+
+            def new_function():
+                try:
+                    return self._overridden_values[name]
+                except KeyError:
+                    values = np.array(
+                        self._original_values(name), dtype=float
+                    )
+                    for i, func in overrides.items():
+                        values[i] = func()
+                    self._overridden_values[name] = values
+                    return values
+
+            new_function.__doc__ = original.__doc__
+
+        self._vectorized_model.set_components({name: new_function})
+        self._clean_caches()
+
+    def _clean_caches(self):
+        self._values = {}
+        self._overridden_values = {}
+        self._vectorized_model.clean_caches()
+
+    # endregion Components
+
+    def _profiled_models(self) -> Dict[str, pysd.statefuls.Model]:
+        # All the regions are computed together
+        return {"all": self._vectorized_model}
+
+    # region Run
+    def _step_models(self):
+        model = self._vectorized_model
+        model._euler_step(self.current_time - model.time())
+        model.time.update(self.current_time)
+        self._clean_caches()
+
+    def _get_states(self) -> Dict[RegionName, np.ndarray]:
+        state = self._vectorized_model.state
+        return {
+            region: np.array(
+                [_row(element, index) for element in state], dtype=object
+            )
+            for index, region in enumerate(self._regions)
+        }
+
+    def _states_array(self) -> np.ndarray:
+        # The stocks already have one value per region
+        state = [
+            np.broadcast_to(
+                np.asarray(element, dtype=float), (len(self._regions),)
+            )
+            for element in self._vectorized_model.state
+        ]
+        self._states_shapes = [() for _ in state]
+        if not state:
+            return np.empty((len(self._regions), 0))
+        return np.stack(state, axis=1)
+
+    def _set_states(self, states: Dict[RegionName, np.ndarray], time: float):
+        model = self._vectorized_model
+        # One array with the value of each region for each stock
+        model.state = [
+            np.array(values, dtype=float)
+            for values in zip(*(states[r] for r in self._regions))
+        ]
+        model.time.update(time)
+        self._clean_caches()
+
+    def _capture(self, attributes: List[AttributeName]) -> np.ndarray:
+        if not attributes:
+            return np.empty((len(self._regions), 0))
+        # One vectorized evaluation per attribute for all the regions
+        return np.stack([self._evaluate(key) for key in attributes], axis=1)
+
+    # endregion Run
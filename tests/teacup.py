@@ -0,0 +1,82 @@
+"""Helpers creating small games from the teacup example for the tests."""
+import json
+import os
+import shutil
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from pysimgame.game import Game
+from pysimgame.utils.abstract_managers import AbstractGameManager
+from pysimgame.utils.directories import (
+    EXAMPLES_DIR,
+    GAME_SETTINGS_FILENAME,
+    INITIAL_CONDITIONS_FILENAME,
+    REGIONS_FILE_NAME,
+)
+
+TEACUP_MDL = Path(EXAMPLES_DIR, "teacup", "Teacup.mdl")
+
+
+def create_teacup_game(
+    games_dir: Path,
+    temperatures: dict[str, float],
+    name: str = "teacup",
+    settings: dict | None = None,
+) -> Game:
+    """Create a teacup game with a region for each temperature given."""
+    import pysd
+
+    if settings is None:
+        settings = {}
+
+    game_dir = Path(games_dir, name)
+    game_dir.mkdir(parents=True)
+    model_file = Path(game_dir, "model.mdl")
+    shutil.copyfile(TEACUP_MDL, model_file)
+    pysd.read_vensim(str(model_file), initialize=False)
+
+    with open(Path(game_dir, REGIONS_FILE_NAME), "w") as f:
+        json.dump(
+            {
+                region: {
+                    "name": region,
+                    # A different color for each region
+                    "color": [i % 256, i // 256 % 256, i // 65536 % 256, 255],
+                    "polygons": [],
+                }
+                for i, region in enumerate(temperatures)
+            },
+            f,
+        )
+    with open(Path(game_dir, GAME_SETTINGS_FILENAME), "w") as f:
+        json.dump(settings, f)
+    with open(Path(game_dir, INITIAL_CONDITIONS_FILENAME), "w") as f:
+        json.dump(
+            {
+                "_time": 0,
+                **{
+                    region: {"teacup_temperature": temperature}
+                    for region, temperature in temperatures.items()
+                },
+            },
+            f,
+        )
+    return Game(name, game_dir=games_dir)
+
+
+class TestGameManager(AbstractGameManager):
+    """A game manager only holding a game, for testing managers."""
+
+    __test__ = False
+
+    def __init__(self, game: Game) -> None:
+        super().__init__()
+        self.GAME = self.game = game
+        self.PLOTS_MANAGER = None
+
+    def prepare(self):
+        pass
+
+    def connect(self):
+        pass
@@ -0,0 +1,137 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pygame
+
+import pysimgame
+from pysimgame.headless import HeadlessGameManager
+from teacup import create_teacup_game
+
+TEMPERATURES = {"a": 180.0, "b": 100.0}
+
+POLICY_FILE = """
+from pysimgame.actions.actions import Policy, change_constant
+
+Policy(
+    name="cold_room",
+    modifiers=[change_constant("room_temperature", 0)],
+)
+"""
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.games_dir = Path(self._tmp_dir.name)
+        self.save_file = Path(self.games_dir, "save.zip")
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def create_game(self, settings=None):
+        game = create_teacup_game(
+            self.games_dir, TEMPERATURES, name="teacup", settings=settings
+        )
+        actions_dir = Path(game.GAME_DIR, "actions")
+        actions_dir.mkdir()
+        with open(Path(actions_dir, "policies.py"), "w") as f:
+            f.write(POLICY_FILE)
+        return game
+
+    def start(self, game) -> HeadlessGameManager:
+        manager = HeadlessGameManager(game)
+        manager.prepare()
+        manager.connect()
+        return manager
+
+    def use_policy(self, manager: HeadlessGameManager, region: str):
+        policy = manager.ACTIONS_MANAGER.get_action(
+            ("user_actions", "policies", "cold_room")
+        )
+        policy.activate()
+        manager.MODEL_MANAGER.process_events(
+            pygame.event.Event(
+                pysimgame.ActionUsed,
+                {
+                    "action": policy,
+                    "region": manager.game.REGIONS_DICT[region],
+                },
+            )
+        )
+
+    def assert_restored(self, save_settings=None, load_settings=None):
+        if save_settings is None:
+            save_settings = {}
+        if load_settings is None:
+            load_settings = save_settings
+        game = self.create_game(save_settings)
+        manager = self.start(game)
+        manager.run(5)
+        self.use_policy(manager, "b")
+        manager.run(5)
+        manager.save(self.save_file).join()
+        history = manager.run(5)
+        reference = history.values.copy()
+
+        game.SETTINGS.update(load_settings)
+        restored = self.start(game)
+        restored.load(self.save_file)
+        self.assertEqual(restored.MODEL_MANAGER.current_step, 10)
+        policy = restored.ACTIONS_MANAGER.get_action(
+            ("user_actions", "policies", "cold_room")
+        )
+        self.assertTrue(policy.activated)
+        np.testing.assert_allclose(
+            restored.run(5).values, reference, rtol=1e-12
+        )
+        return history
+
+    def test_restore(self):
+        history = self.assert_restored()
+        # The policy changed the room temperature of b only
+        self.assertEqual(history["a", "room_temperature"][-1], 70)
+        self.assertEqual(history["b", "room_temperature"][-1], 0)
+
+    def test_restore_vectorized(self):
+        self.assert_restored({"ModelManager": "vectorized"})
+
+    def test_restore_parallel(self):
+        # The policy is applied by the workers, then replayed on load
+        self.assert_restored({"ModelManager": "parallel", "Workers": 2})
+
+    def test_restore_in_other_manager(self):
+        self.assert_restored(
+            {"ModelManager": "pysd"}, {"ModelManager": "vectorized"}
+        )
+
+    def test_save_content(self):
+        manager = self.start(self.create_game({"HistoryWindow": 4}))
+        manager.run(10)
+        model_manager = manager.MODEL_MANAGER
+        with model_manager.model_lock:
+            content = model_manager.copy_save_content()
+        reference = model_manager.history.values.copy()
+        # The steps after the copy are not saved
+        manager.run(5)
+        model_manager.save_content(content, self.games_dir)
+
+        model_manager.load(self.games_dir)
+        self.assertEqual(model_manager.current_step, 10)
+        np.testing.assert_array_equal(model_manager.history.values, reference)
+
+    def test_save_waits_for_the_step(self):
+        manager = self.start(self.create_game())
+        manager.run(5)
+        with manager.MODEL_MANAGER.model_lock:
+            thread = manager.save(self.save_file)
+            thread.join(0.1)
+            # The content is copied once the step is done
+            self.assertTrue(thread.is_alive())
+        thread.join()
+        self.assertTrue(self.save_file.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
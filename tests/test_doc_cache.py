@@ -0,0 +1,55 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from pysimgame.headless import HeadlessGameManager
+from pysimgame.model import ModelManager
+from pysimgame.utils.directories import DOC_CACHE_FILENAME
+from teacup import create_teacup_game
+
+TEMPERATURES = {"a": 180.0, "b": 100.0}
+
+
+class TestDocCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.game = create_teacup_game(
+            Path(self._tmp_dir.name), TEMPERATURES
+        )
+        self.cache_file = Path(self.game.GAME_DIR, DOC_CACHE_FILENAME)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def start(self) -> ModelManager:
+        manager = HeadlessGameManager(self.game)
+        manager.prepare()
+        manager.connect()
+        return manager.MODEL_MANAGER
+
+    def test_cache_reused(self):
+        doc = self.start().doc
+        self.assertTrue(self.cache_file.exists())
+        with mock.patch.object(ModelManager, "_parse_doc") as parse_doc:
+            model_manager = self.start()
+            parse_doc.assert_not_called()
+        self.assertEqual(model_manager.doc, doc)
+        self.assertIn("characteristic_time", model_manager._constants)
+
+    def test_model_changed(self):
+        self.start()
+        with open(self.game.PYSD_MODEL_FILE, "a") as f:
+            f.write("\n# Changed\n")
+        with mock.patch.object(
+            ModelManager, "_parse_doc", return_value={}
+        ) as parse_doc:
+            self.start()
+            parse_doc.assert_called_once()
+        with open(self.cache_file) as f:
+            self.assertEqual(json.load(f)["components"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
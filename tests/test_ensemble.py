@@ -0,0 +1,90 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from pysimgame.ensemble import grid_members, run_ensemble, sample_members
+from pysimgame.headless import run_headless
+from teacup import create_teacup_game
+
+TEMPERATURES = {"a": 180.0, "b": 100.0}
+
+
+class TestMembers(unittest.TestCase):
+    def test_grid(self):
+        members = grid_members(
+            {
+                "a": {"room_temperature": [20, 70]},
+                "b": {"teacup_temperature": [50, 60, 70]},
+            }
+        )
+        self.assertEqual(len(members), 6)
+        self.assertEqual(
+            members[0],
+            {"a": {"room_temperature": 20}, "b": {"teacup_temperature": 50}},
+        )
+
+    def test_sample(self):
+        distributions = {"a": {"room_temperature": lambda rng: rng.normal()}}
+        members = sample_members(distributions, 5, seed=1)
+        self.assertEqual(len(members), 5)
+        self.assertEqual(members, sample_members(distributions, 5, seed=1))
+
+
+class TestRunEnsemble(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.game = create_teacup_game(
+            Path(self._tmp_dir.name), TEMPERATURES
+        )
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_run(self):
+        members = grid_members(
+            {
+                "a": {
+                    # A constant and a stock
+                    "room_temperature": [20, 70],
+                    "teacup_temperature": [90, 150],
+                }
+            }
+        )
+        ensemble = run_ensemble(self.game, members, n_steps=5, n_workers=2)
+        self.assertEqual(ensemble.values.shape[:3], (4, 6, 2))
+        np.testing.assert_array_equal(
+            ensemble["a", "teacup_temperature"][:, 0], [90, 150, 90, 150]
+        )
+        np.testing.assert_array_equal(
+            ensemble["a", "room_temperature"][:, -1], [20, 20, 70, 70]
+        )
+        # Region b is not modified
+        reference = run_headless(self.game, n_steps=5)
+        for member_values in ensemble["b", "teacup_temperature"]:
+            np.testing.assert_array_equal(
+                member_values, reference["b", "teacup_temperature"]
+            )
+
+    def test_attributes(self):
+        members = grid_members({"a": {"room_temperature": [20, 70]}})
+        ensemble = run_ensemble(
+            self.game,
+            members,
+            n_steps=2,
+            n_workers=2,
+            attributes=["teacup_temperature"],
+        )
+        self.assertEqual(ensemble.attributes, ["teacup_temperature"])
+        self.assertEqual(ensemble.values.shape, (2, 3, 2, 1))
+        # Written once before running the members
+        self.assertTrue(
+            Path(self.game.GAME_DIR, "capture_attributes.txt").exists()
+        )
+        self.assertTrue(Path(self.game.GAME_DIR, "model_doc.json").exists())
+        self.assertTrue(Path(self.game.GAME_DIR, "actions").is_dir())
+
+
+if __name__ == "__main__":
+    unittest.main()
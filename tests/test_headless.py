@@ -0,0 +1,93 @@
+import io
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import pysimgame.arg_parse
+from pysimgame.arg_parse import read_parsed_args
+from pysimgame.headless import HeadlessGameManager, run_headless
+from teacup import create_teacup_game
+
+TEMPERATURES = {"a": 180.0, "b": 100.0}
+
+
+class TestHeadless(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.games_dir = Path(self._tmp_dir.name)
+        self.game = create_teacup_game(self.games_dir, TEMPERATURES)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_run_steps(self):
+        history = run_headless(self.game, n_steps=10)
+        # The initial state is also saved
+        self.assertEqual(len(history), 11)
+        np.testing.assert_allclose(
+            history.time_axis, np.arange(11) * 0.125
+        )
+        temperatures = history["a", "teacup_temperature"]
+        self.assertEqual(temperatures[0], 180.0)
+        self.assertTrue(np.all(np.diff(temperatures) < 0))
+
+    def test_run_until_final_time(self):
+        manager = HeadlessGameManager(self.game)
+        manager.prepare()
+        manager.connect()
+        self.assertEqual(manager.remaining_steps(), 240)
+        history = manager.run()
+        self.assertAlmostEqual(history.time_axis[-1], 30)
+        self.assertEqual(manager.remaining_steps(), 0)
+
+    def test_history_window(self):
+        expected = run_headless(self.game).values.copy()
+        game = create_teacup_game(
+            self.games_dir,
+            TEMPERATURES,
+            name="teacup_window",
+            settings={"HistoryWindow": 50},
+        )
+        manager = HeadlessGameManager(game)
+        manager.prepare()
+        manager.connect()
+        try:
+            history = manager.run()
+            self.assertLess(history.capacity, len(history))
+            np.testing.assert_array_equal(history.values, expected)
+        finally:
+            manager.MODEL_MANAGER.quit()
+
+    def test_arg_parse(self):
+        output = Path(self.games_dir, "outputs.csv")
+        parser = pysimgame.arg_parse.create_parser()
+        args = parser.parse_args(
+            [
+                "teacup",
+                "--dir",
+                str(self.games_dir),
+                "--headless",
+                "--steps",
+                "5",
+                "--output",
+                str(output),
+            ]
+        )
+        old_stdout, sys.stdout = sys.stdout, io.StringIO()
+        try:
+            with self.assertRaises(SystemExit) as exit:
+                read_parsed_args(args)
+        finally:
+            sys.stdout = old_stdout
+        self.assertEqual(exit.exception.code, 0)
+        df = pd.read_csv(output, header=[0, 1], index_col=0)
+        self.assertEqual(len(df), 6)
+        self.assertIn(("b", "teacup_temperature"), df.columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
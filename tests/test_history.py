@@ -0,0 +1,172 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from pysimgame.history import HistoryStore
+
+
+class TestHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.history = HistoryStore(["a", "b"], ["x", "y", "z"], chunk_size=4)
+
+    def append_steps(self, n_steps: int):
+        for i in range(n_steps):
+            self.history.append(i * 0.5, np.full((2, 3), i, dtype=float))
+
+    def test_empty(self):
+        self.assertEqual(len(self.history), 0)
+        self.assertEqual(self.history.shape, (0, 2, 3))
+        self.assertEqual(len(self.history["a", "x"]), 0)
+
+    def test_append(self):
+        self.append_steps(3)
+        self.assertEqual(len(self.history), 3)
+        np.testing.assert_array_equal(self.history.time_axis, [0, 0.5, 1])
+        np.testing.assert_array_equal(self.history["b", "y"], [0, 1, 2])
+
+    def test_grow(self):
+        self.append_steps(10)
+        self.assertEqual(len(self.history), 10)
+        self.assertEqual(self.history.capacity, 12)
+        np.testing.assert_array_equal(self.history["a", "z"], np.arange(10))
+
+    def test_views(self):
+        self.append_steps(2)
+        column = self.history["a", "x"]
+        self.assertIsNotNone(column.base)
+        self.history.values[1, 0, 0] = 42
+        self.assertEqual(column[1], 42)
+
+    def test_latest(self):
+        self.history.append(0, np.arange(6).reshape(2, 3))
+        np.testing.assert_array_equal(self.history.latest("b"), [3, 4, 5])
+
+    def test_to_dataframe(self):
+        self.append_steps(3)
+        df = self.history.to_dataframe()
+        self.assertEqual(df.shape, (3, 6))
+        self.assertEqual(df.index.name, "time")
+        self.assertEqual(list(df.columns.names), ["regions", "elements"])
+        np.testing.assert_array_equal(df[("b", "z")], [0, 1, 2])
+
+
+class TestHistorySnapshot(unittest.TestCase):
+    def setUp(self):
+        self.history = HistoryStore(["a", "b"], ["x", "y"], chunk_size=4)
+        for i in range(3):
+            self.append(i)
+
+    def append(self, i: int):
+        self.history.append(i * 0.5, np.full((2, 2), i, dtype=float))
+
+    def test_not_changed_by_steps(self):
+        snapshot = self.history.snapshot()
+        for i in range(3, 10):
+            self.append(i)
+        self.assertEqual(len(snapshot), 3)
+        np.testing.assert_array_equal(snapshot["a", "x"], [0, 1, 2])
+        np.testing.assert_array_equal(snapshot.time_axis, [0, 0.5, 1])
+        np.testing.assert_array_equal(snapshot.latest("b"), [2, 2])
+
+    def test_no_copy(self):
+        snapshot = self.history.snapshot()
+        self.assertTrue(
+            np.shares_memory(snapshot.values, self.history.values)
+        )
+        with self.assertRaises(ValueError):
+            snapshot.values[0, 0, 0] = 42
+
+    def test_not_changed_by_truncate(self):
+        snapshot = self.history.snapshot()
+        self.history.truncate(1)
+        self.append(5)
+        np.testing.assert_array_equal(snapshot["b", "y"], [0, 1, 2])
+        np.testing.assert_array_equal(self.history["b", "y"], [0, 5])
+
+    def test_not_changed_by_attributes(self):
+        snapshot = self.history.snapshot()
+        self.history.set_attributes(["y", "z"])
+        self.history.update_latest(["z"], np.ones((2, 1)))
+        self.assertEqual(snapshot.attributes, ["x", "y"])
+        np.testing.assert_array_equal(snapshot.latest("a"), [2, 2])
+        np.testing.assert_array_equal(self.history.latest("a"), [2, 1])
+
+    def test_update_latest(self):
+        snapshot = self.history.snapshot()
+        self.history.update_latest(["x"], np.full((2, 1), 7.0))
+        np.testing.assert_array_equal(snapshot.latest("a"), [2, 2])
+        np.testing.assert_array_equal(self.history.latest("a"), [7, 2])
+
+
+class TestStreamingHistory(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.history = HistoryStore(
+            ["a", "b"],
+            ["x", "y"],
+            chunk_size=4,
+            window=6,
+            directory=Path(self._tmp_dir.name),
+        )
+
+    def tearDown(self):
+        self.history.close()
+        self._tmp_dir.cleanup()
+
+    def append_steps(self, start: int, stop: int):
+        for i in range(start, stop):
+            values = np.array([[i, -i], [10 * i, -10 * i]], dtype=float)
+            self.history.append(i * 0.5, values)
+
+    def test_bounded_memory(self):
+        self.append_steps(0, 50)
+        self.assertEqual(len(self.history), 50)
+        self.assertLessEqual(self.history.capacity, 12)
+        self.assertGreater(self.history.offset, 0)
+        np.testing.assert_array_equal(
+            self.history["b", "x"], np.arange(50) * 10
+        )
+        np.testing.assert_array_equal(
+            self.history.time_axis, np.arange(50) * 0.5
+        )
+        np.testing.assert_array_equal(
+            self.history.column("a", "y", 3, 8), -np.arange(3, 8)
+        )
+        np.testing.assert_array_equal(self.history.latest("a"), [49, -49])
+        self.assertEqual(self.history.values.shape, (50, 2, 2))
+
+    def test_change_attributes(self):
+        self.append_steps(0, 20)
+        self.history.set_attributes(["y", "z"])
+        for i in range(20, 40):
+            self.history.append(i * 0.5, np.full((2, 2), i, dtype=float))
+        z = self.history["a", "z"]
+        self.assertTrue(np.all(np.isnan(z[:20])))
+        np.testing.assert_array_equal(z[20:], np.arange(20, 40))
+        np.testing.assert_array_equal(
+            self.history["a", "y"], [*-np.arange(20), *np.arange(20, 40)]
+        )
+
+    def test_truncate_on_disk(self):
+        self.append_steps(0, 30)
+        self.history.truncate(10)
+        self.assertEqual(len(self.history), 10)
+        np.testing.assert_array_equal(self.history.latest("a"), [9, -9])
+        self.append_steps(10, 30)
+        np.testing.assert_array_equal(self.history["a", "x"], np.arange(30))
+
+    def test_snapshot_on_disk(self):
+        self.append_steps(0, 20)
+        snapshot = self.history.snapshot()
+        self.append_steps(20, 30)
+        self.assertEqual(len(snapshot), 20)
+        np.testing.assert_array_equal(snapshot["b", "x"], 10 * np.arange(20))
+
+    def test_restore(self):
+        self.append_steps(0, 5)
+        values = np.arange(40, dtype=float).reshape(10, 2, 2)
+        self.history.restore(np.arange(10.0), values)
+        self.assertEqual(self.history.offset, 4)
+        np.testing.assert_array_equal(self.history.values, values)
@@ -0,0 +1,240 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pygame
+
+from scipy import sparse
+
+from pysimgame.model import ModelManager
+from teacup import TestGameManager, create_teacup_game
+
+TEMPERATURES = {"a": 180.0, "b": 100.0, "c": 50.0}
+
+
+class ManagerTestCase(unittest.TestCase):
+    # Settings of the teacup game
+    settings: dict = {}
+
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        game = create_teacup_game(
+            self._tmp_dir.name, TEMPERATURES, settings=self.settings
+        )
+        self.manager = ModelManager(TestGameManager(game))
+        self.manager.prepare()
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+
+
+class TestRegionLinks(ManagerTestCase):
+    settings = {"Rewind": True}
+
+    def count_calls(self, variable: str) -> list:
+        """Count the calls to the variable in all the regions."""
+        calls = []
+
+        def counted(function):
+            def counted_function():
+                calls.append(1)
+                return function()
+
+            return counted_function
+
+        for model in self.manager.models.values():
+            function = getattr(model.components, variable)
+            model.set_components({variable: counted(function)})
+        return calls
+
+    def room_temperatures(self) -> np.ndarray:
+        return np.array(
+            [
+                model.components.room_temperature()
+                for model in self.manager.models.values()
+            ]
+        )
+
+    def test_region_sum_computed_once_per_step(self):
+        calls = self.count_calls("characteristic_time")
+        self.manager.link_region_sum(
+            "characteristic_time", "room_temperature"
+        )
+        self.manager.advance()
+        calls.clear()
+        self.room_temperatures()
+        self.room_temperatures()
+        self.assertEqual(len(calls), len(TEMPERATURES))
+
+        self.manager.advance()
+        calls.clear()
+        self.room_temperatures()
+        self.assertEqual(len(calls), len(TEMPERATURES))
+
+    def test_modify_invalidates(self):
+        self.manager.link_region_sum(
+            "characteristic_time", "room_temperature"
+        )
+        np.testing.assert_array_equal(self.room_temperatures(), 30.0)
+        # Read again in the same step
+        self.manager.link_modify("b", "characteristic_time", lambda: 2.0)
+        np.testing.assert_array_equal(self.room_temperatures(), 22.0)
+
+    def test_region_average(self):
+        self.manager.link_region_average(
+            "teacup_temperature", "room_temperature"
+        )
+        for _ in range(5):
+            self.manager.advance()
+            teacups = [
+                model.components.teacup_temperature()
+                for model in self.manager.models.values()
+            ]
+            np.testing.assert_allclose(
+                self.room_temperatures(), np.mean(teacups)
+            )
+
+    def test_shared_variable(self):
+        self.manager.link_modify("b", "room_temperature", lambda: 30.0)
+        self.manager.link_modify("c", "room_temperature", lambda: 40.0)
+        shared = self.manager.model.room_temperature()
+        calls = self.count_calls("room_temperature")
+        self.manager._share_method("room_temperature")
+        self.manager.advance()
+        calls.clear()
+        np.testing.assert_array_equal(self.room_temperatures(), shared)
+        # Once for the shared method and once for the shared model
+        self.assertEqual(len(calls), 2)
+
+    def test_restore_invalidates(self):
+        self.manager.link_region_sum("teacup_temperature", "room_temperature")
+        self.manager.advance()
+        expected = self.room_temperatures()
+        self.manager.advance()
+        self.manager.advance()
+        self.room_temperatures()
+        self.manager.rewind(1)
+        np.testing.assert_array_equal(self.room_temperatures(), expected)
+
+
+# Region a sends to b and c, b to c
+WEIGHTS = sparse.csr_matrix(
+    [[0.0, 0.1, 0.2], [0.0, 0.0, 0.5], [0.0, 0.0, 0.0]]
+)
+
+
+class TestFlowLink(ManagerTestCase):
+    settings = {"Rewind": True}
+
+    def link(self, weights=WEIGHTS, **kwargs):
+        return self.manager.link_flows(
+            "teacup_temperature",
+            "room_temperature",
+            "heat_loss_to_room",
+            weights,
+            **kwargs,
+        )
+
+    def sources(self) -> np.ndarray:
+        return np.array(
+            [
+                model.components.teacup_temperature()
+                for model in self.manager.models.values()
+            ]
+        )
+
+    def values(self, variable: str) -> np.ndarray:
+        return np.array(
+            [
+                getattr(model.components, variable)()
+                for model in self.manager.models.values()
+            ]
+        )
+
+    def test_flows(self):
+        link = self.link()
+        for _ in range(3):
+            sources = self.sources()
+            self.manager.advance()
+            expected = WEIGHTS.toarray() * sources[:, None]
+            np.testing.assert_allclose(link.flows.toarray(), expected)
+            np.testing.assert_allclose(
+                self.values("heat_loss_to_room"), expected.sum(axis=1)
+            )
+            np.testing.assert_allclose(
+                self.values("room_temperature"), expected.sum(axis=0)
+            )
+
+    def test_capacities(self):
+        capacities = WEIGHTS.copy()
+        capacities.data[:] = 20.0
+        link = self.link(capacities=capacities)
+        sources = self.sources()
+        self.manager.advance()
+        expected = np.minimum(WEIGHTS.toarray() * sources[:, None], 20.0)
+        np.testing.assert_allclose(link.flows.toarray(), expected)
+        np.testing.assert_allclose(link.inflows, expected.sum(axis=0))
+
+    def test_time_varying_weights(self):
+        times = []
+
+        def weights(time):
+            times.append(time)
+            return WEIGHTS * (1 + time)
+
+        link = self.link(weights)
+        self.manager.advance()
+        self.manager.advance()
+        self.assertEqual(times, [0.0, self.manager.time_step])
+        sources = self.sources()
+        self.manager.advance()
+        expected = (
+            WEIGHTS.toarray() * (1 + 2 * self.manager.time_step)
+        ) * sources[:, None]
+        np.testing.assert_allclose(link.flows.toarray(), expected)
+
+    def test_record(self):
+        link = self.link(record=True)
+        self.manager.advance()
+        self.manager.advance()
+        df = link.to_dataframe()
+        self.assertEqual(len(df), 2 * WEIGHTS.nnz)
+        self.assertEqual(
+            list(df[df["time"] == 0.0]["destination"]), ["b", "c", "c"]
+        )
+        np.testing.assert_allclose(
+            df[df["time"] == self.manager.time_step]["flow"],
+            link.flows.data,
+        )
+
+    def test_max_records(self):
+        link = self.link(record=True, max_records=2)
+        for _ in range(3):
+            self.manager.advance()
+        step = self.manager.time_step
+        self.assertEqual(list(link.history), [step, 2 * step])
+
+    def test_rewind_truncates_records(self):
+        link = self.link(record=True)
+        for _ in range(3):
+            self.manager.advance()
+        self.manager.rewind(1)
+        step = self.manager.time_step
+        self.assertEqual(list(link.history), [0.0, step])
+        self.manager.advance()
+        self.assertEqual(list(link.history), [0.0, step])
+        self.manager.advance()
+        self.assertEqual(list(link.history), [0.0, step, 2 * step])
+
+    def test_wrong_shape(self):
+        with self.assertRaises(ValueError):
+            self.link(sparse.eye(2))
+
+
+if __name__ == "__main__":
+    unittest.main()
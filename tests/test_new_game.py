@@ -0,0 +1,69 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pysd
+
+from pysimgame.new_game import parse_model_file, translate_model
+from teacup import TEACUP_MDL
+
+
+class TestTranslationCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+        self.cache_dir = Path(self.tmp_dir, "translations")
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_translated_once(self):
+        translated_dir = translate_model(TEACUP_MDL, self.cache_dir)
+        model_py = Path(translated_dir, "Teacup.py")
+        self.assertTrue(model_py.exists())
+        # The model file itself is not cached
+        self.assertFalse(Path(translated_dir, "Teacup.mdl").exists())
+
+        with mock.patch.object(pysd, "read_vensim") as read_vensim:
+            self.assertEqual(
+                translate_model(TEACUP_MDL, self.cache_dir), translated_dir
+            )
+        read_vensim.assert_not_called()
+        # No temporary directory left
+        self.assertEqual(list(self.cache_dir.iterdir()), [translated_dir])
+
+    def test_pysd_version_in_key(self):
+        translated_dir = translate_model(TEACUP_MDL, self.cache_dir)
+        with mock.patch.object(pysd, "__version__", "0.0.0"):
+            other_dir = translate_model(TEACUP_MDL, self.cache_dir)
+        self.assertNotEqual(translated_dir, other_dir)
+
+    def test_parse_model_file(self):
+        game_dir = Path(self.tmp_dir, "game")
+        game_dir.mkdir()
+        # Warm the cache with the name used in the games
+        model_file = Path(self.tmp_dir, "model.mdl")
+        model_file.write_bytes(TEACUP_MDL.read_bytes())
+        translate_model(model_file, self.cache_dir)
+        with mock.patch(
+            "pysimgame.new_game.TRANSLATIONS_DIR", self.cache_dir
+        ), mock.patch.object(pysd, "read_vensim") as read_vensim:
+            parse_model_file(TEACUP_MDL, game_dir)
+        read_vensim.assert_not_called()
+        self.assertTrue(Path(game_dir, "model.mdl").exists())
+        self.assertTrue(Path(game_dir, "model.py").exists())
+
+    def test_parse_model_file_removes_old_modules(self):
+        game_dir = Path(self.tmp_dir, "game")
+        old_module = Path(game_dir, "modules_model", "old_view.py")
+        old_module.parent.mkdir(parents=True)
+        old_module.write_text("")
+        with mock.patch("pysimgame.new_game.TRANSLATIONS_DIR", self.cache_dir):
+            parse_model_file(TEACUP_MDL, game_dir)
+        self.assertFalse(old_module.parent.exists())
+        self.assertTrue(Path(game_dir, "model.py").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pygame
+
+from pysimgame.model import ModelManager
+from pysimgame.parallel import ParallelModelManager
+from teacup import TestGameManager, create_teacup_game
+
+TEMPERATURES = {"a": 180.0, "b": 100.0, "c": 50.0}
+
+
+def run_model(manager_class, n_steps: int, setup=None):
+    with tempfile.TemporaryDirectory() as games_dir:
+        game = create_teacup_game(
+            games_dir,
+            TEMPERATURES,
+            settings={"Workers": 2, "FullHistory": True},
+        )
+        manager = manager_class(TestGameManager(game))
+        manager.prepare()
+        manager.connect()
+        if setup is not None:
+            setup(manager)
+        try:
+            for _ in range(n_steps):
+                manager.step()
+        finally:
+            manager.quit()
+        return manager.outputs.to_numpy(dtype=float)
+
+
+def export_heat(components):
+    temperatures = {
+        region: comps.teacup_temperature()
+        for region, comps in components.items()
+    }
+    mean = sum(temperatures.values()) / len(temperatures)
+    exports = {
+        region: comps.heat_loss_to_room()
+        for region, comps in components.items()
+    }
+    return exports, {region: mean for region in components}
+
+
+class TestParallelModelManager(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+
+    def assert_same_trajectories(self, setup=None):
+        np.testing.assert_allclose(
+            run_model(ModelManager, 10, setup),
+            run_model(ParallelModelManager, 10, setup),
+            rtol=1e-12,
+        )
+
+    def test_same_trajectories(self):
+        self.assert_same_trajectories()
+
+    def test_same_trajectories_with_region_modifier(self):
+        def setup(manager: ModelManager):
+            manager.link_modify("b", "characteristic_time", lambda: 2.0)
+
+        self.assert_same_trajectories(setup)
+
+    def test_same_trajectories_with_region_average(self):
+        def setup(manager: ModelManager):
+            manager.link_region_average(
+                "teacup_temperature", "room_temperature"
+            )
+
+        self.assert_same_trajectories(setup)
+
+    def test_same_trajectories_with_export_import(self):
+        def setup(manager: ModelManager):
+            manager.link_export_import(
+                "heat_loss_to_room", "room_temperature", export_heat
+            )
+
+        self.assert_same_trajectories(setup)
+
+    def test_same_trajectories_with_flows(self):
+        links = []
+
+        def setup(manager: ModelManager):
+            links.append(
+                manager.link_flows(
+                    "teacup_temperature",
+                    "room_temperature",
+                    "heat_loss_to_room",
+                    np.array(
+                        [[0.0, 0.1, 0.2], [0.0, 0.0, 0.5], [0.3, 0.0, 0.0]]
+                    ),
+                    record=True,
+                )
+            )
+
+        self.assert_same_trajectories(setup)
+        sequential, parallel = links
+        # The flows are computed and recorded in the game process
+        self.assertEqual(len(parallel.history), 10)
+        self.assertEqual(list(parallel.history), list(sequential.history))
+        for time, flows in sequential.history.items():
+            np.testing.assert_allclose(
+                parallel.history[time].toarray(), flows.toarray(), rtol=1e-12
+            )
+
+    def test_profiling(self):
+        with tempfile.TemporaryDirectory() as games_dir:
+            game = create_teacup_game(
+                games_dir,
+                TEMPERATURES,
+                settings={"Workers": 2, "Profile": True},
+            )
+            manager = ParallelModelManager(TestGameManager(game))
+            with self.assertLogs(manager.logger, "WARNING"):
+                manager.prepare()
+            manager.connect()
+            manager.link_region_average(
+                "teacup_temperature", "room_temperature"
+            )
+            try:
+                manager.step()
+            finally:
+                manager.quit()
+            stats = manager.profiling_stats()
+            # The average is evaluated in the game process
+            self.assertIn("room_temperature", set(stats["component"]))
+
+    def test_workers_groups(self):
+        with tempfile.TemporaryDirectory() as games_dir:
+            game = create_teacup_game(
+                games_dir, TEMPERATURES, settings={"Workers": 2}
+            )
+            manager = ParallelModelManager(TestGameManager(game))
+            manager.prepare()
+            self.assertEqual(manager.n_workers, 2)
+            self.assertEqual(manager._regions_groups, [["a", "b"], ["c"]])
+
+    def test_workers_started_when_connected(self):
+        with tempfile.TemporaryDirectory() as games_dir:
+            game = create_teacup_game(
+                games_dir, TEMPERATURES, settings={"Workers": 2}
+            )
+            manager = ParallelModelManager(TestGameManager(game))
+            manager.prepare()
+            with self.assertRaises(RuntimeError):
+                manager.step()
+            manager.connect()
+            try:
+                workers = list(manager._workers)
+                self.assertEqual(len(workers), 2)
+                manager.step()
+                # Not forked again from the stepping thread
+                self.assertEqual(manager._workers, workers)
+            finally:
+                manager.quit()
+            self.assertEqual(manager._workers, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,422 @@
+import multiprocessing
+import time
+import unittest
+from multiprocessing.shared_memory import SharedMemory
+from types import SimpleNamespace
+
+import numpy as np
+import pygame
+from matplotlib.figure import Figure
+
+from pysimgame.history import HistoryStore
+from pysimgame.plotting.native import LinePlotSurface, nice_ticks
+from pysimgame.plotting.plot import PlotLine
+from pysimgame.plotting.process import PlotsRenderer
+from pysimgame.plotting.utils.agg import AggFigureSurface
+from pysimgame.plotting.utils.downsampling import MinMaxPyramid
+from pysimgame.plotting.utils.figure import LinePlotFigure
+from pysimgame.plotting.utils.limits import GrowingLimits
+
+
+class TestGrowingLimits(unittest.TestCase):
+    def test_first_values(self):
+        limits = GrowingLimits(margin=0.5)
+        self.assertTrue(limits.update(np.array([0.0, 2.0])))
+        self.assertEqual(limits.limits, (-1.0, 3.0))
+
+    def test_values_inside(self):
+        limits = GrowingLimits()
+        limits.update(np.array([0.0, 4.0]))
+        self.assertFalse(limits.update(np.array([1.0, 4.5])))
+        self.assertEqual(limits.limits, (-1.0, 5.0))
+
+    def test_extend_one_side(self):
+        limits = GrowingLimits()
+        limits.update(np.array([0.0, 4.0]))
+        self.assertTrue(limits.update(np.array([7.0])))
+        # Only the high side gets the margin of the new range
+        self.assertEqual(limits.limits, (-1.0, 9.0))
+
+    def test_constant_and_nan(self):
+        limits = GrowingLimits()
+        self.assertFalse(limits.update(np.array([np.nan])))
+        self.assertFalse(limits.update(np.array([])))
+        self.assertTrue(limits.update(np.array([2.0, np.nan])))
+        low, high = limits.limits
+        self.assertLess(low, 2.0)
+        self.assertGreater(high, 2.0)
+
+    def test_reset(self):
+        limits = GrowingLimits()
+        limits.update(np.array([0.0, 4.0]))
+        limits.reset()
+        self.assertEqual(limits.limits, (None, None))
+
+
+class TestMinMaxPyramid(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.y = np.cumsum(rng.normal(size=10000))
+        self.x = np.arange(len(self.y)) * 0.5
+
+    def test_short_series_unchanged(self):
+        x, y = MinMaxPyramid().downsample(self.x[:50], self.y[:50], 100)
+        np.testing.assert_array_equal(y, self.y[:50])
+
+    def test_number_of_points(self):
+        x, y = MinMaxPyramid().downsample(self.x, self.y, 300)
+        self.assertLessEqual(len(x), 2 * 300 + 4)
+        self.assertTrue(np.all(np.diff(x) > 0))
+
+    def test_peaks_kept(self):
+        y = self.y.copy()
+        y[1234] = 1000.0
+        y[5678] = -1000.0
+        _, downsampled = MinMaxPyramid().downsample(self.x, y, 100)
+        self.assertIn(1000.0, downsampled)
+        self.assertIn(-1000.0, downsampled)
+
+    def test_range(self):
+        pyramid = MinMaxPyramid()
+        x, y = pyramid.downsample(self.x, self.y, 100, 1001, 7003)
+        self.assertGreaterEqual(x[0], self.x[1001])
+        self.assertLess(x[-1], self.x[7003])
+        self.assertEqual(y.max(), self.y[1001:7003].max())
+        self.assertEqual(y.min(), self.y[1001:7003].min())
+
+    def test_incremental(self):
+        pyramid = MinMaxPyramid()
+        for stop in range(1, len(self.y), 37):
+            pyramid.update(self.y[:stop])
+        expected = MinMaxPyramid().indices(self.y, 200)
+        np.testing.assert_array_equal(pyramid.indices(self.y, 200), expected)
+
+    def test_rewind(self):
+        pyramid = MinMaxPyramid()
+        pyramid.update(self.y)
+        y = np.concatenate((self.y[:4000], -self.y[4000:]))
+        np.testing.assert_array_equal(
+            pyramid.indices(self.y[:4000], 100),
+            MinMaxPyramid().indices(self.y[:4000], 100),
+        )
+        np.testing.assert_array_equal(
+            pyramid.indices(y, 100), MinMaxPyramid().indices(y, 100)
+        )
+
+    def test_nan(self):
+        y = self.y.copy()
+        y[:100] = np.nan
+        _, downsampled = MinMaxPyramid().downsample(self.x, y, 100)
+        self.assertEqual(np.nanmax(downsampled), np.nanmax(y))
+
+
+class TestNiceTicks(unittest.TestCase):
+    def test_round_values(self):
+        np.testing.assert_allclose(
+            nice_ticks(0.0, 100.0), [0, 20, 40, 60, 80, 100]
+        )
+        np.testing.assert_allclose(nice_ticks(-0.3, 0.25), [-0.2, 0, 0.2])
+
+    def test_no_negative_zero(self):
+        self.assertIn("0", [f"{tick:g}" for tick in nice_ticks(-1.0, 1.0)])
+
+    def test_empty_range(self):
+        np.testing.assert_array_equal(nice_ticks(3.0, 3.0), [3.0])
+
+
+class TestLinePlotSurface(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+
+    def setUp(self):
+        self.history = HistoryStore(["a", "b"], ["x", "y"])
+        plot = SimpleNamespace(
+            plot_lines=[
+                PlotLine("a", ["x", "y"], kwargs={"color": "red"}),
+                PlotLine("b", "x", share_y=False),
+            ]
+        )
+        self.surface = LinePlotSurface(plot, (300, 200))
+
+    def append_steps(self, n_steps: int):
+        start = len(self.history)
+        for i in range(start, start + n_steps):
+            self.history.append(i * 0.5, np.array([[i, -i], [i**2, 0.0]]))
+
+    def line_pixels(self, color: str) -> int:
+        area = self.surface.area
+        pixels = pygame.surfarray.pixels3d(self.surface.surface)
+        inside = pixels[area.left : area.right, area.top : area.bottom]
+        return int(np.all(inside == pygame.Color(color)[:3], axis=2).sum())
+
+    def test_lines(self):
+        self.assertEqual(
+            [line.label for line in self.surface.lines],
+            ["a x", "a y", "b x"],
+        )
+        self.assertEqual(self.surface.lines[0].color, pygame.Color("red"))
+        self.assertTrue(self.surface.lines[2].right)
+
+    def test_single_step(self):
+        self.append_steps(1)
+        self.surface.render(self.history.snapshot())
+        self.assertEqual(self.line_pixels("red"), 0)
+
+    def test_render(self):
+        self.append_steps(1000)
+        self.surface.render(self.history.snapshot())
+        self.assertGreater(self.line_pixels("red"), 0)
+        # The axis limits include the values
+        self.assertLessEqual(self.surface._y_limits[1].low, 0)
+        self.assertGreaterEqual(self.surface._y_limits[1].high, 999**2)
+
+    def test_rewind(self):
+        self.append_steps(100)
+        self.surface.render(self.history.snapshot())
+        self.history.truncate(50)
+        self.surface.render(self.history.snapshot())
+        self.assertLess(self.surface._y_limits[1].high, 99**2)
+
+    def test_rewind_and_grow(self):
+        self.append_steps(100)
+        self.surface.render(self.history.snapshot())
+        self.history.truncate(50)
+        for i in range(50, 150):
+            self.history.append(i * 0.5, np.zeros((2, 2)))
+        # Longer than before, the rewind must be notified
+        self.surface.truncate(50)
+        self.surface.render(self.history.snapshot())
+        self.assertLess(self.surface._y_limits[1].high, 99**2)
+
+    def test_missing_values(self):
+        self.append_steps(10)
+        self.history.values[3:6] = np.nan
+        self.surface.render(self.history.snapshot())
+        self.assertGreater(self.line_pixels("red"), 0)
+
+
+class TestAggFigureSurface(unittest.TestCase):
+    def setUp(self):
+        figure = Figure()
+        self.ax = figure.subplots()
+        self.figure_surface = AggFigureSurface(figure)
+        self.figure_surface.set_bounding_rect(pygame.Rect(0, 0, 200, 100))
+
+    def test_size(self):
+        self.assertEqual(self.figure_surface.surface.get_size(), (200, 100))
+
+    def test_shared_pixels(self):
+        surface = self.figure_surface.surface
+        center = (100, 50)
+        self.ax.set_facecolor("red")
+        self.figure_surface.canvas.draw()
+        self.assertIs(self.figure_surface.surface, surface)
+        self.assertEqual(surface.get_at(center), pygame.Color("red"))
+        self.ax.set_facecolor("blue")
+        self.figure_surface.canvas.draw()
+        self.assertEqual(surface.get_at(center), pygame.Color("blue"))
+
+    def test_resize(self):
+        surface = self.figure_surface.surface
+        self.figure_surface.set_bounding_rect(pygame.Rect(0, 0, 300, 150))
+        self.assertIsNot(self.figure_surface.surface, surface)
+        self.assertEqual(self.figure_surface.surface.get_size(), (300, 150))
+
+
+def append_steps(history: HistoryStore, n_steps: int):
+    start = len(history)
+    for i in range(start, start + n_steps):
+        history.append(i * 0.5, np.array([[i, -i], [i**2, 0.0]]))
+
+
+def red_pixels(surface: pygame.Surface) -> int:
+    pixels = pygame.surfarray.pixels3d(surface)
+    return int(np.all(pixels == (255, 0, 0), axis=2).sum())
+
+
+class TestLinePlotFigure(unittest.TestCase):
+    def setUp(self):
+        self.history = HistoryStore(["a", "b"], ["x", "y"])
+        self.figure = LinePlotFigure(
+            [
+                PlotLine("a", ["x", "y"], kwargs={"color": "red"}),
+                PlotLine("b", "x", share_y=False),
+            ]
+        )
+        self.figure.set_bounding_rect(pygame.Rect(0, 0, 300, 200))
+
+    def test_axes(self):
+        self.assertEqual(len(self.figure.axes), 2)
+        self.assertEqual([len(lines) for lines in self.figure.lines], [2, 1])
+
+    def test_single_step(self):
+        append_steps(self.history, 1)
+        self.assertFalse(self.figure.render(self.history.snapshot()))
+
+    def test_y_lims_of_shared_axes(self):
+        figure = LinePlotFigure(
+            [
+                PlotLine("a", "x"),
+                PlotLine("a", "y", y_lims=[-5, 5]),
+                PlotLine("b", "x", share_y=False),
+            ]
+        )
+        figure.set_bounding_rect(pygame.Rect(0, 0, 300, 200))
+        append_steps(self.history, 100)
+        figure.render(self.history.snapshot())
+        # The second line is drawn on the first axes
+        self.assertEqual(figure.axes[0].get_ylim(), (-5, 5))
+        self.assertNotEqual(figure.axes[1].get_ylim(), (-5, 5))
+
+    def test_render(self):
+        append_steps(self.history, 1000)
+        self.assertTrue(self.figure.render(self.history.snapshot()))
+        self.assertGreater(red_pixels(self.figure.surface), 0)
+        # Downsampled to the width of the axes
+        line = self.figure.lines[0][0]
+        self.assertLessEqual(
+            len(line.get_xdata()), 2 * line.axes.bbox.width + 4
+        )
+
+    def test_truncate(self):
+        append_steps(self.history, 1000)
+        self.figure.render(self.history.snapshot())
+        # Rewound and grown again before the next render
+        self.history.truncate(500)
+        for i in range(500, 1000):
+            self.history.append(i * 0.5, np.array([[-i, -i], [0, 0.0]]))
+        self.figure.truncate(500)
+        self.figure.render(self.history.snapshot())
+        _, y = self.figure.lines[0][0].get_data()
+        self.assertEqual(y.min(), -999)
+        self.assertLess(self.figure.axes[0].get_ylim()[0], -999)
+
+    def test_resize(self):
+        append_steps(self.history, 100)
+        self.figure.render(self.history.snapshot())
+        self.figure.set_bounding_rect(pygame.Rect(0, 0, 400, 300))
+        self.assertEqual(self.figure.surface.get_size(), (400, 300))
+        # Rendered again with the last history
+        self.assertGreater(red_pixels(self.figure.surface), 0)
+
+    def test_resize_while_drawn(self):
+        append_steps(self.history, 100)
+        self.figure.render(self.history.snapshot())
+        # The windows are resized while the figures are locked
+        with self.figure.lock:
+            self.figure.set_bounding_rect(pygame.Rect(0, 0, 400, 300))
+        self.assertEqual(self.figure.surface.get_size(), (400, 300))
+
+
+@unittest.skipUnless(
+    "fork" in multiprocessing.get_all_start_methods(),
+    "The renderer is forked.",
+)
+class TestPlotsRenderer(unittest.TestCase):
+    def setUp(self):
+        self.history = HistoryStore(["a", "b"], ["x", "y"])
+        self.renderer = PlotsRenderer()
+        self.figure = self.renderer.open(
+            "plot",
+            [PlotLine("a", ["x", "y"], kwargs={"color": "red"})],
+            (300, 200),
+        )
+
+    def tearDown(self):
+        if self.renderer._process.is_alive():
+            self.renderer.stop()
+
+    def wait_frame(self) -> set:
+        start = time.time()
+        while time.time() - start < 10:
+            updated = self.renderer.poll()
+            if updated:
+                return updated
+            time.sleep(0.001)
+        self.fail("No frame rendered.")
+
+    def test_blank_before_render(self):
+        self.assertEqual(self.figure.surface.get_size(), (300, 200))
+        self.assertEqual(red_pixels(self.figure.surface), 0)
+
+    def test_frame(self):
+        append_steps(self.history, 1000)
+        self.renderer.update(self.history.snapshot())
+        self.assertEqual(self.wait_frame(), {"plot"})
+        self.assertGreater(red_pixels(self.figure.surface), 0)
+
+    def test_new_steps(self):
+        append_steps(self.history, 100)
+        self.renderer.update(self.history.snapshot())
+        self.wait_frame()
+        first = self.figure.surface
+        # More than the capacity of the shared memory
+        append_steps(self.history, 1000)
+        self.renderer.update(self.history.snapshot())
+        self.wait_frame()
+        # Drawn in the other frame
+        self.assertIsNot(self.figure.surface, first)
+        np.testing.assert_array_equal(
+            self.renderer.history.time_axis, self.history.time_axis
+        )
+
+    def test_rewind(self):
+        append_steps(self.history, 100)
+        self.renderer.update(self.history.snapshot())
+        self.history.truncate(50)
+        self.history.append(100.0, np.zeros((2, 2)))
+        self.renderer.rewound(50)
+        self.renderer.update(self.history.snapshot())
+        self.assertEqual(len(self.renderer.history), 51)
+        self.assertEqual(self.renderer.history["a", "x"][-1], 0.0)
+
+    def test_resize(self):
+        append_steps(self.history, 100)
+        self.renderer.update(self.history.snapshot())
+        self.wait_frame()
+        self.figure.set_bounding_rect(pygame.Rect(0, 0, 400, 300))
+        self.assertEqual(self.figure.surface.get_size(), (400, 300))
+        self.wait_frame()
+        self.assertEqual(self.figure.surface.get_size(), (400, 300))
+        self.assertGreater(red_pixels(self.figure.surface), 0)
+
+    def test_stop(self):
+        append_steps(self.history, 100)
+        self.renderer.update(self.history.snapshot())
+        self.wait_frame()
+        names = [
+            self.figure.frames.name,
+            self.renderer.history.shared_memory.name,
+        ]
+        # Still shown while the worker stops
+        shown = self.figure.surface
+        self.figure.set_bounding_rect(pygame.Rect(0, 0, 400, 300))
+        names.append(self.figure.frames.name)
+        self.renderer.stop()
+        self.assertFalse(self.renderer._process.is_alive())
+        self.assertEqual(self.renderer._released, {})
+        self.assertEqual(self.renderer._closing, [])
+        self.assertIsNone(self.renderer.history.shared_memory)
+        for name in names:
+            # Unlinked, even if a surface still uses the memory
+            with self.assertRaises(FileNotFoundError):
+                SharedMemory(name)
+        # The memory stays mapped while it is shown
+        self.assertEqual(shown.get_size(), (300, 200))
+        self.assertGreater(red_pixels(shown), 0)
+
+    def test_close(self):
+        append_steps(self.history, 100)
+        self.renderer.update(self.history.snapshot())
+        self.wait_frame()
+        self.renderer.close("plot")
+        start = time.time()
+        while self.renderer._released and time.time() - start < 10:
+            self.renderer.poll()
+        self.assertEqual(self.renderer._released, {})
+        self.assertEqual(self.renderer._closing, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from pysimgame.headless import HeadlessGameManager, run_headless
+from teacup import create_teacup_game
+
+TEMPERATURES = {"a": 180.0, "b": 100.0}
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.games_dir = Path(self._tmp_dir.name)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def start(self, settings=None) -> HeadlessGameManager:
+        game = create_teacup_game(
+            self.games_dir, TEMPERATURES, settings=settings
+        )
+        manager = HeadlessGameManager(game)
+        manager.prepare()
+        manager.connect()
+        return manager
+
+    def namespace(self, manager: HeadlessGameManager, region: str) -> dict:
+        model = manager.MODEL_MANAGER.models[region]
+        return vars(model.components._components)
+
+    def test_stats(self):
+        manager = self.start({"Profile": True})
+        history = manager.run(10)
+        stats = manager.MODEL_MANAGER.profiling_stats()
+        self.assertCountEqual(stats["region"].unique(), TEMPERATURES)
+        heat_loss = stats[stats["component"] == "heat_loss_to_room"]
+        self.assertEqual(len(heat_loss), len(TEMPERATURES))
+        self.assertTrue(np.all(heat_loss["calls"] > 10))
+        self.assertTrue(np.all(stats["own_time"] <= stats["total_time"]))
+
+        # Profiling does not change the results
+        expected = run_headless(manager.game, n_steps=10)
+        np.testing.assert_array_equal(history.values, expected.values)
+
+    def test_disabled(self):
+        manager = self.start()
+        self.assertIsNone(manager.MODEL_MANAGER.profiler)
+        with self.assertRaises(RuntimeError):
+            manager.MODEL_MANAGER.profiling_stats()
+
+    def test_stop_restores_components(self):
+        manager = self.start()
+        model = manager.MODEL_MANAGER
+        original = self.namespace(manager, "a")["heat_loss_to_room"]
+        model.start_profiling()
+        self.assertIsNot(
+            self.namespace(manager, "a")["heat_loss_to_room"], original
+        )
+        manager.run(2)
+        profiler = model.stop_profiling()
+        self.assertIsNone(model.profiler)
+        self.assertIs(
+            self.namespace(manager, "a")["heat_loss_to_room"], original
+        )
+        self.assertGreater(len(profiler.to_dataframe()), 0)
+
+    def test_components_set_while_profiling(self):
+        manager = self.start()
+        model = manager.MODEL_MANAGER
+        model.start_profiling()
+        model.models["b"].set_components({"room_temperature": 20})
+        manager.run(3)
+        stats = model.profiling_stats()
+        room = stats[
+            (stats["component"] == "room_temperature")
+            & (stats["region"] == "b")
+        ]
+        self.assertGreater(room["calls"].iloc[0], 0)
+        model.stop_profiling()
+        self.assertFalse(
+            hasattr(
+                self.namespace(manager, "b")["room_temperature"], "profiler"
+            )
+        )
+
+    def test_save(self):
+        manager = self.start({"Profile": True})
+        manager.run(3)
+        profiler = manager.MODEL_MANAGER.profiler
+        profiler.save(Path(self.games_dir, "profile.csv"))
+        profiler.save(Path(self.games_dir, "profile.json"), by_region=False)
+        with open(Path(self.games_dir, "profile.json")) as f:
+            records = json.load(f)
+        self.assertEqual(
+            [record["component"] for record in records],
+            list(profiler.to_dataframe(by_region=False)["component"]),
+        )
+        self.assertIn("heat_loss_to_room", profiler.report(limit=3))
+
+    def test_vectorized(self):
+        manager = self.start({"Profile": True, "ModelManager": "vectorized"})
+        manager.run(3)
+        stats = manager.MODEL_MANAGER.profiling_stats()
+        self.assertEqual(list(stats["region"].unique()), ["all"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from pysimgame.utils.directories import EXAMPLES_DIR
+from pysimgame.utils.pysd_fork import fork_model
+
+
+def run(model, n_steps: int = 10):
+    model.time.stage = "Run"
+    for _ in range(n_steps):
+        dt = model.time.time_step()
+        model._euler_step(dt)
+        model.time.update(model.time() + dt)
+        model.clean_caches()
+    return np.array(model.state, dtype=float)
+
+
+class TestForkModel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import pysd
+
+        cls._tmp_dir = tempfile.TemporaryDirectory()
+        cls.model_files = []
+        for mdl in [
+            Path(EXAMPLES_DIR, "teacup", "Teacup.mdl"),
+            # Has cached components
+            Path(EXAMPLES_DIR, "differentcups", "DifferentCups.mdl"),
+        ]:
+            mdl_file = Path(cls._tmp_dir.name, mdl.name)
+            shutil.copyfile(mdl, mdl_file)
+            pysd.read_vensim(str(mdl_file), initialize=False)
+            cls.model_files.append(mdl_file.with_suffix(".py"))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp_dir.cleanup()
+
+    def test_same_as_loaded(self):
+        import pysd
+
+        for model_file in self.model_files:
+            forked = fork_model(pysd.load(model_file))
+            np.testing.assert_array_equal(
+                run(forked), run(pysd.load(model_file))
+            )
+
+    def test_independent(self):
+        import pysd
+
+        model = pysd.load(self.model_files[0])
+        fork_a, fork_b = fork_model(model), fork_model(model)
+        fork_a.set_components({"room_temperature": 20})
+        self.assertEqual(fork_a.components.room_temperature(), 20)
+        self.assertEqual(fork_b.components.room_temperature(), 70)
+        self.assertEqual(model.components.room_temperature(), 70)
+        state_a, state_b = run(fork_a), run(fork_b)
+        self.assertLess(state_a[0], state_b[0])
+        # The original model did not move
+        self.assertEqual(model.time(), 0)
+        self.assertEqual(model.components.teacup_temperature(), 180)
+
+    def test_shared_code(self):
+        import pysd
+
+        model = pysd.load(self.model_files[0])
+        forked = fork_model(model)
+        self.assertIsNot(
+            forked.components.heat_loss_to_room,
+            model.components.heat_loss_to_room,
+        )
+        self.assertIs(
+            forked.components.heat_loss_to_room.__code__,
+            model.components.heat_loss_to_room.__code__,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from pysimgame.headless import HeadlessGameManager
+from pysimgame.rewind import StateTimeline
+from teacup import create_teacup_game
+
+TEMPERATURES = {"a": 180.0, "b": 100.0}
+
+
+class TestStateTimeline(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        # Only some values change at each step
+        self.states = np.cumsum(
+            rng.normal(size=(50, 3, 4)) * (rng.random((50, 3, 4)) < 0.3),
+            axis=0,
+        )
+
+    def test_restore_exact(self):
+        timeline = StateTimeline(keyframe_interval=10)
+        for step, states in enumerate(self.states):
+            timeline.record(step, states)
+        self.assertEqual(len(timeline), len(self.states))
+        for step, states in enumerate(self.states):
+            np.testing.assert_array_equal(timeline.get(step), states)
+
+    def test_truncate(self):
+        timeline = StateTimeline(keyframe_interval=10)
+        for step, states in enumerate(self.states):
+            timeline.record(step, states)
+        timeline.truncate(23)
+        self.assertEqual(timeline.steps(), list(range(24)))
+        # Record a new branch
+        timeline.record(24, self.states[0])
+        np.testing.assert_array_equal(timeline.get(24), self.states[0])
+        np.testing.assert_array_equal(timeline.get(23), self.states[23])
+        with self.assertRaises(ValueError):
+            timeline.record(30, self.states[0])
+
+    def test_bounded(self):
+        timeline = StateTimeline(
+            keyframe_interval=100, max_keyframes=20, delta_segments=3
+        )
+        states = np.zeros((2, 5))
+        for step in range(10_000):
+            states[0, step % 5] += 1.0
+            timeline.record(step, states)
+        steps = timeline.steps()
+        # 20 keyframes, the last 3 keeping their deltas
+        self.assertEqual(len(steps), 17 + 3 * 100)
+        self.assertEqual(steps[0], 8000)
+        self.assertIn(9700, timeline)
+        self.assertNotIn(9699, timeline)
+        self.assertNotIn(7900, timeline)
+        np.testing.assert_array_equal(timeline.get(9999), states)
+        with self.assertRaises(KeyError):
+            timeline.get(9699)
+
+
+class TestRewind(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.games_dir = Path(self._tmp_dir.name)
+        self.game = create_teacup_game(
+            self.games_dir,
+            TEMPERATURES,
+            settings={"Rewind": {"keyframe_interval": 8}},
+        )
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def start(self) -> HeadlessGameManager:
+        manager = HeadlessGameManager(self.game)
+        manager.prepare()
+        manager.connect()
+        return manager
+
+    def test_rewind_and_rerun(self):
+        manager = self.start()
+        model = manager.MODEL_MANAGER
+        expected = manager.run(40).values.copy()
+        forked = model.rewind(13, fork=True)
+        self.assertEqual(model.current_step, 13)
+        self.assertEqual(len(model.history), 14)
+        self.assertEqual(len(forked), 41)
+        np.testing.assert_array_equal(model.history.values, expected[:14])
+
+        history = manager.run(27)
+        np.testing.assert_array_equal(history.values, expected)
+        np.testing.assert_array_equal(forked.values, expected)
+
+    def test_rewind_disabled(self):
+        game = create_teacup_game(
+            self.games_dir, TEMPERATURES, name="no_rewind"
+        )
+        manager = HeadlessGameManager(game)
+        manager.prepare()
+        manager.connect()
+        manager.run(5)
+        self.assertIsNone(manager.MODEL_MANAGER.timeline)
+        with self.assertRaises(RuntimeError):
+            manager.MODEL_MANAGER.rewind(2)
+
+    def test_rewind_unknown_step(self):
+        manager = self.start()
+        manager.run(5)
+        with self.assertRaises(ValueError):
+            manager.MODEL_MANAGER.rewind(6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import math
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import pygame
+
+import pysimgame
+from pysimgame.headless import HeadlessGameManager
+from teacup import create_teacup_game
+
+TEMPERATURES = {"a": 180.0, "b": 100.0}
+
+
+class TestScheduling(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.games_dir = Path(self._tmp_dir.name)
+        self.game = create_teacup_game(
+            self.games_dir, TEMPERATURES, settings={"ModelTickRate": 20}
+        )
+        pygame.display.init()
+        self.manager = HeadlessGameManager(self.game)
+        self.manager.prepare()
+        self.manager.connect()
+        self.model = self.manager.MODEL_MANAGER
+        pygame.event.clear()
+
+    def tearDown(self):
+        pygame.display.quit()
+        self._tmp_dir.cleanup()
+
+    def stepped_events(self):
+        return pygame.event.get(pysimgame.ModelStepped)
+
+    def run_for(self, fps: float, duration: float):
+        self.model.fps = fps
+        thread = threading.Thread(target=self.model.run)
+        thread.start()
+        time.sleep(duration)
+        self.model._paused = True
+        thread.join()
+
+    def test_batch_posts_once(self):
+        self.assertEqual(self.model.run_batch(5), 5)
+        self.assertEqual(self.model.current_step, 5)
+        events = self.stepped_events()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].n_steps, 5)
+
+    def test_batch_budget(self):
+        n_done = self.model.run_batch(None, budget=0)
+        self.assertEqual(n_done, 1)
+        self.assertEqual(self.stepped_events()[0].n_steps, 1)
+
+    def test_several_steps_per_tick(self):
+        self.run_for(fps=400, duration=0.5)
+        events = self.stepped_events()
+        n_steps = sum(event.n_steps for event in events)
+        self.assertEqual(n_steps, self.model.current_step)
+        # Ticks are limited to 20 per second
+        self.assertLess(len(events), 20)
+        self.assertGreater(n_steps, len(events))
+
+    def test_max_speed(self):
+        self.run_for(fps=math.inf, duration=0.2)
+        events = self.stepped_events()
+        self.assertEqual(
+            sum(event.n_steps for event in events), self.model.current_step
+        )
+        self.assertGreater(self.model.current_step, len(events))
+
+
+if __name__ == "__main__":
+    unittest.main()
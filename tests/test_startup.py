@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+import unittest
+
+# Only required by the game, not by the command line
+HEAVY_MODULES = [
+    "matplotlib",
+    "pandas",
+    "pygame_gui",
+    "PySide6",
+    "skimage",
+    "git",
+    "pysd",
+]
+
+
+def imported_modules(statement: str) -> set[str]:
+    """Return the packages imported by the statement in a new process."""
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys; {statement}; print(*sys.modules)",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=dict(os.environ, SDL_VIDEODRIVER="dummy"),
+    ).stdout
+    return {module.split(".")[0] for module in output.split()}
+
+
+class TestStartup(unittest.TestCase):
+    def test_command_line_imports(self):
+        modules = imported_modules("import pysimgame.arg_parse")
+        self.assertFalse(modules & set(HEAVY_MODULES))
+
+    def test_headless_imports(self):
+        modules = imported_modules("import pysimgame.headless")
+        self.assertFalse(
+            modules & (set(HEAVY_MODULES) - {"pandas", "pysd"})
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
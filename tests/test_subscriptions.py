@@ -0,0 +1,128 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from pysimgame.headless import HeadlessGameManager, run_headless
+from teacup import create_teacup_game
+
+TEMPERATURES = {"a": 180.0, "b": 100.0}
+
+
+class TestSubscriptions(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.games_dir = Path(self._tmp_dir.name)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def start(self, attributes, settings=None) -> HeadlessGameManager:
+        game = create_teacup_game(
+            self.games_dir, TEMPERATURES, settings=settings
+        )
+        manager = HeadlessGameManager(game, attributes=attributes)
+        manager.prepare()
+        manager.connect()
+        return manager
+
+    def test_only_subscribed_captured(self):
+        manager = self.start(["teacup_temperature"])
+        history = manager.run(10)
+        self.assertEqual(history.attributes, ["teacup_temperature"])
+        self.assertEqual(history.shape, (11, 2, 1))
+
+    def test_subscribe_during_run(self):
+        manager = self.start(["teacup_temperature"])
+        model = manager.MODEL_MANAGER
+        manager.run(5)
+        model.subscribe("reader", ["heat_loss_to_room"])
+        history = manager.run(5)
+        self.assertCountEqual(
+            history.attributes, ["teacup_temperature", "heat_loss_to_room"]
+        )
+        heat_loss = history["a", "heat_loss_to_room"]
+        # Not captured before the subscription
+        self.assertTrue(np.all(np.isnan(heat_loss[:5])))
+
+        expected = run_headless(manager.game, n_steps=10)
+        np.testing.assert_array_equal(
+            heat_loss[5:], expected["a", "heat_loss_to_room"][5:]
+        )
+        np.testing.assert_array_equal(
+            history["b", "teacup_temperature"],
+            expected["b", "teacup_temperature"],
+        )
+
+        model.unsubscribe("reader")
+        self.assertEqual(model.history.attributes, ["teacup_temperature"])
+
+    def test_snapshot(self):
+        manager = self.start(["teacup_temperature"])
+        model = manager.MODEL_MANAGER
+        manager.run(5)
+        snapshot = model.snapshot
+        self.assertEqual(len(snapshot), 6)
+        model.subscribe("reader", ["heat_loss_to_room"])
+        # Published with the new attribute, the old one is not changed
+        self.assertIn("heat_loss_to_room", model.snapshot.attributes)
+        self.assertNotIn("heat_loss_to_room", snapshot.attributes)
+        manager.run(5)
+        self.assertEqual(len(snapshot), 6)
+        np.testing.assert_array_equal(
+            model.snapshot.values, model.history.values
+        )
+
+    def test_snapshot_read_from_thread(self):
+        manager = self.start(["teacup_temperature"])
+        model = manager.MODEL_MANAGER
+        stop = threading.Event()
+        errors = []
+
+        def read():
+            while not stop.is_set():
+                snapshot = model.snapshot
+                x = snapshot.time_axis
+                y = snapshot["a", "teacup_temperature"]
+                if len(x) != len(y) or np.isnan(y).any():
+                    errors.append(len(x))
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            manager.run(100)
+        finally:
+            stop.set()
+            reader.join()
+        self.assertEqual(errors, [])
+
+    def test_unknown_attribute(self):
+        manager = self.start(["teacup_temperature"])
+        with self.assertRaises(ValueError):
+            manager.MODEL_MANAGER.subscribe("reader", ["not_an_attribute"])
+
+    def test_full_history(self):
+        manager = self.start(
+            ["teacup_temperature"], settings={"FullHistory": True}
+        )
+        model = manager.MODEL_MANAGER
+        self.assertEqual(model.history.attributes, model.capture_attributes)
+
+    def test_vectorized(self):
+        manager = self.start(
+            ["teacup_temperature"], settings={"ModelManager": "vectorized"}
+        )
+        manager.run(3)
+        manager.MODEL_MANAGER.subscribe("reader", ["heat_loss_to_room"])
+        history = manager.run(3)
+        expected = run_headless(manager.game, n_steps=6)
+        np.testing.assert_allclose(
+            history["b", "heat_loss_to_room"][3:],
+            expected["b", "heat_loss_to_room"][3:],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pygame
+
+from pysimgame import links
+from pysimgame.model import ModelManager
+from pysimgame.vectorized import VectorizedModelManager
+from teacup import TestGameManager, create_teacup_game
+
+TEMPERATURES = {"a": 180.0, "b": 100.0, "c": 50.0}
+
+
+def run_model(manager_class, n_steps: int, setup=None):
+    with tempfile.TemporaryDirectory() as games_dir:
+        game = create_teacup_game(
+            games_dir, TEMPERATURES, settings={"FullHistory": True}
+        )
+        manager = manager_class(TestGameManager(game))
+        manager.prepare()
+        if setup is not None:
+            setup(manager)
+        for _ in range(n_steps):
+            manager.step()
+        return manager.outputs.to_numpy(dtype=float)
+
+
+class TestVectorizedModelManager(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+
+    def assert_same_trajectories(self, setup=None):
+        np.testing.assert_allclose(
+            run_model(ModelManager, 10, setup),
+            run_model(VectorizedModelManager, 10, setup),
+            rtol=1e-12,
+        )
+
+    def test_same_trajectories(self):
+        self.assert_same_trajectories()
+
+    def test_same_trajectories_with_region_modifier(self):
+        def setup(manager: ModelManager):
+            manager.link_modify("b", "characteristic_time", lambda: 2.0)
+
+        self.assert_same_trajectories(setup)
+
+    def test_same_trajectories_with_region_average(self):
+        def setup(manager: ModelManager):
+            manager.link_region_average(
+                "teacup_temperature", "room_temperature"
+            )
+
+        self.assert_same_trajectories(setup)
+
+    def test_same_trajectories_with_export_import(self):
+        def setup(manager: ModelManager):
+            manager.link_export_import(
+                "heat_loss_to_room",
+                "room_temperature",
+                links.weighted_average("teacup_temperature"),
+            )
+
+        self.assert_same_trajectories(setup)
+
+    def test_same_trajectories_with_flows(self):
+        def setup(manager: ModelManager):
+            manager.link_flows(
+                "teacup_temperature",
+                "room_temperature",
+                "heat_loss_to_room",
+                np.array([[0.0, 0.1, 0.2], [0.0, 0.0, 0.5], [0.3, 0.0, 0.0]]),
+            )
+
+        self.assert_same_trajectories(setup)
+
+    def test_region_view(self):
+        with tempfile.TemporaryDirectory() as games_dir:
+            game = create_teacup_game(games_dir, TEMPERATURES)
+            manager = VectorizedModelManager(TestGameManager(game))
+            manager.prepare()
+            for region, temperature in TEMPERATURES.items():
+                self.assertEqual(
+                    manager[region].components.teacup_temperature(),
+                    temperature,
+                )
+
+    def test_states_array(self):
+        with tempfile.TemporaryDirectory() as games_dir:
+            game = create_teacup_game(games_dir, TEMPERATURES)
+            manager = VectorizedModelManager(TestGameManager(game))
+            manager.prepare()
+            manager.step()
+            states = manager._states_array()
+            np.testing.assert_array_equal(
+                states, ModelManager._states_array(manager)
+            )
+            manager.step()
+            manager._set_states(
+                manager._states_from_array(states), manager.current_time
+            )
+            np.testing.assert_array_equal(manager._states_array(), states)
+
+
+if __name__ == "__main__":
+    unittest.main()